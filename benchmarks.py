@@ -0,0 +1,335 @@
+from typing import Optional
+import gc
+import os
+import heapq
+import random
+import time
+import tracemalloc
+from array import array
+from collections import deque
+import grafo_a
+import grafo_b
+import parallel_bfs
+import random_walks
+import vectorized_bfs
+
+
+def timed(function, *args, **kwargs) -> tuple:
+    """
+    Runs a function and measures it.
+
+    Parameters
+    ----------
+    function : callable
+        The function to run.
+
+    Returns
+    -------
+    tuple
+        A tuple with the format (result, elapsed seconds).
+    """
+    gc.collect()
+    start_time = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start_time
+
+
+"""
+Construcción del grafo de grafo_a
+
+"""
+
+def benchmark_load_graph(movies_by_id, actors_by_movie, actor_names_by_id) -> dict:
+    """
+    Compares the build time of grafo_a.load_graph against the bulk builder.
+
+    Returns
+    -------
+    dict
+        A dictionary with the format {builder: elapsed seconds}.
+    """
+    times = {}
+    _, times['load_graph'] = timed(grafo_a.load_graph, movies_by_id, actors_by_movie, actor_names_by_id)
+    _, times['load_graph_bulk'] = timed(grafo_a.load_graph_bulk, movies_by_id, actors_by_movie, actor_names_by_id)
+    _, times['load_graph_bulk (int ids)'] = timed(grafo_a.load_graph_bulk, movies_by_id, actors_by_movie,
+                                                  actor_names_by_id, movie_ids_as_int=True)
+    for builder, elapsed in times.items():
+        print(f"{builder}: {elapsed:.2f} seconds ({times['load_graph'] / elapsed:.1f}x)")
+    return times
+
+
+def _traced_build(builder, *args, **kwargs) -> tuple:
+    gc.collect()
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    graph = builder(*args, **kwargs)
+    elapsed = time.perf_counter() - start_time
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return graph, elapsed, size
+
+
+def benchmark_actor_projection(movies_by_id, actors_by_movie, actor_names_by_id, sources: list, max_cast_size: Optional[int] = None) -> dict:
+    """
+    Compares the co-star graph of grafo_a.load_graph_bulk against the actor projection over the movie layer:
+    memory kept after the build (traced, the titles and names are shared with the input) and single-source
+    shortest paths from every source, checking both give the same distances.
+
+    Returns
+    -------
+    dict
+        A dictionary with the format {graph: (build seconds, MB kept, mean seconds per source)}.
+    """
+    results = {}
+    distances = {}
+    for name, builder in (('load_graph_bulk', grafo_a.load_graph_bulk), ('load_graph_projection', grafo_a.load_graph_projection)):
+        graph, build_time, size = _traced_build(builder, movies_by_id, actors_by_movie, actor_names_by_id)
+        runs, elapsed = timed(lambda: [grafo_a.find_shortest_path_to_all(graph, source, use_cache=False) for source in sources])
+        distances[name] = [run.distances() for run in runs]
+        results[name] = (build_time, size / (1 << 20), elapsed / len(sources))
+        del graph, runs
+    if distances['load_graph_bulk'] != distances['load_graph_projection']:
+        raise ValueError("The actor projection gave different distances")
+    if max_cast_size is not None:
+        _, build_time, size = _traced_build(grafo_a.load_graph_projection, movies_by_id, actors_by_movie, actor_names_by_id, max_cast_size)
+        results[f'load_graph_projection (casts up to {max_cast_size})'] = (build_time, size / (1 << 20), None)
+    for name, (build_time, size, per_source) in results.items():
+        print(f"{name}: built in {build_time:.2f} seconds, {size:.1f} MB ({results['load_graph_bulk'][1] / size:.1f}x less)"
+              + (f", {per_source:.3f} seconds per source" if per_source is not None else ""))
+    return results
+
+
+"""
+Iteración de vecinos (get_neighbors + get_edge_data contra vistas)
+
+"""
+
+def _bfs_copying_neighbors(graph, vertex_id: str) -> tuple:
+    distances = {vertex_id: 0}
+    predecessors = {vertex_id: None}
+    queue = deque([vertex_id])
+    while queue:
+        current_node = queue.popleft()
+        for neighbor in graph.get_neighbors(current_node):
+            if neighbor not in distances:
+                distances[neighbor] = distances[current_node] + 1
+                predecessors[neighbor] = current_node
+                queue.append(neighbor)
+    return distances, predecessors
+
+
+def _dijkstra_copying_neighbors(graph, vertex_id: str) -> tuple:
+    distances = {vertex_id: 0}
+    predecessors = {vertex_id: None}
+    heap = [(0, vertex_id)]
+    while heap:
+        current_distance, current_node = heapq.heappop(heap)
+        if current_distance > distances[current_node]: continue
+        for neighbor in graph.get_neighbors(current_node):
+            new_distance = current_distance + len(graph.get_edge_data(current_node, neighbor))
+            if new_distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = new_distance
+                predecessors[neighbor] = current_node
+                heapq.heappush(heap, (new_distance, neighbor))
+    return distances, predecessors
+
+
+def benchmark_neighbor_iteration(graph, vertex_id: str, repeat: int = 5) -> dict:
+    """
+    Compares one BFS and one Dijkstra with copied neighbor lists and get_edge_data lookups
+    against the same traversals over the neighbor views of the graph (best time of some repetitions).
+
+    Returns
+    -------
+    dict
+        A dictionary with the format {traversal: (elapsed seconds, peak traced memory in bytes)}.
+    """
+    traversals = {
+        'BFS (get_neighbors)': _bfs_copying_neighbors,
+        'BFS (neighbors)': grafo_a.find_shortest_path_to_all_without_weights,
+        'Dijkstra (get_neighbors + get_edge_data)': _dijkstra_copying_neighbors,
+        'Dijkstra (neighbors_with_data)': grafo_a.find_shortest_path_to_all,
+    }
+    results = {}
+    for name, traversal in traversals.items():
+        elapsed = min(timed(traversal, graph, vertex_id)[1] for _ in range(repeat))
+        tracemalloc.start()
+        traversal(graph, vertex_id)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = (elapsed, peak)
+        print(f"{name}: {elapsed:.3f} seconds, peak {peak / (1 << 20):.1f} MB")
+    return results
+
+
+"""
+BFS vectorizado sobre arreglos CSR de NumPy
+
+"""
+
+def benchmark_vectorized_bfs(graph, sources: list) -> dict:
+    """
+    Compares a sweep of BFS (eccentricity and sum of distances from every source) run with the
+    pure Python CSR BFS against the frontier-vectorized BFS, with and without bottom-up levels,
+    and against the bit-parallel BFS that advances 64 sources at once.
+
+    Returns
+    -------
+    dict
+        A dictionary with the format {implementation: elapsed seconds}.
+    """
+    vectorized_graph = vectorized_bfs.Vectorized_Graph(graph)
+    source_ids = [vectorized_graph.index_of(source) for source in sources]
+    offsets, neighbors = vectorized_graph.offsets, vectorized_graph.neighbors
+    seen = array('i', [-1]) * (len(offsets) - 1)
+    offsets_list, neighbors_list = offsets.tolist(), neighbors.tolist()
+    sweeps = {
+        'Python BFS': lambda: [parallel_bfs.bfs_stats(offsets_list, neighbors_list, source, seen) for source in source_ids],
+        'NumPy BFS (top-down)': lambda: [vectorized_bfs.bfs_stats(vectorized_graph, source, False) for source in source_ids],
+        'NumPy BFS (direction-optimizing)': lambda: [vectorized_bfs.bfs_stats(vectorized_graph, source) for source in source_ids],
+        'Bit-parallel BFS': lambda: [vectorized_bfs.bit_parallel_bfs_stats(vectorized_graph, source_ids[start:start + vectorized_bfs.BATCH_SIZE])
+                                     for start in range(0, len(source_ids), vectorized_bfs.BATCH_SIZE)],
+    }
+    times = {}
+    for name, sweep in sweeps.items():
+        _, times[name] = timed(sweep)
+        print(f"{name}: {times[name]:.2f} seconds ({times['Python BFS'] / times[name]:.1f}x)")
+    return times
+
+
+"""
+Dijkstra con pesos enteros y cola de buckets (find_shortest_path_to_all de grafo_a)
+
+"""
+
+def benchmark_weighted_sssp(graph, sources: list, weighting: str = 'shared') -> dict:
+    """
+    Compares single-source shortest paths (with the weights of a channel, by default the shared movies) from every
+    source run with the heapq Dijkstra of grafo_a.find_shortest_path_to_all against the Dial Dijkstra over the
+    precomputed weight array of the channel.
+
+    Returns
+    -------
+    dict
+        A dictionary with the format {implementation: mean seconds per source}, and the one-time weight precomputation.
+    """
+    vectorized_graph = vectorized_bfs.Vectorized_Graph(graph)
+    times = {}
+    _, times['weight arrays'] = timed(vectorized_graph.edge_weights, weighting)
+    _, elapsed = timed(lambda: [grafo_a.find_shortest_path_to_all(graph, source, weighting) for source in sources])
+    times['heapq Dijkstra'] = elapsed / len(sources)
+    _, elapsed = timed(lambda: [grafo_a.find_shortest_path_to_all_dial(vectorized_graph, source, weighting) for source in sources])
+    times['Dial Dijkstra'] = elapsed / len(sources)
+    print(f"Weight arrays built in {times['weight arrays']:.2f} seconds")
+    for name in ('heapq Dijkstra', 'Dial Dijkstra'):
+        print(f"{name}: {times[name]:.3f} seconds per source ({times['heapq Dijkstra'] / times[name]:.1f}x)")
+    return times
+
+
+"""
+Etiquetado por landmarks podado (grados de separación de grafo_b)
+
+"""
+
+def benchmark_landmark_labels(graph, pairs: list, workers: int = 1) -> dict:
+    """
+    Builds the pruned landmark labels of a Bipartite_Graph and compares their queries against grafo_b.degree_of_separation.
+
+    Returns
+    -------
+    dict
+        A dictionary with the build time, the label entries, the label size in bytes and the mean latency of both queries.
+    """
+    labels, build_time = timed(grafo_b.build_landmark_labels, graph, workers, False)
+    _, bfs_time = timed(lambda: [grafo_b.degree_of_separation(graph, vertex1, vertex2) for vertex1, vertex2 in pairs])
+    _, labels_time = timed(lambda: [labels.distance(vertex1, vertex2) for vertex1, vertex2 in pairs])
+    results = {'build time': build_time, 'entries': labels.number_of_entries(), 'bytes': labels.size_in_bytes(),
+               'BFS query': bfs_time / len(pairs), 'labels query': labels_time / len(pairs)}
+    print(f"Labels built in {build_time:.2f} seconds with {workers} workers")
+    print(f"{results['entries']} entries ({results['entries'] / max(labels.number_of_actors(), 1):.1f} per actor), {results['bytes'] / (1 << 20):.1f} MB")
+    print(f"Query: {results['labels query'] * 1e6:.1f} microseconds with labels, {results['BFS query'] * 1e6:.1f} microseconds with BFS")
+    return results
+
+
+"""
+Caminatas aleatorias (estimate_central_vertices de grafo_b)
+
+"""
+
+def benchmark_random_walks(graph, num_walks: int = 1000, walk_length: int = 30) -> dict:
+    """
+    Compares the walk throughput of grafo_b.estimate_central_vertices against the lockstep NumPy engine
+    (which runs a thousand times more walks).
+
+    Returns
+    -------
+    dict
+        A dictionary with the format {implementation: steps per second}.
+    """
+    vectorized_graph = vectorized_bfs.Vectorized_Graph(graph)
+    throughput = {}
+    _, elapsed = timed(grafo_b.estimate_central_vertices, graph, num_walks, walk_length)
+    throughput['estimate_central_vertices'] = num_walks * walk_length / elapsed
+    for non_backtracking in (False, True):
+        _, elapsed = timed(random_walks.walk_visits, vectorized_graph, num_walks * 1000, walk_length, non_backtracking, 0)
+        throughput[f"walk_visits (non_backtracking={non_backtracking})"] = num_walks * 1000 * walk_length / elapsed
+    for name, steps_per_second in throughput.items():
+        print(f"{name}: {steps_per_second / 1e6:.2f} million steps per second "
+              f"({steps_per_second / throughput['estimate_central_vertices']:.0f}x)")
+    return throughput
+
+
+def benchmark_parallel_walks(graph, num_walks: int = 1000000, walk_length: int = 30, max_workers: Optional[int] = None) -> dict:
+    """
+    Measures how random_walks.parallel_walk_visits scales with the number of processes (1, 2, 4, ... up to
+    max_workers, by default the number of cores), against the single process walk_visits.
+
+    Returns
+    -------
+    dict
+        A dictionary with the format {number of workers: elapsed seconds}, 0 for walk_visits in this process.
+    """
+    vectorized_graph = vectorized_bfs.Vectorized_Graph(graph)
+    max_workers = max_workers or os.cpu_count()
+    times = {}
+    _, times[0] = timed(random_walks.walk_visits, vectorized_graph, num_walks, walk_length, True, 0)
+    print(f"walk_visits: {times[0]:.2f} seconds")
+    workers = 1
+    while workers <= max_workers:
+        _, times[workers] = timed(random_walks.parallel_walk_visits, vectorized_graph, num_walks, walk_length, True, 0, workers)
+        print(f"parallel_walk_visits ({workers} workers): {times[workers]:.2f} seconds ({times[0] / times[workers]:.2f}x)")
+        workers *= 2
+    return times
+
+
+def main():
+    movies_by_id, actors_by_movie, actor_names_by_id = grafo_a.read_data(grafo_a.MOVIES_DATA_PATH, grafo_a.ACTORS_DATA_PATH,
+                                                                           grafo_a.ACTORS_NAMES_PATH)
+    print("Benchmark: graph construction")
+    benchmark_load_graph(movies_by_id, actors_by_movie, actor_names_by_id)
+    graph = grafo_a.load_graph_bulk(movies_by_id, actors_by_movie, actor_names_by_id)
+    hub = max(grafo_a.find_connected_components(graph)['Component 1'], key=graph.degree)
+    print("Benchmark: actor projection against the co-star graph, from 4 vertices of the largest component")
+    benchmark_actor_projection(movies_by_id, actors_by_movie, actor_names_by_id,
+                               grafo_a.find_connected_components(graph)['Component 1'][:4], max_cast_size=10)
+    print("Benchmark: neighbor iteration on the largest component")
+    benchmark_neighbor_iteration(graph, hub)
+    print("Benchmark: BFS sweep over 64 vertices of the largest component")
+    benchmark_vectorized_bfs(graph, grafo_a.find_connected_components(graph)['Component 1'][:64])
+    print("Benchmark: weighted single-source shortest paths from 8 vertices of the largest component")
+    benchmark_weighted_sssp(graph, grafo_a.find_connected_components(graph)['Component 1'][:8])
+    print("Benchmark: strongest connections (inverse weights) from 8 vertices of the largest component")
+    benchmark_weighted_sssp(graph, grafo_a.find_connected_components(graph)['Component 1'][:8], 'inverse')
+    bipartite_graph = grafo_b.load_graph_streaming(grafo_b.MOVIES_DATA_PATH, grafo_b.ACTORS_DATA_PATH, grafo_b.ACTORS_NAMES_PATH)
+    actors = [vertex for vertex in bipartite_graph.get_graph_elements() if bipartite_graph.get_vertex_data(vertex)['type'] == 'actor']
+    pairs = [(random.choice(actors), random.choice(actors)) for _ in range(1000)]
+    print("Benchmark: pruned landmark labels")
+    benchmark_landmark_labels(bipartite_graph, pairs)
+    print("Benchmark: random walks")
+    benchmark_random_walks(bipartite_graph)
+    print("Benchmark: random walks on a pool of processes")
+    benchmark_parallel_walks(bipartite_graph)
+
+
+if __name__ == '__main__':
+    main()
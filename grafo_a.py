@@ -1,11 +1,23 @@
-from graph import Graph
-import csv
+from graph import Graph, CSR_Graph, Actor_Projection
+from snapshot import load_or_build_graph, load_or_build_projection, write_snapshot, Snapshot, extend_graph, fresh_snapshot
+from parallel_bfs import multi_source_bfs
+from vectorized_bfs import Vectorized_Graph, bfs, bit_parallel_bfs, dial_dijkstra
+from hyperanf import Distance_Distribution, hyper_anf
+from weight_channels import weight_table
+from path_cache import Path_Cache
+from tsv_stream import Ingest_Stats, iter_movies, iter_casts, iter_names
 from itertools import combinations
 from collections import deque
+from collections.abc import Mapping
+from typing import Optional, List, Sequence, Callable, Any
+from array import array
+from bisect import bisect_left
+import os
 import heapq
+import numpy as np
+import math
+import gc
 from tqdm import tqdm
-import os
-import pickle
 import time
 import random
 MOVIE_TITLE_TYPE = "movie"
@@ -14,43 +26,25 @@ PRINCIPALS_COLUMNS = ["nconst", "category"]
 MOVIES_DATA_PATH = "./datasets/title-basics-f.tsv"
 ACTORS_DATA_PATH = "./datasets/title-principals-f.tsv"
 ACTORS_NAMES_PATH = "./datasets/name-basics-f.tsv"
+GRAPH_SNAPSHOT_PATH = "./datasets/graph-a.snapshot"
+PROJECTION_SNAPSHOT_PATH = "./datasets/projection-a.snapshot"
+LANDMARKS_PATH = "./datasets/landmarks-a.snapshot"
+PATH_CACHE = Path_Cache()  # single-source results of find_shortest_path_to_all, shared by every graph
 
 
 def read_data(movies_file, actors_file, actors_name_file):
     print("Reading data")
-    if os.path.exists('data.pickle'):
-        print("Reading from pre-saved file")
-        try:
-            with open('data.pickle', 'rb') as file:
-                movies_by_id, actors_by_movie, actor_names_by_id = pickle.load(file)
-                return movies_by_id, actors_by_movie, actor_names_by_id
-        except Exception:
-            pass
-    movies_by_id = {}
-    with open(movies_file, "r", newline="", encoding="utf-8") as file1:
-        reader = csv.DictReader(file1, delimiter="\t")
-        for row in reader:
-            if row["titleType"] == MOVIE_TITLE_TYPE:
-                movies_by_id[row['tconst']] = {'primaryTitle': row['primaryTitle']}
+    stats = Ingest_Stats()
+    movies_by_id = {movie_id: {'primaryTitle': title} for movie_id, title in iter_movies(movies_file, stats)}
 
     actors_ids = set()
     actors_by_movie = {m: set() for m in movies_by_id.keys()}
-    with open(actors_file, "r", newline="", encoding="utf-8") as file2:
-        reader = csv.DictReader(file2, delimiter="\t")
-        for row in reader:
-            if row["tconst"] in actors_by_movie:
-                actors_by_movie[row["tconst"]].update([row["nconst"]])
-                actors_ids.update([row["nconst"]])
-
-    actor_names_by_id = {}
-    with open(actors_name_file, "r", newline="", encoding="utf-8") as file2:
-        reader = csv.DictReader(file2, delimiter="\t")
-        for row in reader:
-            if row["nconst"] in actors_ids:
-                actor_names_by_id[row["nconst"]] = row["primaryName"]
-
-    with open('data.pickle', 'wb') as file:
-        pickle.dump((movies_by_id, actors_by_movie, actor_names_by_id), file)
+    for movie_id, cast in iter_casts(actors_file, movies_by_id, stats):
+        actors_by_movie[movie_id].update(cast)
+        actors_ids.update(cast)
+
+    actor_names_by_id = dict(iter_names(actors_name_file, actors_ids, stats))
+    print(stats.report())
 
     return movies_by_id, actors_by_movie, actor_names_by_id
 
@@ -82,6 +76,343 @@ def load_graph(movies_by_id, actors_by_movie, actor_names_by_id) -> Graph:
     print("Graph loaded")
     return graph
 
+def movie_id_to_int(movie_id: str) -> int:
+    """
+    Converts an IMDb tconst to its number
+    :param movie_id: the tconst (for example 'tt0000001')
+    :return: the tconst number
+    """
+    return int(movie_id[2:])
+
+
+def int_to_movie_id(movie_number: int) -> str:
+    """
+    Converts a tconst number back to the IMDb tconst
+    :param movie_number: the tconst number
+    :return: the tconst
+    """
+    return f"tt{movie_number:07d}"
+
+
+def load_graph_bulk(movies_by_id, actors_by_movie, actor_names_by_id, movie_ids_as_int: bool = False) -> Graph:
+    """
+    Loads the graph accumulating the shared movies of every actor pair in one pass and adopting the
+    resulting adjacency as is. The edge data are lists of distinct movies instead of sets.
+    :param movies_by_id: the movies data by id as dict
+    :param actors_by_movie: the actors data by movie
+    :param actor_names_by_id: the actors names by their ids
+    :param movie_ids_as_int: store the tconst numbers of the shared movies instead of their titles
+    :return: a Graph
+    """
+    print("Loading graph (bulk)")
+    # Millions of small containers are created and none of them form cycles, so the cyclic
+    # garbage collector would only rescan the growing adjacency over and over
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        adjacency = _accumulate_movies_by_pair(movies_by_id, actors_by_movie, movie_ids_as_int)
+    finally:
+        if gc_was_enabled: gc.enable()
+    graph = Graph.from_adjacency(adjacency, {actor: actor_names_by_id.get(actor, "ERROR") for actor in adjacency})
+    print("Graph loaded")
+    return graph
+
+
+def load_graph_projection(movies_by_id, actors_by_movie, actor_names_by_id, max_cast_size: Optional[int] = None) -> Actor_Projection:
+    """
+    Loads the graph as an actor projection: only the movies of every actor and the cast of every movie are kept,
+    and the co-stars of an actor are gathered from its movies when they are needed, so the big casts never turn
+    into cliques. It answers every read query of the analytics with the same results as the other loaders
+    (the edge data are lists of distinct titles, as in load_graph_bulk).
+    :param movies_by_id: the movies data by id as dict
+    :param actors_by_movie: the actors data by movie
+    :param actor_names_by_id: the actors names by their ids
+    :param max_cast_size: optional cap, movies with a larger cast are left out
+    :return: an Actor_Projection
+    """
+    print("Loading graph (actor projection)")
+    graph = Actor_Projection.from_casts(((movie['primaryTitle'], actors_by_movie[movie_id]) for movie_id, movie in movies_by_id.items()),
+                                        actor_names_by_id, max_cast_size)
+    print("Graph loaded")
+    return graph
+
+
+def _accumulate_movies_by_pair(movies_by_id, actors_by_movie, movie_ids_as_int: bool) -> dict:
+    adjacency = {}
+    for movie_id, movie in movies_by_id.items():
+        cast = actors_by_movie[movie_id]
+        if len(cast) < 2: continue
+        movie_data = movie_id_to_int(movie_id) if movie_ids_as_int else movie['primaryTitle']
+        rows = [(actor, adjacency.setdefault(actor, {})) for actor in cast]
+        for (actor1, row1), (actor2, row2) in combinations(rows, 2):
+            movies = row1.get(actor2)
+            if movies is None:
+                row1[actor2] = row2[actor1] = [movie_data]
+            else:
+                movies.append(movie_data)
+    if not movie_ids_as_int:
+        # Different movies can share a title, and the title is what load_graph counts
+        for row in adjacency.values():
+            for movies in row.values():
+                if len(movies) > 1: movies[:] = dict.fromkeys(movies)
+    return adjacency
+
+
+def load_graph_csr(movies_by_id, actors_by_movie, actor_names_by_id, movie_ids_as_int: bool = False) -> CSR_Graph:
+    """
+    Loads the graph straight into a CSR_Graph (see CSR_Graph.from_casts), with the same vertices, edges and
+    edge data as load_graph_bulk but without building a Graph first
+    :param movies_by_id: the movies data by id as dict
+    :param actors_by_movie: the actors data by movie
+    :param actor_names_by_id: the actors names by their ids
+    :param movie_ids_as_int: store the tconst numbers of the shared movies instead of their titles
+    :return: a CSR_Graph
+    """
+    print("Loading graph (CSR)")
+    graph = CSR_Graph.from_casts(((movie_id_to_int(movie_id) if movie_ids_as_int else movie['primaryTitle'], actors_by_movie[movie_id])
+                                  for movie_id, movie in movies_by_id.items()), actor_names_by_id)
+    print("Graph loaded")
+    return graph
+
+
+def build_graph(movies_file, actors_file, actors_name_file) -> CSR_Graph:
+    """
+    Builds the graph from the TSVs with the CSR builder (the build step of the graph snapshot)
+    :param movies_file: the title.basics TSV
+    :param actors_file: the title.principals TSV
+    :param actors_name_file: the name.basics TSV
+    :return: a CSR_Graph
+    """
+    return load_graph_csr(*read_data(movies_file, actors_file, actors_name_file))
+
+
+def load_graph_streaming(movies_file, actors_file, actors_name_file) -> Graph:
+    """
+    Loads the graph straight from the TSVs, adding the edges of each movie as its cast is read (the principals
+    must be sorted by tconst as in the IMDb dump, the co-stars of a movie are only paired within its whole cast)
+    :param movies_file: the title.basics TSV
+    :param actors_file: the title.principals TSV
+    :param actors_name_file: the name.basics TSV
+    :return: a Graph
+    """
+    graph = Graph()
+    print("Loading graph (streaming)")
+    stats = Ingest_Stats()
+    movie_titles = dict(iter_movies(movies_file, stats))
+    for movie_id, cast in iter_casts(actors_file, movie_titles, stats, grouped=True):
+        movie_title = movie_titles[movie_id]
+        for actor1, actor2 in combinations(cast, 2):
+            if not graph.vertex_exists(actor1):
+                graph.add_vertex(actor1, "ERROR")
+            if not graph.vertex_exists(actor2):
+                graph.add_vertex(actor2, "ERROR")
+            if graph.edge_exists(actor1, actor2):
+                graph.get_edge_data(actor1, actor2).add(movie_title)
+            else:
+                graph.add_edge(vertex1=actor1, vertex2=actor2, data={movie_title})
+    del movie_titles
+    for actor_id, actor_name in iter_names(actors_name_file, graph.get_graph_elements(), stats):
+        graph.set_vertex_data(actor_id, actor_name)
+    print(stats.report())
+    print("Graph loaded")
+    return graph
+
+def _stores_movie_ids(graph: Graph) -> bool:
+    """
+    If the edge data of a graph are tconst numbers (see load_graph_bulk) instead of titles, judging by its first edge
+    """
+    for vertex in graph.get_graph_elements():
+        for _, movies in graph.neighbors_with_data(vertex):
+            return any(isinstance(movie, int) for movie in movies)
+    return False
+
+
+def _add_movie_edges(graph: Graph, movie: Any, cast: Sequence[str], actor_names_by_id: dict, changed_edges: list) -> None:
+    """
+    Adds a movie to the graph as load_graph does (an edge between every pair of its actors with the movies they share,
+    movie being its title or its tconst number, as the edge data of the graph), recording every edge whose movies
+    changed as (actor1, actor2, shared movies before, shared movies after)
+    """
+    cast = list(dict.fromkeys(cast))
+    if len(cast) < 2: return
+    for actor in cast:
+        if not graph.vertex_exists(actor):
+            graph.add_vertex(actor, actor_names_by_id.get(actor, "ERROR"))
+    for actor1, actor2 in combinations(cast, 2):
+        if graph.edge_exists(actor1, actor2):
+            movies = graph.get_edge_data(actor1, actor2)
+            if movie in movies: continue
+            shared_before = len(movies)
+            movies = movies + [movie] if isinstance(movies, list) else set(movies) | {movie}
+        else:
+            shared_before, movies = 0, {movie}
+        graph.add_edge(vertex1=actor1, vertex2=actor2, data=movies)
+        changed_edges.append((actor1, actor2, shared_before, len(movies)))
+
+
+def _repair_paths(graph: Graph, distances: np.ndarray, predecessors: np.ndarray, weighting: str, changed_edges: list) -> tuple:
+    """
+    Updates a cached single-source result after some edges were added or got more shared titles, touching only
+    the vertices whose distance can change:
+    - an edge that got heavier only matters if it was in the shortest path tree, then the subtree below it
+      loses its distances and takes the best one offered by its neighbors outside of it
+    - new and lighter edges offer their endpoints a shorter distance
+    and every improved vertex is propagated with Dijkstra. Returns the repaired (distances, predecessors).
+    """
+    weights = weight_table(weighting)
+    vertices, index_of = _vertex_ids(graph)
+    if isinstance(graph, CSR_Graph):
+        adjacent, edge_data = graph.neighbor_ids_with_data, graph.get_edge_data_by_ids
+    else:
+        adjacent = lambda idx: ((index_of(neighbor), movies) for neighbor, movies in graph.neighbors_with_data(vertices[idx]))
+        edge_data = lambda idx1, idx2: graph.get_edge_data(vertices[idx1], vertices[idx2])
+    endpoint_ids = {}
+    for actor1, actor2, _, _ in changed_edges:
+        for actor in (actor1, actor2):
+            if actor not in endpoint_ids: endpoint_ids[actor] = index_of(actor)
+    grown = len(vertices) - len(distances)
+    distances = np.concatenate([distances, np.full(grown, -1, dtype=distances.dtype)])
+    predecessors = np.concatenate([predecessors, np.full(grown, -1, dtype=predecessors.dtype)])
+    roots = []
+    for actor1, actor2, shared_before, shared_after in changed_edges:
+        if shared_before and weights[shared_after] > weights[shared_before]:
+            idx1, idx2 = endpoint_ids[actor1], endpoint_ids[actor2]
+            if predecessors[idx2] == idx1: roots.append(idx2)
+            elif predecessors[idx1] == idx2: roots.append(idx1)
+    affected = np.zeros(len(distances), dtype=bool)
+    affected[roots] = True
+    while len(roots):
+        # The descendants of the roots in the shortest path tree, one level per pass
+        below = np.flatnonzero((predecessors >= 0) & ~affected)
+        below = below[affected[predecessors[below]]]
+        affected[below] = True
+        roots = below
+    distances[affected] = -1
+    predecessors[affected] = -1
+    heap = []
+
+    def offer(idx: int, distance, predecessor: int) -> None:
+        if distances[idx] < 0 or distance < distances[idx]:
+            distances[idx] = distance
+            predecessors[idx] = predecessor
+            heapq.heappush(heap, (distance, idx))
+    for idx in np.flatnonzero(affected).tolist():
+        for neighbor_idx, movies in adjacent(idx):
+            if distances[neighbor_idx] >= 0 and not affected[neighbor_idx]:
+                offer(idx, distances[neighbor_idx].item() + weights[len(movies)], neighbor_idx)
+    for actor1, actor2, _, _ in changed_edges:
+        idx1, idx2 = endpoint_ids[actor1], endpoint_ids[actor2]
+        weight = weights[len(edge_data(idx1, idx2))]
+        for idx, other in ((idx1, idx2), (idx2, idx1)):
+            if distances[other] >= 0:
+                offer(idx, distances[other].item() + weight, other)
+    while heap:
+        distance, idx = heapq.heappop(heap)
+        if distance > distances[idx]: continue
+        for neighbor_idx, movies in adjacent(idx):
+            offer(neighbor_idx, distance + weights[len(movies)], idx)
+    return distances, predecessors
+
+
+def apply_movie_delta(graph: Graph, movies_by_id, actors_by_movie, actor_names_by_id) -> int:
+    """
+    Adds new movies with their casts to a loaded graph (for example the output of read_data over a delta of the TSVs),
+    instead of loading everything again:
+    - the connected components index of the graph, if it was built, merges the components joined by the new edges
+    - the single-source results in PATH_CACHE of the graph version before the delta are repaired (see _repair_paths)
+      and kept for the new version, so the following queries are still hits
+    - the edges get the tconst numbers of the new movies instead of their titles if the graph stores them
+      (see load_graph_bulk)
+    :param graph: the graph (a Graph, a CSR_Graph cannot change, see apply_movie_delta_to_snapshot)
+    :param movies_by_id: the new movies data by id as dict
+    :param actors_by_movie: the actors of every new movie
+    :param actor_names_by_id: the names of the new actors by their ids
+    :return: the number of edges that were added or got a new shared title
+    """
+    if not isinstance(graph, Graph):
+        raise ValueError("Only a Graph can change in place, apply the delta to a CSR_Graph with apply_movie_delta_to_snapshot")
+    version_before = graph.version()
+    movie_ids_as_int = _stores_movie_ids(graph)
+    changed_edges = []
+    for movie_id, movie in movies_by_id.items():
+        _add_movie_edges(graph, movie_id_to_int(movie_id) if movie_ids_as_int else movie['primaryTitle'],
+                         actors_by_movie.get(movie_id, ()), actor_names_by_id, changed_edges)
+    if graph.version() != version_before:
+        for source, weighting, distances, predecessors in PATH_CACHE.take(version_before):
+            PATH_CACHE.put(graph.version(), source, weighting, *_repair_paths(graph, distances, predecessors, weighting, changed_edges))
+    return len(changed_edges)
+
+
+def add_movie(graph: Graph, movie_id: str, movie_title: str, cast: Sequence[str], actor_names_by_id: Optional[dict] = None) -> int:
+    """
+    Adds a new movie with its cast to a loaded graph (see apply_movie_delta)
+    :param graph: the graph
+    :param movie_id: the movie id
+    :param movie_title: the movie title
+    :param cast: the ids of its actors
+    :param actor_names_by_id: optional names of the new actors by their ids
+    :return: the number of edges that were added or got a new shared title
+    """
+    return apply_movie_delta(graph, {movie_id: {'primaryTitle': movie_title}}, {movie_id: cast}, actor_names_by_id or {})
+
+
+def apply_movie_delta_to_snapshot(graph: CSR_Graph, movies_by_id, actors_by_movie, actor_names_by_id,
+                                  path: str = GRAPH_SNAPSHOT_PATH,
+                                  sources: Sequence[str] = (MOVIES_DATA_PATH, ACTORS_DATA_PATH, ACTORS_NAMES_PATH)) -> CSR_Graph:
+    """
+    Adds new movies with their casts to a CSR_Graph opened from a snapshot (see apply_movie_delta), writing a new
+    snapshot with them merged into its sections (see snapshot.extend_graph) instead of building it again:
+    - the snapshot gets the fingerprints of sources, that already have the delta, so the next load_or_build_graph
+      opens it instead of rebuilding
+    - the connected components index merges the components joined by the new edges (see Component_Labels.extended)
+    - the single-source results in PATH_CACHE of the graph before the delta are moved to the new vertex ids,
+      repaired (see _repair_paths) and kept for the new graph
+    The landmark labels of the old graph are not updated, they have to be built again for the new one.
+    :param graph: a CSR_Graph opened from a snapshot
+    :param movies_by_id: the new movies data by id as dict
+    :param actors_by_movie: the actors of every new movie
+    :param actor_names_by_id: the names of the new actors by their ids
+    :param path: the snapshot file to write (by default the one main uses)
+    :param sources: the source files with the delta
+    :return: the new CSR_Graph (the old one keeps the graph before the delta)
+    """
+    if graph.snapshot_path is None:
+        raise ValueError("The graph was not opened from a snapshot, save it with save_graph first")
+    movie_ids_as_int = not Snapshot(graph.snapshot_path).has_section("titles.offsets")
+    ids = {}  # the id of every actor of the delta in the graph, -1 for the new ones
+    edges = {}  # {(actor1, actor2): ([movies added], movies before)}
+    for movie_id, movie in movies_by_id.items():
+        cast = list(dict.fromkeys(actors_by_movie.get(movie_id, ())))
+        if len(cast) < 2: continue
+        movie_data = movie_id_to_int(movie_id) if movie_ids_as_int else movie['primaryTitle']
+        for actor in cast:
+            if actor not in ids: ids[actor] = graph.index_of(actor)
+        for actor1, actor2 in combinations(cast, 2):
+            key = (actor1, actor2) if actor1 < actor2 else (actor2, actor1)
+            if key not in edges:
+                edges[key] = ([], graph.get_edge_data_by_ids(ids[actor1], ids[actor2]) or ())
+            added, existing = edges[key]
+            if movie_data not in existing and movie_data not in added:
+                added.append(movie_data)
+    edges = {key: (added, len(existing)) for key, (added, existing) in edges.items() if added}
+    if not edges:
+        return graph
+    changed_edges = [(actor1, actor2, shared_before, shared_before + len(added)) for (actor1, actor2), (added, shared_before) in edges.items()]
+    new_vertices = {actor: actor_names_by_id.get(actor, "ERROR") for actor, idx in ids.items() if idx < 0}
+    new_graph, old_to_new = extend_graph(graph, path, sources, new_vertices, {key: added for key, (added, _) in edges.items()})
+    new_ids = {actor: int(old_to_new[idx]) if idx >= 0 else new_graph.index_of(actor) for actor, idx in ids.items()}
+    if graph.has_components_index():
+        new_graph.set_components_index(graph.get_components_index().extended(
+            new_graph, old_to_new.tolist(), [(new_ids[actor1], new_ids[actor2]) for actor1, actor2 in edges]))
+    for source, weighting, distances, predecessors in PATH_CACHE.take(graph.version()):
+        new_distances = np.full(new_graph.number_of_vertices(), -1, dtype=distances.dtype)
+        new_predecessors = np.full(new_graph.number_of_vertices(), -1, dtype=predecessors.dtype)
+        new_distances[old_to_new] = distances
+        new_predecessors[old_to_new] = np.where(predecessors >= 0, old_to_new[predecessors], -1)
+        PATH_CACHE.put(new_graph.version(), source, weighting,
+                       *_repair_paths(new_graph, new_distances, new_predecessors, weighting, changed_edges))
+    return new_graph
+
 """
 Ejercicio 1
 
@@ -95,6 +426,7 @@ Una componente conexa se define como un subgrafo maximal conexo. ¿Cuántas comp
 def find_connected_components(graph: Graph) -> dict:
     """	
     Finds the connected components of a graph.
+    The components come from the index cached on the graph (see Graph.get_components_index).
 
     Parameters
     ----------
@@ -106,24 +438,14 @@ def find_connected_components(graph: Graph) -> dict:
     dict
         A dictionary with the format {component_id: [vertex1, vertex2, ...]}.
     """
-    visited = set()
-    graph_components = []
-    for vertex in graph.get_graph_elements():
-        if vertex not in visited:
-            component = []
-            stack = deque()
-            stack.append(vertex)
-            while stack:
-                current_vertex = stack.pop()
-                if current_vertex not in visited:
-                    visited.add(current_vertex)
-                    component.append(current_vertex)
-                    for neighbor in graph.get_neighbors(current_vertex):
-                        stack.append(neighbor)
-            graph_components.append(component)
-    graph_components.sort(key=lambda x: len(x), reverse=True)
-    graph_components_dict = {f"Component {idx+1}": component for idx, component in enumerate(graph_components)}
-    return graph_components_dict
+    return {component_id: list(component) for component_id, component in graph.get_components_index().ranked_components().items()}
+
+
+def _component_vertices(graph: Graph, graph_connected_component: str) -> list:
+    """
+    Gets a copy of the vertices of one component from the index cached on the graph
+    """
+    return list(graph.get_components_index().ranked_components()[graph_connected_component])
 
 
 """
@@ -133,7 +455,187 @@ Dado un artista, queremos conocer el camino mínimo (que sume la minima cantidad
 
 """
 
-def find_shortest_path_to_all(graph: Graph, vertex_id: str) -> dict:
+class Shortest_Paths(Mapping):
+    """
+    Shortest_Paths class (single-source result: the distance and predecessor of every reached vertex).
+    Paths are rebuilt on demand by walking the predecessors back to the source. It can also be read
+    as the dict {vertex_id: {'distance': distance, 'path': [vertex1, vertex2, ...]}} over all the graph vertices.
+    """
+    def __init__(self, graph: Graph, source: str, distances: dict, predecessors: dict):
+        self._graph = graph
+        self.source = source
+        self._distances = distances
+        self._predecessors = predecessors
+
+    def distance(self, vertex: str) -> float:
+        """
+        Gets the distance from the source to a vertex
+        :param vertex: the vertex name
+        :return: the distance (inf if it was not reached)
+        """
+        return self._distances.get(vertex, float('inf'))
+
+    def path(self, vertex: str) -> list:
+        """
+        Gets the path from the source to a vertex
+        :param vertex: the vertex name
+        :return: the list of vertices from the source to the vertex (empty if it was not reached)
+        """
+        if vertex not in self._distances:
+            return []
+        path = []
+        while vertex is not None:
+            path.append(vertex)
+            vertex = self._predecessors[vertex]
+        path.reverse()
+        return path
+
+    def predecessor(self, vertex: str) -> Optional[str]:
+        """
+        Gets the vertex before a vertex in its path from the source
+        :param vertex: the vertex name
+        :return: the predecessor (None for the source and for vertices that were not reached)
+        """
+        return self._predecessors.get(vertex)
+
+    def distances(self) -> dict:
+        """
+        Gets the distances of the reached vertices
+        :return: a dictionary with the format {vertex_id: distance}
+        """
+        return self._distances
+
+    def __getitem__(self, vertex: str) -> '_Path_Entry':
+        if not self._graph.vertex_exists(vertex):
+            raise KeyError(vertex)
+        return _Path_Entry(self, vertex)
+
+    def __iter__(self):
+        return iter(self._graph.get_graph_elements())
+
+    def __len__(self) -> int:
+        return len(self._graph.get_graph_elements())
+
+
+class Compact_Shortest_Paths(Shortest_Paths):
+    """
+    Compact_Shortest_Paths class (a Shortest_Paths read from distance and predecessor arrays by vertex id, as
+    Path_Cache keeps them, -1 for the vertices that were not reached). Nothing is converted until it is read.
+    """
+    def __init__(self, graph: Graph, source: str, vertices: Sequence[str], index_of: Callable[[str], int],
+                 distances: np.ndarray, predecessors: np.ndarray):
+        super().__init__(graph, source, None, None)
+        self._vertices = vertices
+        self._index_of = index_of
+        self._distance_array = distances
+        self._predecessor_array = predecessors
+
+    def _reached_id(self, vertex: str) -> int:
+        idx = self._index_of(vertex)
+        return idx if idx >= 0 and self._distance_array[idx] >= 0 else -1
+
+    def distance(self, vertex: str) -> float:
+        idx = self._reached_id(vertex)
+        return float('inf') if idx < 0 else self._distance_array[idx].item()
+
+    def path(self, vertex: str) -> list:
+        idx = self._reached_id(vertex)
+        path = []
+        while idx >= 0:
+            path.append(self._vertices[idx])
+            idx = int(self._predecessor_array[idx])
+        path.reverse()
+        return path
+
+    def predecessor(self, vertex: str) -> Optional[str]:
+        idx = self._reached_id(vertex)
+        if idx < 0 or self._predecessor_array[idx] < 0:
+            return None
+        return self._vertices[self._predecessor_array[idx]]
+
+    def distances(self) -> dict:
+        if self._distances is None:
+            reached = np.flatnonzero(self._distance_array >= 0)
+            self._distances = dict(zip([self._vertices[idx] for idx in reached.tolist()], self._distance_array[reached].tolist()))
+        return self._distances
+
+
+_id_space = {}
+
+
+def _vertex_ids(graph) -> tuple:
+    """
+    Gets the vertex ids of the current version of a graph: the positions of the vertices in get_graph_elements(),
+    the same ids as a Vectorized_Graph of it. Returns (vertices by id, function from vertex to id or -1).
+    The ids of a Graph are built once per version, only for the last version used.
+    """
+    if isinstance(graph, Vectorized_Graph):
+        return graph.vertices, graph.index_of
+    if isinstance(graph, (CSR_Graph, Actor_Projection)):
+        return graph.get_graph_elements(), graph.index_of
+    if _id_space.get('version') != graph.version():
+        vertices = list(graph.get_graph_elements())
+        index = {vertex: idx for idx, vertex in enumerate(vertices)}
+        _id_space.update(version=graph.version(), vertices=vertices, index_of=lambda vertex: index.get(vertex, -1))
+    return _id_space['vertices'], _id_space['index_of']
+
+
+def _pack(graph, results: Shortest_Paths, integral: bool) -> tuple:
+    """
+    Converts a Shortest_Paths into the (distances, predecessors) arrays by vertex id kept by Path_Cache
+    """
+    vertices, index_of = _vertex_ids(graph)
+    distances = np.full(len(vertices), -1, dtype=np.int64 if integral else np.float64)
+    predecessors = np.full(len(vertices), -1, dtype=np.int32)
+    reached = results.distances()
+    ids = np.fromiter((index_of(vertex) for vertex in reached), dtype=np.int64, count=len(reached))
+    distances[ids] = np.fromiter(reached.values(), dtype=distances.dtype, count=len(reached))
+    predecessors[ids] = np.fromiter((-1 if predecessor is None else index_of(predecessor) for predecessor in map(results.predecessor, reached)),
+                                    dtype=np.int32, count=len(reached))
+    return distances, predecessors
+
+
+def _cached_path(graph: Graph, start_vertex: str, end_vertex: str, weighting: str) -> tuple:
+    """
+    Gets the path between two vertices from a cached single-source result of either of them (the graph is undirected).
+    Returns (distance, path), or (None, None) if neither of them has one.
+    """
+    cached = PATH_CACHE.get_any(graph.version(), (start_vertex, end_vertex), weighting)
+    if cached is None:
+        return None, None
+    source, distances, predecessors = cached
+    target = end_vertex if source == start_vertex else start_vertex
+    results = Compact_Shortest_Paths(graph, source, *_vertex_ids(graph), distances, predecessors)
+    path = results.path(target)
+    if source != start_vertex: path.reverse()
+    return results.distance(target), path
+
+
+class _Path_Entry(Mapping):
+    """
+    Read-only {'distance': distance, 'path': [...]} view of one vertex of a Shortest_Paths
+    """
+    _KEYS = ('distance', 'path')
+
+    def __init__(self, results: Shortest_Paths, vertex: str):
+        self._results = results
+        self._vertex = vertex
+
+    def __getitem__(self, key: str):
+        if key == 'distance':
+            return self._results.distance(self._vertex)
+        if key == 'path':
+            return self._results.path(self._vertex)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+
+def find_shortest_path_to_all(graph: Graph, vertex_id: str, weighting: str = 'shared', use_cache: bool = True) -> Shortest_Paths:
     """
     Finds the shortest path from a vertex to all the other vertices in the graph.
 
@@ -143,28 +645,78 @@ def find_shortest_path_to_all(graph: Graph, vertex_id: str) -> dict:
         The graph to find the shortest path.
     vertex_id : str
         The vertex to start the search from.
+    weighting : str
+        The weight channel of the edges (see weight_channels.WEIGHT_CHANNELS): 'shared' the number of shared movies
+        (default), 'hops', 'inverse' or 'log' (the last two find the strongest connections).
+    use_cache : bool
+        Reuse and keep the result in PATH_CACHE, keyed by the graph version, the vertex and the weighting (default True).
     
     Returns
     -------
-    dict
-        A dictionary with the format {vertex_id: {'distance': distance, 'path': [vertex1, vertex2, ...]}}.
+    Shortest_Paths
+        The distances and predecessors from the vertex, also readable as a dictionary with the format {vertex_id: {'distance': distance, 'path': [vertex1, vertex2, ...]}}.
     """
-    results = {vertex: {'distance': float('inf'), 'path': []} for vertex in graph.get_graph_elements()}
-    results[vertex_id]['distance'] = 0
-    results[vertex_id]['path'] = [vertex_id]
+    weights = weight_table(weighting)
+    use_cache = use_cache and graph.vertex_exists(vertex_id)
+    if use_cache:
+        cached = PATH_CACHE.get(graph.version(), vertex_id, weighting)
+        if cached is not None:
+            return Compact_Shortest_Paths(graph, vertex_id, *_vertex_ids(graph), *cached)
+    distances = {vertex_id: 0}
+    predecessors = {vertex_id: None}
     heap = [(0, vertex_id)]
     while heap:
         current_distance, current_node = heapq.heappop(heap)
-        if current_distance > results[current_node]['distance']: continue
-        for neighbor in graph.get_neighbors(current_node):
-            weight = graph.get_edge_data(current_node, neighbor)
-            new_distance = results[current_node]['distance'] + len(weight)
-            if new_distance < results[neighbor]['distance']:
-                results[neighbor]['distance'] = new_distance
-                results[neighbor]['path'] = results[current_node]['path'] + [neighbor]
+        if current_distance > distances[current_node]: continue
+        for neighbor, weight in graph.neighbors_with_data(current_node):
+            new_distance = current_distance + weights[len(weight)]
+            if new_distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = new_distance
+                predecessors[neighbor] = current_node
                 heapq.heappush(heap, (new_distance, neighbor))
+    results = Shortest_Paths(graph, vertex_id, distances, predecessors)
+    if use_cache:
+        PATH_CACHE.put(graph.version(), vertex_id, weighting, *_pack(graph, results, weights.integral))
     return results
 
+
+def find_shortest_path_to_all_dial(graph: Vectorized_Graph, vertex_id: str, weighting: str = 'shared', use_cache: bool = True) -> Shortest_Paths:
+    """
+    Finds the shortest path from a vertex to all the other vertices in the graph, with the weights of a channel
+    precomputed next to the adjacency and a bucket queue instead of a heap (see vectorized_bfs.dial_dijkstra).
+
+    Parameters
+    ----------
+    graph : Vectorized_Graph
+        The vectorized graph to find the shortest path.
+    vertex_id : str
+        The vertex to start the search from.
+    weighting : str
+        The weight channel of the edges, as find_shortest_path_to_all (default 'shared').
+    use_cache : bool
+        Reuse and keep the result in PATH_CACHE, as find_shortest_path_to_all (default True, it needs a graph with versions).
+
+    Returns
+    -------
+    Shortest_Paths
+        The distances and predecessors from the vertex, as find_shortest_path_to_all. The distances are the same,
+        the paths can differ between paths of the same length.
+    """
+    source = graph.index_of(vertex_id)
+    if source < 0:
+        return Shortest_Paths(graph.graph, vertex_id, {vertex_id: 0}, {vertex_id: None})
+    use_cache = use_cache and graph.version() is not None
+    cached = PATH_CACHE.get(graph.version(), vertex_id, weighting) if use_cache else None
+    if cached is not None:
+        return Compact_Shortest_Paths(graph.graph, vertex_id, graph.vertices, graph.index_of, *cached)
+    distances, parents = dial_dijkstra(graph, source, graph.edge_weights(weighting))
+    if use_cache:
+        PATH_CACHE.put(graph.version(), vertex_id, weighting, distances, parents)
+    reached = (distances >= 0).nonzero()[0]
+    names = [graph.vertices[idx] for idx in reached.tolist()]
+    parent_names = [None if parent < 0 else graph.vertices[parent] for parent in parents[reached].tolist()]
+    return Shortest_Paths(graph.graph, vertex_id, dict(zip(names, distances[reached].tolist())), dict(zip(names, parent_names)))
+
 """	
 Ejercicio 3
 
@@ -172,9 +724,219 @@ Queremos conocer el camino minimo (con pesos) entre cualquier par de artistas. 
 
 """
 
-def find_shortest_path_between_vertices(graph: Graph, start_vertex: str, end_vertex: str) -> tuple: 
+class Landmarks:
+    """
+    Landmarks class (distances from a few landmark vertices to every vertex, used as an ALT lower bound).
+    By the triangle inequality |d(L, t) - d(L, v)| <= d(v, t) for every landmark L, with the distances
+    of the weight channel the landmarks were built with.
     """
-    Finds the shortest path between two vertices.
+    def __init__(self, landmarks: List[str], vertices: Sequence[str], distances: Sequence[float], weighting: str = 'shared',
+                 number_of_landmarks: Optional[int] = None, graph_size: Optional[tuple] = None):
+        self.landmarks = landmarks
+        self._vertices = vertices
+        self._distances = distances
+        self.weighting = weighting
+        self.number_of_landmarks = len(landmarks) if number_of_landmarks is None else number_of_landmarks  # the requested count
+        self.graph_size = graph_size  # (vertices, edges) of the graph they were built on, see _graph_size
+
+    def _index_of(self, vertex: str) -> int:
+        idx = bisect_left(self._vertices, vertex)
+        if idx < len(self._vertices) and self._vertices[idx] == vertex:
+            return idx
+        return -1
+
+    def distances_to(self, vertex: str) -> List[float]:
+        """
+        Gets the distances from every landmark to a vertex
+        :param vertex: the vertex name
+        :return: a list with one distance per landmark (inf if not reachable or unknown)
+        """
+        idx = self._index_of(vertex)
+        if idx < 0:
+            return [float('inf')] * len(self.landmarks)
+        number_of_vertices = len(self._vertices)
+        return [self._distances[landmark * number_of_vertices + idx] for landmark in range(len(self.landmarks))]
+
+    def heuristic_to(self, end_vertex: str):
+        """
+        Gets the ALT lower bound to a target vertex
+        :param end_vertex: the target vertex
+        :return: a function that maps a vertex to a lower bound of its distance to the target
+        """
+        target_distances = self.distances_to(end_vertex)
+
+        def heuristic(vertex: str) -> float:
+            bound = 0
+            for target_distance, vertex_distance in zip(target_distances, self.distances_to(vertex)):
+                if target_distance == float('inf') or vertex_distance == float('inf'):
+                    if target_distance != vertex_distance: return float('inf')
+                    continue
+                bound = max(bound, abs(target_distance - vertex_distance))
+            return bound
+        return heuristic
+
+    def save(self, path: str, sources: Sequence[str]) -> None:
+        """
+        Saves the landmarks as a snapshot file (stored next to the graph snapshot)
+        :param path: the landmarks file
+        :param sources: the source files the graph was built from
+        """
+        shape = array('q', [self.number_of_landmarks, *(self.graph_size or (-1, -1))])
+        write_snapshot(path, sections={"distances": array('d', self._distances), "shape": shape},
+                       strings={"landmarks": self.landmarks, "vertices": list(self._vertices), "weighting": [self.weighting]},
+                       sources=sources)
+
+    @classmethod
+    def load(cls, path: str) -> 'Landmarks':
+        """
+        Opens a landmarks file without copying its distances
+        :param path: the landmarks file
+        :return: the Landmarks
+        """
+        snapshot = Snapshot(path)
+        weighting = snapshot.strings("weighting")[0] if snapshot.has_section("weighting.offsets") else 'shared'
+        number_of_landmarks, graph_size = None, None
+        if snapshot.has_section("shape"):
+            number_of_landmarks, vertices, edges = snapshot.section("shape")
+            graph_size = (vertices, edges) if vertices >= 0 else None
+        return cls(list(snapshot.strings("landmarks")), snapshot.strings("vertices"), snapshot.section("distances"), weighting,
+                   number_of_landmarks, graph_size)
+
+
+def _graph_size(graph: Graph) -> tuple:
+    """
+    Gets the number of vertices and edges of a graph, the fingerprint that tells whether saved landmarks still match it
+    """
+    if hasattr(graph, 'number_of_edges'):
+        return graph.number_of_vertices(), graph.number_of_edges()
+    vertices = graph.get_graph_elements()
+    return len(vertices), sum(map(graph.degree, vertices)) // 2
+
+
+def build_landmarks(graph: Graph, number_of_landmarks: int = 8, weighting: str = 'shared') -> Landmarks:
+    """
+    Chooses landmarks by farthest selection (starting at the vertex with the most neighbors) and computes their distances.
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph to find the landmarks.
+    number_of_landmarks : int
+        The number of landmarks (default 8).
+    weighting : str
+        The weight channel of the distances, as find_shortest_path_to_all (default 'shared').
+
+    Returns
+    -------
+    Landmarks
+        The landmarks and their distances to every vertex.
+    """
+    vertices = sorted(graph.get_graph_elements())
+    landmarks = []
+    distances = array('d')
+    closest_landmark = {}
+    candidate = max(vertices, key=graph.degree, default=None)
+    while candidate is not None and len(landmarks) < number_of_landmarks:
+        landmarks.append(candidate)
+        landmark_distances = find_shortest_path_to_all(graph, candidate, weighting).distances()
+        distances.extend(landmark_distances.get(vertex, float('inf')) for vertex in vertices)
+        for vertex, distance in landmark_distances.items():
+            closest_landmark[vertex] = min(distance, closest_landmark.get(vertex, float('inf')))
+        candidate = max((vertex for vertex in closest_landmark if closest_landmark[vertex] > 0),
+                        key=closest_landmark.get, default=None)
+    return Landmarks(landmarks, vertices, distances, weighting, number_of_landmarks, _graph_size(graph))
+
+
+def load_or_build_landmarks(graph: Graph, path: str, sources: Sequence[str], number_of_landmarks: int = 8,
+                            weighting: str = 'shared') -> Landmarks:
+    """
+    Opens the landmarks file, rebuilding it first if it is missing, unreadable, the source files changed, or it was built
+    with another weight channel, another number of landmarks or on a graph with other vertex and edge counts (for
+    example before apply_movie_delta).
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph built from the source files.
+    path : str
+        The landmarks file.
+    sources : Sequence[str]
+        The source files.
+    number_of_landmarks : int
+        The number of landmarks if they are rebuilt (default 8).
+    weighting : str
+        The weight channel of the distances (default 'shared').
+
+    Returns
+    -------
+    Landmarks
+        The landmarks and their distances to every vertex.
+    """
+    if fresh_snapshot(path, sources) is not None:
+        landmarks = Landmarks.load(path)
+        if landmarks.weighting == weighting and landmarks.number_of_landmarks == number_of_landmarks \
+                and landmarks.graph_size == _graph_size(graph):
+            return landmarks
+    landmarks = build_landmarks(graph, number_of_landmarks, weighting)
+    landmarks.save(path, sources)
+    return landmarks
+
+
+def _bidirectional_dijkstra(graph: Graph, start_vertex: str, end_vertex: str,
+                            landmarks: Optional[Landmarks] = None, weighting: str = 'shared') -> tuple:
+    """
+    Dijkstra from both ends at once, always expanding the side with the smallest key. It stops when the
+    two smallest keys add up to at least the best path seen through an edge joining both searches.
+    With landmarks, a vertex is not pushed when its distance plus the landmark lower bound to the other
+    end already reaches the best path (no vertex of a shorter path can be discarded that way).
+    """
+    weights = weight_table(weighting)
+    ends = (end_vertex, start_vertex)
+    heuristics = (landmarks.heuristic_to(end_vertex), landmarks.heuristic_to(start_vertex)) if landmarks else None
+    distances = ({start_vertex: 0}, {end_vertex: 0})
+    predecessors = ({start_vertex: None}, {end_vertex: None})
+    heaps = ([(0, start_vertex)], [(0, end_vertex)])
+    best_distance = float('inf')
+    meeting_edge = None
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= best_distance: break
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        current_distance, current_node = heapq.heappop(heaps[side])
+        if current_distance > distances[side][current_node]: continue
+        other_distances = distances[1 - side]
+        for neighbor, weight in graph.neighbors_with_data(current_node):
+            new_distance = current_distance + weights[len(weight)]
+            if neighbor in other_distances and new_distance + other_distances[neighbor] < best_distance:
+                best_distance = new_distance + other_distances[neighbor]
+                meeting_edge = (current_node, neighbor) if side == 0 else (neighbor, current_node)
+            if new_distance < distances[side].get(neighbor, float('inf')):
+                if heuristics and neighbor != ends[side] and new_distance + heuristics[side](neighbor) >= best_distance:
+                    continue
+                distances[side][neighbor] = new_distance
+                predecessors[side][neighbor] = current_node
+                heapq.heappush(heaps[side], (new_distance, neighbor))
+    if meeting_edge is None:
+        return float('inf'), []
+    path = []
+    vertex = meeting_edge[0]
+    while vertex is not None:
+        path.append(vertex)
+        vertex = predecessors[0][vertex]
+    path.reverse()
+    vertex = meeting_edge[1]
+    while vertex is not None:
+        path.append(vertex)
+        vertex = predecessors[1][vertex]
+    return best_distance, path
+
+
+def find_shortest_path_between_vertices(graph: Graph, start_vertex: str, end_vertex: str,
+                                        landmarks: Optional[Landmarks] = None, weighting: str = 'shared',
+                                        use_cache: bool = True) -> tuple: 
+    """
+    Finds the shortest path between two vertices with a bidirectional Dijkstra that stops as soon as the path is known
+    (pruned with the landmarks lower bound when landmarks are given). If either vertex has a single-source result
+    in PATH_CACHE for the same graph version and weighting, the path is read from it instead.
 
     Parameters
     ----------
@@ -184,6 +946,12 @@ def find_shortest_path_between_vertices(graph: Graph, start_vertex: str, end_ver
         The vertex to start the search from.
     end_vertex : str
         The vertex to end the search.
+    landmarks : Landmarks
+        Optional landmarks of the graph (see build_landmarks), built with the same weight channel.
+    weighting : str
+        The weight channel of the edges, as find_shortest_path_to_all (default 'shared').
+    use_cache : bool
+        Read the path from PATH_CACHE when possible (default True).
 
     Returns
     -------
@@ -191,12 +959,20 @@ def find_shortest_path_between_vertices(graph: Graph, start_vertex: str, end_ver
         A tuple with the format (distance, list with the vertices that make up the path, execution time).
         
     """
+    if landmarks is not None and landmarks.weighting != weighting:
+        raise ValueError(f"The landmarks were built with the {landmarks.weighting} weights, not {weighting}")
     start_time = time.time()
-    short_paths = find_shortest_path_to_all(graph, start_vertex)
-    the_path = short_paths[end_vertex]
+    if not graph.vertex_exists(start_vertex) or not graph.vertex_exists(end_vertex):
+        distance, path = float('inf'), []
+    elif start_vertex == end_vertex:
+        distance, path = 0, [start_vertex]
+    else:
+        distance, path = _cached_path(graph, start_vertex, end_vertex, weighting) if use_cache else (None, None)
+        if path is None:
+            distance, path = _bidirectional_dijkstra(graph, start_vertex, end_vertex, landmarks, weighting)
     end_time = time.time()
     elapsed_time = end_time - start_time
-    return the_path['distance'], the_path['path'], elapsed_time
+    return distance, path, elapsed_time
 
 """
 Ejercicio 4
@@ -207,7 +983,7 @@ b) Estime el diámetro del grafo utilizando el tiempo dado
 
 """
 
-def find_shortest_path_to_all_without_weights(graph: Graph, vertex_id: str) -> dict:
+def find_shortest_path_to_all_without_weights(graph: Graph, vertex_id: str) -> Shortest_Paths:
     """
     Finds the shortest path from a vertex to all the other vertices in the graph without considering the weights.
 
@@ -220,28 +996,54 @@ def find_shortest_path_to_all_without_weights(graph: Graph, vertex_id: str) -> d
     
     Returns
     -------
-    dict
-        A dictionary with the format {vertex_id: {'distance': distance, 'path': [vertex1, vertex2, ...]}}.
+    Shortest_Paths
+        The distances and predecessors from the vertex, also readable as a dictionary with the format {vertex_id: {'distance': distance, 'path': [vertex1, vertex2, ...]}}.
     """
-    visited = set()
-    results = {vertex: {'distance': float('inf'), 'path': []} for vertex in graph.get_graph_elements()}
-    results[vertex_id]['distance'] = 0
-    results[vertex_id]['path'] = [vertex_id]
-    queue = deque([(vertex_id, 0)])
+    distances = {vertex_id: 0}
+    predecessors = {vertex_id: None}
+    queue = deque([vertex_id])
     while queue:
-        current_node, current_distance = queue.popleft()
-        if current_node in visited: continue
-        visited.add(current_node)
-        for neighbor in graph.get_neighbors(current_node):
-            new_distance = current_distance + 1
-            if new_distance < results[neighbor]['distance']:
-                results[neighbor]['distance'] = new_distance
-                results[neighbor]['path'] = results[current_node]['path'] + [neighbor]
-                queue.append((neighbor, new_distance))
-    return results
+        current_node = queue.popleft()
+        new_distance = distances[current_node] + 1
+        for neighbor in graph.neighbors(current_node):
+            if neighbor not in distances:
+                distances[neighbor] = new_distance
+                predecessors[neighbor] = current_node
+                queue.append(neighbor)
+    return Shortest_Paths(graph, vertex_id, distances, predecessors)
 
 
-def find_diameter(graph: Graph, graph_connected_component: str, execution_time: int = 900) -> tuple: 
+def find_shortest_path_to_all_vectorized(graph: Vectorized_Graph, vertex_id: str, direction_optimizing: bool = False) -> Shortest_Paths:
+    """
+    Finds the shortest path from a vertex to all the other vertices in the graph without considering the weights,
+    expanding whole BFS levels with NumPy (see vectorized_bfs.bfs).
+
+    Parameters
+    ----------
+    graph : Vectorized_Graph
+        The vectorized graph to find the shortest path.
+    vertex_id : str
+        The vertex to start the search from.
+    direction_optimizing : bool
+        Allow bottom-up levels (default False). The distances are the same either way, but only without them
+        the paths are the same as the ones of find_shortest_path_to_all_without_weights.
+
+    Returns
+    -------
+    Shortest_Paths
+        The distances and predecessors from the vertex, as find_shortest_path_to_all_without_weights.
+    """
+    source = graph.index_of(vertex_id)
+    if source < 0:
+        return Shortest_Paths(graph.graph, vertex_id, {vertex_id: 0}, {vertex_id: None})
+    distances, parents = bfs(graph, source, direction_optimizing=direction_optimizing)
+    reached = (distances >= 0).nonzero()[0]
+    names = [graph.vertices[idx] for idx in reached.tolist()]
+    parent_names = [None if parent < 0 else graph.vertices[parent] for parent in parents[reached].tolist()]
+    return Shortest_Paths(graph.graph, vertex_id, dict(zip(names, distances[reached].tolist())), dict(zip(names, parent_names)))
+
+
+def find_diameter(graph: Graph, graph_connected_component: str, execution_time: int = 900, workers: int = 1, bit_parallel: bool = False) -> tuple: 
     """
     Finds the diameter of a graph connected component (exact or approximate).
 
@@ -253,6 +1055,10 @@ def find_diameter(graph: Graph, graph_connected_component: str, execution_time:
         The connected component to find the diameter.
     execution_time : int
         The time to find the diameter (default 900 seconds).
+    workers : int
+        The number of processes running the BFS (default 1, see parallel_bfs.multi_source_bfs).
+    bit_parallel : bool
+        Run the BFS 64 sources at a time (default False, see vectorized_bfs.bit_parallel_bfs).
     
     Returns
     -------
@@ -263,21 +1069,89 @@ def find_diameter(graph: Graph, graph_connected_component: str, execution_time:
     number_of_vertices_analyzed = 0
     total_time = 0
     time_to_finish = 0
-    connected_component = find_connected_components(graph)[graph_connected_component]
+    connected_component = _component_vertices(graph, graph_connected_component)
     random.shuffle(connected_component)
     start_time = time.time()
-    for vertex in connected_component:
-        if time.time() - start_time >= execution_time: break
-        number_of_vertices_analyzed += 1
-        separations = find_shortest_path_to_all_without_weights(graph, vertex)
-        for separation in separations.values():
-            if separation['distance'] == float('inf'): continue
-            if separation['distance'] > diameter: diameter = separation['distance']    
+    if workers > 1 or bit_parallel:
+        if bit_parallel: source_stats = bit_parallel_bfs(graph, connected_component, execution_time)
+        else: source_stats = multi_source_bfs(graph, connected_component, workers, execution_time)
+        number_of_vertices_analyzed = len(source_stats)
+        diameter = max((eccentricity for eccentricity, _ in source_stats.values()), default=0)
+    else:
+        for vertex in connected_component:
+            if time.time() - start_time >= execution_time: break
+            number_of_vertices_analyzed += 1
+            separations = find_shortest_path_to_all_without_weights(graph, vertex)
+            diameter = max(diameter, max(separations.distances().values()))
     end_time = time.time()
     total_time = len(connected_component)*((end_time - start_time)/number_of_vertices_analyzed)
     time_to_finish = total_time - (end_time - start_time)
     return diameter, total_time, time_to_finish
 
+def find_exact_diameter(graph: Graph, graph_connected_component: str, execution_time: int = 900, progress: bool = True) -> tuple:
+    """
+    Finds the exact diameter of a graph connected component by bounding eccentricities (double sweep + iFUB).
+    A double sweep gives a lower bound and a central root. Then the BFS levels of the root are visited from the
+    farthest one: every vertex at level i or closer has eccentricity at most 2i, so once the lower bound exceeds
+    2(i - 1) no other vertex can beat it.
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph to find the diameter.
+    graph_connected_component : str
+        The connected component to find the diameter.
+    execution_time : int
+        The maximum time to find the diameter (default 900 seconds).
+    progress : bool
+        Print the [lower, upper] interval every time it changes (default True).
+
+    Returns
+    -------
+    tuple
+        A tuple with the format (lower bound, upper bound, number of BFS runs, total time). Both bounds are equal to the diameter when it finished in time.
+    """
+    start_time = time.time()
+    connected_component = _component_vertices(graph, graph_connected_component)
+    number_of_bfs = 0
+
+    def eccentricity(vertex: str) -> tuple:
+        nonlocal number_of_bfs
+        number_of_bfs += 1
+        separations = find_shortest_path_to_all_without_weights(graph, vertex)
+        distances = separations.distances()
+        farthest = max(distances, key=distances.get)
+        return distances[farthest], farthest, separations
+
+    def report(lower_bound, upper_bound):
+        if progress: print(f"Diameter in [{lower_bound}, {upper_bound}] after {number_of_bfs} BFS")
+
+    start_vertex = max(connected_component, key=graph.degree)
+    _, first_end, _ = eccentricity(start_vertex)
+    lower_bound, second_end, sweep = eccentricity(first_end)
+    sweep_path = sweep.path(second_end)
+    root = sweep_path[len(sweep_path) // 2]
+    root_eccentricity, _, root_separations = eccentricity(root)
+    lower_bound = max(lower_bound, root_eccentricity)
+    upper_bound = 2 * root_eccentricity
+    report(lower_bound, upper_bound)
+    levels = {}
+    for vertex, distance in root_separations.distances().items():
+        levels.setdefault(distance, []).append(vertex)
+    level = root_eccentricity
+    while lower_bound < upper_bound and level > 0:
+        for vertex in levels[level]:
+            if time.time() - start_time >= execution_time:
+                report(lower_bound, upper_bound)
+                return lower_bound, upper_bound, number_of_bfs, time.time() - start_time
+            lower_bound = max(lower_bound, eccentricity(vertex)[0])
+            if lower_bound >= upper_bound: break
+        if lower_bound > 2 * (level - 1): upper_bound = lower_bound
+        else: upper_bound = 2 * (level - 1)
+        level -= 1
+        report(lower_bound, upper_bound)
+    return lower_bound, upper_bound, number_of_bfs, time.time() - start_time
+
 """
 Ejercicio 5
 
@@ -285,7 +1159,7 @@ Ejercicio 5
 
 """
 
-def average_separations(graph: Graph, graph_connected_component: str, execution_time: int = 900) -> tuple:
+def average_separations(graph: Graph, graph_connected_component: str, execution_time: int = 900, workers: int = 1, bit_parallel: bool = False) -> tuple:
     """
     Finds the average separations for each vertex and for all the vertices in the graph connected component.
 
@@ -297,6 +1171,10 @@ def average_separations(graph: Graph, graph_connected_component: str, execution_
         The connected component to find the average separations.
     execution_time : int
         The time to find the average separations (default 900 seconds).
+    workers : int
+        The number of processes running the BFS (default 1, see parallel_bfs.multi_source_bfs).
+    bit_parallel : bool
+        Run the BFS 64 sources at a time (default False, see vectorized_bfs.bit_parallel_bfs).
 
     Returns
     -------
@@ -308,25 +1186,91 @@ def average_separations(graph: Graph, graph_connected_component: str, execution_
     time_to_finish = 0
     total_average = 0
     average_per_vertex = {}
-    connected_component = find_connected_components(graph)[graph_connected_component]
+    connected_component = _component_vertices(graph, graph_connected_component)
     random.shuffle(connected_component)
     start_time = time.time()
-    for vertex in connected_component:
-        if time.time() - start_time >= execution_time: break
-        number_of_vertices_analyzed += 1
-        vertex_separation = 0
-        separations = find_shortest_path_to_all_without_weights(graph, vertex)
-        for separation in separations.values():
-            if separation['distance'] == float('inf'): continue
-            vertex_separation += separation['distance']
-        average_per_vertex[vertex] = vertex_separation / len(connected_component)
-        total_average += vertex_separation / len(connected_component)
+    if workers > 1 or bit_parallel:
+        if bit_parallel: source_stats = bit_parallel_bfs(graph, connected_component, execution_time)
+        else: source_stats = multi_source_bfs(graph, connected_component, workers, execution_time)
+        number_of_vertices_analyzed = len(source_stats)
+        for vertex, (_, vertex_separation) in source_stats.items():
+            average_per_vertex[vertex] = vertex_separation / len(connected_component)
+            total_average += vertex_separation / len(connected_component)
+    else:
+        for vertex in connected_component:
+            if time.time() - start_time >= execution_time: break
+            number_of_vertices_analyzed += 1
+            vertex_separation = 0
+            separations = find_shortest_path_to_all_without_weights(graph, vertex)
+            vertex_separation += sum(separations.distances().values())
+            average_per_vertex[vertex] = vertex_separation / len(connected_component)
+            total_average += vertex_separation / len(connected_component)
     end_time = time.time()
     total_average = total_average / len(average_per_vertex)
     total_time = len(connected_component)*((end_time - start_time)/number_of_vertices_analyzed)
     time_to_finish = total_time - (end_time - start_time)
     return average_per_vertex, total_average, total_time, time_to_finish
 
+
+def separation_statistics(graph: Graph, graph_connected_component: str, execution_time: int = 900) -> tuple:
+    """
+    Finds the diameter and the average separations of a graph connected component with a single pass of
+    bit-parallel BFS (64 sources at a time, see vectorized_bfs.bit_parallel_bfs).
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph to analyze.
+    graph_connected_component : str
+        The connected component to analyze.
+    execution_time : int
+        The time to analyze the connected component (default 900 seconds).
+
+    Returns
+    -------
+    tuple
+        A tuple with the format (diameter, average separations for each vertex, average separations for all the vertices, total time, time to finish).
+        The diameter is a lower bound when not every vertex was analyzed.
+    """
+    connected_component = _component_vertices(graph, graph_connected_component)
+    random.shuffle(connected_component)
+    start_time = time.time()
+    source_stats = bit_parallel_bfs(graph, connected_component, execution_time)
+    end_time = time.time()
+    diameter = max((eccentricity for eccentricity, _ in source_stats.values()), default=0)
+    average_per_vertex = {vertex: distance_sum / len(connected_component) for vertex, (_, distance_sum) in source_stats.items()}
+    total_average = sum(average_per_vertex.values()) / len(average_per_vertex)
+    total_time = len(connected_component)*((end_time - start_time)/len(source_stats))
+    time_to_finish = total_time - (end_time - start_time)
+    return diameter, average_per_vertex, total_average, total_time, time_to_finish
+
+
+def distance_distribution(graph: Graph, graph_connected_component: str, registers_log2: int = 6, runs: int = 4, seed: int = 0) -> Distance_Distribution:
+    """
+    Estimates the distribution of the distances between the vertices of a graph connected component with HyperANF
+    (see hyperanf.hyper_anf), without running a BFS from any vertex.
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph to analyze.
+    graph_connected_component : str
+        The connected component to analyze.
+    registers_log2 : int
+        The log2 of the number of registers of every counter (default 6, the memory is 2**registers_log2 bytes per vertex).
+    runs : int
+        The number of independent runs averaged together (default 4).
+    seed : int
+        The seed of the hash function (default 0).
+
+    Returns
+    -------
+    Distance_Distribution
+        The estimated number of pairs at every distance with its standard error, the mean separation, the effective diameter and a lower bound of the diameter.
+    """
+    connected_component = _component_vertices(graph, graph_connected_component)
+    return hyper_anf(graph, connected_component, registers_log2, runs, seed)
+
 """
 Ejercicio 6
 
@@ -334,9 +1278,256 @@ Ejercicio 6
 
 """
 
+def _shortest_path_dag(graph: Graph, source: str, weighted: bool, weighting: str = 'shared', target: Optional[str] = None) -> tuple:
+    """
+    Single-source shortest paths counting them (sigma) and keeping every predecessor on a shortest path.
+    The weights are the ones of the weighting channel when weighted, otherwise every edge counts 1.
+    With a target the search stops when it is settled: its sigma and the predecessors of every vertex on its
+    shortest paths are final by then, the rest can be partial.
+    Returns (vertices in non-decreasing distance order, predecessors, sigma, distances).
+    """
+    order = []
+    predecessors = {source: []}
+    sigma = {source: 1}
+    distances = {source: 0}
+    if not weighted:
+        queue = deque([source])
+        while queue:
+            current_node = queue.popleft()
+            order.append(current_node)
+            if current_node == target: break
+            new_distance = distances[current_node] + 1
+            for neighbor in graph.neighbors(current_node):
+                if neighbor not in distances:
+                    distances[neighbor] = new_distance
+                    sigma[neighbor] = 0
+                    predecessors[neighbor] = []
+                    queue.append(neighbor)
+                if distances[neighbor] == new_distance:
+                    sigma[neighbor] += sigma[current_node]
+                    predecessors[neighbor].append(current_node)
+        return order, predecessors, sigma, distances
+    weights = weight_table(weighting)
+    settled = set()
+    heap = [(0, source)]
+    while heap:
+        current_distance, current_node = heapq.heappop(heap)
+        if current_node in settled: continue
+        settled.add(current_node)
+        order.append(current_node)
+        if current_node == target: break
+        for neighbor, weight in graph.neighbors_with_data(current_node):
+            new_distance = current_distance + weights[len(weight)]
+            if new_distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = new_distance
+                sigma[neighbor] = sigma[current_node]
+                predecessors[neighbor] = [current_node]
+                heapq.heappush(heap, (new_distance, neighbor))
+            elif new_distance == distances[neighbor] and neighbor not in settled:
+                sigma[neighbor] += sigma[current_node]
+                predecessors[neighbor].append(current_node)
+    return order, predecessors, sigma, distances
+
+
+def _choose_predecessor(generator: random.Random, vertex: str, predecessors: dict, sigma: dict) -> str:
+    # Every predecessor with probability proportional to its number of shortest paths
+    choice = generator.random() * sigma[vertex]
+    for predecessor in predecessors[vertex]:
+        choice -= sigma[predecessor]
+        if choice < 0: break
+    return predecessor
+
+
+def _sample_path_bidirectional(graph: Graph, source: str, target: str, generator: random.Random) -> Optional[list]:
+    """
+    Chooses a shortest path between two vertices uniformly at random with a balanced bidirectional BFS: the side
+    whose frontier has fewer edges expands one whole level, until the levels meet. Every shortest path goes
+    through exactly one vertex of the meeting level, so one of them is chosen with probability proportional to the
+    product of its number of paths from each side, and the path is walked back to both ends from it.
+    Returns the inner vertices of the path, or None if the vertices are not connected.
+    """
+    ends = (source, target)
+    predecessors = ({source: []}, {target: []})
+    sigma = ({source: 1}, {target: 1})
+    frontiers = [[source], [target]]
+    meeting = []
+    while not meeting:
+        if not frontiers[0] or not frontiers[1]: return None
+        side = 0 if sum(map(graph.degree, frontiers[0])) <= sum(map(graph.degree, frontiers[1])) else 1
+        side_predecessors, side_sigma = predecessors[side], sigma[side]
+        next_frontier = []
+        discovered = set()
+        for current_node in frontiers[side]:
+            for neighbor in graph.neighbors(current_node):
+                if neighbor not in side_sigma:
+                    side_sigma[neighbor] = 0
+                    side_predecessors[neighbor] = []
+                    next_frontier.append(neighbor)
+                    discovered.add(neighbor)
+                if neighbor in discovered:
+                    side_sigma[neighbor] += side_sigma[current_node]
+                    side_predecessors[neighbor].append(current_node)
+        frontiers[side] = next_frontier
+        meeting = [vertex for vertex in next_frontier if vertex in sigma[1 - side]]
+    choice = generator.random() * sum(sigma[0][vertex] * sigma[1][vertex] for vertex in meeting)
+    for middle in meeting:
+        choice -= sigma[0][middle] * sigma[1][middle]
+        if choice < 0: break
+    path = [] if middle in ends else [middle]
+    for side in (0, 1):
+        vertex = middle
+        while vertex != ends[side]:
+            vertex = _choose_predecessor(generator, vertex, predecessors[side], sigma[side])
+            if vertex != ends[side]: path.append(vertex)
+    return path
+
+
+def _accumulate_dependencies(scores: dict, source: str, order: list, predecessors: dict, sigma: dict) -> None:
+    dependency = dict.fromkeys(order, 0.0)
+    for vertex in reversed(order):
+        coefficient = (1 + dependency[vertex]) / sigma[vertex]
+        for predecessor in predecessors[vertex]:
+            dependency[predecessor] += sigma[predecessor] * coefficient
+        if vertex != source:
+            scores[vertex] = scores.get(vertex, 0.0) + dependency[vertex]
+
+
+def brandes_betweenness(graph: Graph, weighted: bool = False, sources: Optional[Sequence[str]] = None,
+                        execution_time: Optional[float] = None, weighting: str = 'shared') -> tuple:
+    """
+    Finds the betweenness centrality of every vertex with Brandes' algorithm (shortest path counting and dependency accumulation).
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph to find the betweenness centrality.
+    weighted : bool
+        Use the number of shared titles as the edge weight instead of 1 (default False).
+    sources : Sequence[str]
+        The sources to accumulate from (default all the vertices, which gives the exact centrality).
+    execution_time : float
+        Optional time budget, the sources not processed by then are skipped.
+    weighting : str
+        The weight channel when weighted, as find_shortest_path_to_all (default 'shared'). Ties between paths are
+        exact with the integer channels, with 'inverse' and 'log' they depend on floating point sums.
+
+    Returns
+    -------
+    tuple
+        A tuple with the format (dictionary {vertex_id: centrality}, number of sources processed). The graph is undirected, so every pair is counted once.
+    """
+    scores = {}
+    number_of_sources = 0
+    start_time = time.time()
+    for source in (graph.get_graph_elements() if sources is None else sources):
+        if execution_time is not None and time.time() - start_time >= execution_time: break
+        number_of_sources += 1
+        order, predecessors, sigma, _ = _shortest_path_dag(graph, source, weighted, weighting)
+        _accumulate_dependencies(scores, source, order, predecessors, sigma)
+    return {vertex: score / 2 for vertex, score in scores.items()}, number_of_sources
+
+
+def approximate_betweenness(graph: Graph, epsilon: float = 0.01, delta: float = 0.1, weighted: bool = False,
+                            seed: Optional[int] = None, weighting: str = 'shared', execution_time: Optional[float] = None,
+                            max_samples: Optional[int] = None) -> tuple:
+    """
+    Estimates the betweenness centrality by sampling shortest paths (Riondato–Kornaropoulos). The number of samples
+    depends only on epsilon, delta and a bound of the vertex diameter: with probability 1 - delta, every estimate
+    is within epsilon * n(n - 1) / 2 of the exact centrality. Without weights every path is sampled with a balanced
+    bidirectional BFS, with weights the search from the source stops when the target is settled. If the time budget or max_samples stop the sampling early, the estimates are scaled
+    to the samples taken and the error bound grows to the one those samples guarantee.
+
+    Parameters
+    ----------
+    graph : Graph
+        The graph to find the betweenness centrality.
+    epsilon : float
+        The additive error, as a fraction of the number of pairs (default 0.01).
+    delta : float
+        The probability of exceeding the error (default 0.1).
+    weighted : bool
+        Use the number of shared titles as the edge weight instead of 1 (default False).
+    seed : int
+        Optional seed of the sampling.
+    weighting : str
+        The weight channel when weighted, as brandes_betweenness (default 'shared').
+    execution_time : float
+        Optional time budget for the sampling.
+    max_samples : int
+        Optional cap on the number of samples.
+
+    Returns
+    -------
+    tuple
+        A tuple with the format (dictionary {vertex_id: estimated centrality}, number of samples taken, error bound), in the same scale as brandes_betweenness.
+    """
+    generator = random.Random(seed)
+    vertices = list(graph.get_graph_elements())
+    number_of_vertices = len(vertices)
+    if number_of_vertices < 2: return {}, 0, 0.0
+    # With integer weights every edge weighs at least 1, so a shortest path never has more hops than its length,
+    # and no component has a longer shortest path than twice the eccentricity of any of its vertices.
+    # Lighter edges give no such bound, and the number of vertices of the component is used instead
+    integral = not weighted or weight_table(weighting).integral
+    vertex_diameter = 2
+    for component in graph.get_components_index().ranked_components().values():
+        if len(component) <= vertex_diameter: break
+        if not integral:
+            vertex_diameter = len(component)
+            continue
+        _, _, _, distances = _shortest_path_dag(graph, component[0], weighted, weighting)
+        vertex_diameter = max(vertex_diameter, min(len(component), 2 * max(distances.values()) + 1))
+    confidence = math.floor(math.log2(max(vertex_diameter - 2, 1))) + 1 + math.log(1 / delta)
+    number_of_samples = math.ceil(0.5 / epsilon ** 2 * confidence)
+    if max_samples is not None: number_of_samples = min(number_of_samples, max_samples)
+    scale = number_of_vertices * (number_of_vertices - 1) / 2
+    hits = {}
+    samples_taken = 0
+    start_time = time.time()
+    while samples_taken < number_of_samples:
+        if execution_time is not None and time.time() - start_time >= execution_time: break
+        samples_taken += 1
+        source, target = generator.sample(vertices, 2)
+        if weighted:
+            _, predecessors, sigma, _ = _shortest_path_dag(graph, source, weighted, weighting, target)
+            if target not in sigma: continue
+            path = []
+            vertex = _choose_predecessor(generator, target, predecessors, sigma)
+            while vertex != source:
+                path.append(vertex)
+                vertex = _choose_predecessor(generator, vertex, predecessors, sigma)
+        else:
+            path = _sample_path_bidirectional(graph, source, target, generator)
+            if path is None: continue
+        for vertex in path:
+            hits[vertex] = hits.get(vertex, 0) + 1
+    if samples_taken == 0: return {}, 0, scale
+    error = max(epsilon, math.sqrt(confidence / (2 * samples_taken)))
+    return {vertex: count * scale / samples_taken for vertex, count in hits.items()}, samples_taken, error * scale
+
+
+def top_betweenness(scores: dict, k: int = 10) -> list:
+    """
+    Gets the vertices with the highest centrality.
+
+    Parameters
+    ----------
+    scores : dict
+        The centrality of every vertex.
+    k : int
+        The number of vertices (default 10).
+
+    Returns
+    -------
+    list
+        A list with the format [(vertex_id, centrality), ...] sorted from the highest centrality.
+    """
+    return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+
 def betweenness_centrality(graph: Graph, execution_time: int = 900) -> tuple:
     """
-    Finds the vertices with the most betweenness_centrality.
+    Finds the vertices with the most betweenness_centrality (Brandes' algorithm, see brandes_betweenness).
 
     Parameters
     ----------
@@ -351,23 +1542,12 @@ def betweenness_centrality(graph: Graph, execution_time: int = 900) -> tuple:
         A tuple with the format (number of centrality, vertices with the most betweenness_centrality, total time, time to finish).
 
     """
-    betweenness_centrality = {}
     max_centrality_vertices = []
-    number_of_vertices_analyzed = 0
     total_time = 0
     time_to_finish = 0
     max_centrality = 0
     start_time = time.time()
-    for vertex in graph.get_graph_elements():
-        if time.time() - start_time >= execution_time: break
-        number_of_vertices_analyzed += 1
-        separations = find_shortest_path_to_all_without_weights(graph, vertex)
-        for separation in separations.values():
-            if separation['distance'] == float('inf'): continue
-            for vertex_in_path in separation['path']:
-                if vertex_in_path == vertex: continue
-                if vertex_in_path not in betweenness_centrality: betweenness_centrality[vertex_in_path] = 1
-                else: betweenness_centrality[vertex_in_path] += 1
+    betweenness_centrality, number_of_vertices_analyzed = brandes_betweenness(graph, execution_time=execution_time)
     end_time = time.time()
     total_time = len(graph.get_graph_elements())*((end_time - start_time)/number_of_vertices_analyzed)
     time_to_finish = total_time - (end_time - start_time)
@@ -382,8 +1562,8 @@ def betweenness_centrality(graph: Graph, execution_time: int = 900) -> tuple:
  
 
 def main():
-    movies_by_id, actors_by_movie, actor_names_by_id = read_data(MOVIES_DATA_PATH, ACTORS_DATA_PATH, ACTORS_NAMES_PATH)
-    graph = load_graph(movies_by_id, actors_by_movie, actor_names_by_id)
+    graph = load_or_build_graph(GRAPH_SNAPSHOT_PATH, [MOVIES_DATA_PATH, ACTORS_DATA_PATH, ACTORS_NAMES_PATH],
+                                lambda: build_graph(MOVIES_DATA_PATH, ACTORS_DATA_PATH, ACTORS_NAMES_PATH))
     m = find_connected_components(graph)
     print(f"The number of connected components is {len(m)}")
     print(f"The largest connected component has {len(m['Component 1'])} vertices")
@@ -391,30 +1571,60 @@ def main():
     print(f"The smallest connected components has {len(m[f'Component {len(m)}'])} vertices")
     print("Shortest path calculation example (with weights)")
     path_calculation = find_shortest_path_to_all(graph, 'nm0000102')
-    print(f"The path from {actor_names_by_id['nm0000102']} to {actor_names_by_id['nm0000108']} has distance {path_calculation['nm0000108']['distance']} and is {path_calculation['nm0000108']['path']}")
+    print(f"The path from {graph.get_vertex_data('nm0000102')} to {graph.get_vertex_data('nm0000108')} has distance {path_calculation['nm0000108']['distance']} and is {path_calculation['nm0000108']['path']}")
     print("Shortest path calculation example (without weights)")
     path_calculation2 = find_shortest_path_to_all_without_weights(graph, 'nm0000102')
-    print(f"The path from {actor_names_by_id['nm0000102']} to {actor_names_by_id['nm0201857']} has distance {path_calculation2['nm0201857']['distance']} and is {path_calculation2['nm0201857']['path']}")
+    print(f"The path from {graph.get_vertex_data('nm0000102')} to {graph.get_vertex_data('nm0201857')} has distance {path_calculation2['nm0201857']['distance']} and is {path_calculation2['nm0201857']['path']}")
     print("Example of finding the shortest path between 2 vertices")
     path_calculation3 = find_shortest_path_between_vertices(graph, 'nm0000102', 'nm0000108')
-    print(f"The path from {actor_names_by_id['nm0000102']} to {actor_names_by_id['nm0000108']} has distance {path_calculation3[0]} and is {path_calculation3[1]}")
+    print(f"The path from {graph.get_vertex_data('nm0000102')} to {graph.get_vertex_data('nm0000108')} has distance {path_calculation3[0]} and is {path_calculation3[1]}")
     print(f"The time it takes is {path_calculation3[2]} seconds")
+    print(f"Single-source results cache: {PATH_CACHE.stats()}")
+    print("Example of finding the strongest connection between 2 vertices (inverse weights)")
+    path_calculation4 = find_shortest_path_between_vertices(graph, 'nm0000102', 'nm0000108', weighting='inverse')
+    print(f"The strongest connection from {graph.get_vertex_data('nm0000102')} to {graph.get_vertex_data('nm0000108')} has distance {path_calculation4[0]} and is {path_calculation4[1]}")
     print("Example of calculation of the diameter of the largest connected component")
     diameter = find_diameter(graph, "Component 1", 20)
     print(f"The diameter of the largest connected component is {diameter[0]}")
     print(f"The time it takes is {diameter[1]} seconds")
     print(f"The time it takes to finish is {diameter[2]} seconds")
+    print("Example of calculation of the exact diameter of the largest connected component")
+    exact_diameter = find_exact_diameter(graph, "Component 1", 20)
+    print(f"The diameter of the largest connected component is in [{exact_diameter[0]}, {exact_diameter[1]}]")
+    print(f"It took {exact_diameter[2]} BFS and {exact_diameter[3]} seconds")
     print("Example of calculation of the average distance of the largest connected component")   
     average_distance = average_separations(graph, "Component 1", 20) 
     print(f"The average distance of the largest connected component is {average_distance[1]}")
     print(f"The time it takes is {average_distance[2]} seconds")
     print(f"The time it takes to finish is {average_distance[3]} seconds")
+    print("Example of calculation of the diameter and the average distance with bit-parallel BFS")
+    statistics = separation_statistics(graph, "Component 1", 20)
+    print(f"The diameter is at least {statistics[0]} and the average distance is {statistics[2]}")
+    print(f"The time it takes is {statistics[3]} seconds")
+    print(f"The time it takes to finish is {statistics[4]} seconds")
+    print("Example of estimation of the distance distribution of the largest connected component (HyperANF)")
+    distribution = distance_distribution(graph, "Component 1")
+    for distance, pairs, error in distribution.histogram():
+        print(f"{distance}: {pairs:.0f} ± {error:.0f} pairs")
+    print(f"Mean separation {distribution.mean_separation()}, effective diameter {distribution.effective_diameter()}")
     print("Example of calculation of the betweenness centrality of the largest connected component")
     centrality = betweenness_centrality(graph, 20)
     print(f"The betweenness centrality of the largest connected component is {centrality[0]}")
     print(f"The vertices with the most betweenness centrality are {centrality[1]}")
     print(f"The time it takes is {centrality[2]} seconds")
     print(f"The time it takes to finish is {centrality[3]} seconds")
+    print("Example of estimation of the actors with the most betweenness centrality")
+    estimated_centrality, samples, error = approximate_betweenness(graph, epsilon=0.05, execution_time=60)
+    print(f"Top 10 after {samples} sampled paths (error at most {error}): {top_betweenness(estimated_centrality, 10)}")
+    print("Example of the analytics on the actor projection (co-star graph answered through the movies, without cliques)")
+    projection = load_or_build_projection(PROJECTION_SNAPSHOT_PATH, [MOVIES_DATA_PATH, ACTORS_DATA_PATH, ACTORS_NAMES_PATH],
+                                          lambda: load_graph_projection(*read_data(MOVIES_DATA_PATH, ACTORS_DATA_PATH, ACTORS_NAMES_PATH)))
+    print(f"The projection keeps {projection.nbytes() / (1 << 20):.1f} MB of arrays for {projection.number_of_vertices()} actors and {projection.number_of_movies()} movies")
+    print(f"The number of connected components is {len(find_connected_components(projection))}")
+    path_calculation5 = find_shortest_path_between_vertices(projection, 'nm0000102', 'nm0000108')
+    print(f"The path from {projection.get_vertex_data('nm0000102')} to {projection.get_vertex_data('nm0000108')} has distance {path_calculation5[0]} and is {path_calculation5[1]}")
+    diameter = find_diameter(projection, "Component 1", 20, workers=os.cpu_count())
+    print(f"The diameter of the largest connected component of the projection is {diameter[0]}")
 
 
 if __name__ == '__main__':
@@ -1,9 +1,16 @@
-from typing import Optional, Any, List
-import csv
+from typing import Optional, Any, List, Iterable, Sequence
+from tsv_stream import Ingest_Stats, iter_movies, iter_casts, iter_names
+from vectorized_bfs import Vectorized_Graph, bfs
+from snapshot import Snapshot, write_snapshot, fresh_snapshot
+from graph import Actor_Projection
+from landmark_labels import Landmark_Labels, build_landmark_labels
+from random_walks import walk_visits, parallel_walk_visits
+from pagerank import pagerank, approximate_personalized_pagerank
 from itertools import combinations
 from collections import deque
+from array import array
+import numpy as np
 import os
-import pickle
 import random
 MOVIE_TITLE_TYPE = "movie"
 MOVIE_COLUMNS = ["tconst", "titleType", "primaryTitle"]
@@ -11,6 +18,10 @@ PRINCIPALS_COLUMNS = ["nconst", "category"]
 MOVIES_DATA_PATH = "./datasets/title-basics-f.tsv"
 ACTORS_DATA_PATH = "./datasets/title-principals-f.tsv"
 ACTORS_NAMES_PATH = "./datasets/name-basics-f.tsv"
+GRAPH_SNAPSHOT_PATH = "./datasets/graph-b.snapshot"
+DISTANCE_INDEX_PATH = "./datasets/distance-index-b.snapshot"
+VERTEX_TYPES = ("actor", "movie")  # type codes of the graph snapshot
+LABELS_PATH = "./datasets/labels-b.snapshot"
 
 global Kevin_Bacon
 Kevin_Bacon = "nm0000102"  # Kevin Bacon's ID    
@@ -22,6 +33,18 @@ class Bipartite_Graph:
     def __init__(self):
         self._graph = {}
 
+    @classmethod
+    def from_adjacency(cls, adjacency: Iterable[tuple]) -> 'Bipartite_Graph':
+        """
+        Builds a graph adopting the neighbor lists of every vertex without copying them
+        :param adjacency: the (vertex, type, data, neighbors list) of every vertex (the lists must be symmetric)
+        :return: a Bipartite_Graph
+        """
+        graph = cls()
+        for vertex, type, data, neighbors in adjacency:
+            graph._graph[vertex] = {'data': data, 'type': type, 'neighbors': neighbors}
+        return graph
+
     def add_vertex(self, vertex: str, type: Optional[Any]=None, data: Optional[Any]=None) -> None:
         """
         Adds a vertex to the graph
@@ -54,6 +77,36 @@ class Bipartite_Graph:
         else:
             return []
 
+    def neighbors(self, vertex) -> Iterable[str]:
+        """
+        Get a read-only view of the vertex neighbors (nothing is copied, do not modify the graph while iterating it)
+        :param vertex: the vertex to query
+        :return: the neighbor vertexes
+        """
+        if vertex in self._graph:
+            return iter(self._graph[vertex]['neighbors'])
+        return iter(())
+
+    def degree(self, vertex) -> int:
+        """
+        Get the number of vertex neighbors
+        :param vertex: the vertex to query
+        :return: the number of neighbors
+        """
+        if vertex in self._graph:
+            return len(self._graph[vertex]['neighbors'])
+        return 0
+
+    def set_vertex_data(self, vertex: str, data: Optional[Any]=None) -> None:
+        """
+        Sets vertex associated data
+        :param vertex: the vertex name
+        :param data: data associated with the vertex
+        """
+        if vertex not in self._graph:
+            raise ValueError("The vertex does not exist")
+        self._graph[vertex]['data'] = data
+
     def get_vertex_data(self, vertex: str) -> Optional[Any]:
         """
         Gets  vertex associated data
@@ -102,42 +155,29 @@ class Bipartite_Graph:
         """
         return self._graph
 
+    def actor_projection(self, max_cast_size: Optional[int] = None) -> Actor_Projection:
+        """
+        Gets the co-star graph of the actors (the graph of grafo_a) as a compact CSR over the movie layer,
+        without building the edges between every pair of a cast (see graph.Actor_Projection)
+        :param max_cast_size: optional cap, movies with a larger cast are left out
+        :return: an Actor_Projection
+        """
+        return Actor_Projection.from_bipartite(self, max_cast_size)
+
 
 def read_data(movies_file, actors_file, actors_name_file):
     print("Reading data")
-    if os.path.exists('data.pickle'):
-        print("Reading from pre-saved file")
-        try:
-            with open('data.pickle', 'rb') as file:
-                movies_by_id, actors_by_movie, actor_names_by_id = pickle.load(file)
-                return movies_by_id, actors_by_movie, actor_names_by_id
-        except Exception:
-            pass
-    movies_by_id = {}
-    with open(movies_file, "r", newline="", encoding="utf-8") as file1:
-        reader = csv.DictReader(file1, delimiter="\t")
-        for row in reader:
-            if row["titleType"] == MOVIE_TITLE_TYPE:
-                movies_by_id[row['tconst']] = {'primaryTitle': row['primaryTitle']}
+    stats = Ingest_Stats()
+    movies_by_id = {movie_id: {'primaryTitle': title} for movie_id, title in iter_movies(movies_file, stats)}
 
     actors_ids = set()
     actors_by_movie = {m: set() for m in movies_by_id.keys()}
-    with open(actors_file, "r", newline="", encoding="utf-8") as file2:
-        reader = csv.DictReader(file2, delimiter="\t")
-        for row in reader:
-            if row["tconst"] in actors_by_movie:
-                actors_by_movie[row["tconst"]].update([row["nconst"]])
-                actors_ids.update([row["nconst"]])
-
-    actor_names_by_id = {}
-    with open(actors_name_file, "r", newline="", encoding="utf-8") as file2:
-        reader = csv.DictReader(file2, delimiter="\t")
-        for row in reader:
-            if row["nconst"] in actors_ids:
-                actor_names_by_id[row["nconst"]] = row["primaryName"]
-
-    with open('data.pickle', 'wb') as file:
-        pickle.dump((movies_by_id, actors_by_movie, actor_names_by_id), file)
+    for movie_id, cast in iter_casts(actors_file, movies_by_id, stats):
+        actors_by_movie[movie_id].update(cast)
+        actors_ids.update(cast)
+
+    actor_names_by_id = dict(iter_names(actors_name_file, actors_ids, stats))
+    print(stats.report())
 
     return movies_by_id, actors_by_movie, actor_names_by_id
 
@@ -166,6 +206,147 @@ def load_graph(movies_by_id, actors_by_movie, actor_names_by_id):
     return graph
 
 
+def load_graph_streaming(movies_file, actors_file, actors_name_file):
+    """
+    Loads the graph straight from the TSVs, adding each movie and its cast as they are read
+    :param movies_file: the title.basics TSV
+    :param actors_file: the title.principals TSV
+    :param actors_name_file: the name.basics TSV
+    :return: a Graph Bipartite with actors and movies vertices
+    """
+    graph = Bipartite_Graph()
+    print("Loading graph (streaming)")
+    stats = Ingest_Stats()
+    for movie_id, movie_title in iter_movies(movies_file, stats):
+        graph.add_vertex(movie_id, "movie", movie_title)
+    for movie_id, cast in iter_casts(actors_file, graph.get_graph_elements(), stats):
+        movie_title = graph.get_vertex_data(movie_id)['data']
+        repeated_movie = graph.degree(movie_id) > 0
+        for actor_id in cast:
+            if not graph.vertex_exists(actor_id):
+                graph.add_vertex(actor_id, "actor", "ERROR")
+            elif repeated_movie and graph.edge_exists(movie_id, actor_id):
+                continue
+            graph.add_edge(movie_id, actor_id, movie_title)
+    for actor_id, actor_name in iter_names(actors_name_file, graph.get_graph_elements(), stats):
+        if graph.get_vertex_data(actor_id)['type'] == "actor":
+            graph.set_vertex_data(actor_id, actor_name)
+    print(stats.report())
+    print("Graph loaded")
+    return graph
+
+
+def save_graph(graph: Bipartite_Graph, path: str, sources: Sequence[str]) -> None:
+    """
+    Saves the graph as a snapshot file: the vertices with their type and name, and the neighbors of every
+    vertex as CSR arrays, in the order they were added. Unlike the CSR_Graph snapshot of grafo_a, it is only
+    a cache of the parsed TSVs, open_graph copies it back into a Bipartite_Graph.
+    :param graph: the graph to save
+    :param path: the snapshot file
+    :param sources: the source files the graph was built from
+    """
+    vertices = list(graph.get_graph_elements())
+    index = {vertex: idx for idx, vertex in enumerate(vertices)}
+    types = array('b')
+    names = []
+    offsets = array('q', [0])
+    neighbors = array('i')
+    for vertex in vertices:
+        data = graph.get_vertex_data(vertex)
+        if data['type'] not in VERTEX_TYPES:
+            raise ValueError(f"{vertex} has type {data['type']}, expected one of {', '.join(VERTEX_TYPES)}")
+        types.append(VERTEX_TYPES.index(data['type']))
+        names.append("" if data['data'] is None else str(data['data']))
+        neighbors.extend(index[neighbor] for neighbor in graph.neighbors(vertex))
+        offsets.append(len(neighbors))
+    write_snapshot(path, sections={"types": types, "offsets": offsets, "neighbors": neighbors},
+                   strings={"vertices": vertices, "vertex_data": names}, sources=sources)
+
+
+def open_graph(path: str) -> Bipartite_Graph:
+    """
+    Loads a graph snapshot, without parsing the TSVs again. The sections are not used in place: every vertex,
+    name and neighbor list is copied into the dictionaries of a Bipartite_Graph, that can still change
+    (see apply_movie_delta), so it takes memory and time in proportion to the whole graph.
+    :param path: the snapshot file
+    :return: a Bipartite_Graph
+    """
+    snapshot = Snapshot(path)
+    vertices = list(snapshot.strings("vertices"))
+    names = snapshot.strings("vertex_data")
+    types = snapshot.section("types")
+    offsets = snapshot.section("offsets")
+    neighbors = snapshot.section("neighbors")
+    return Bipartite_Graph.from_adjacency((vertex, VERTEX_TYPES[types[idx]], name, [vertices[neighbor] for neighbor in neighbors[offsets[idx]:offsets[idx + 1]]])
+                                          for idx, (vertex, name) in enumerate(zip(vertices, names)))
+
+
+def load_or_build_graph(path: str = GRAPH_SNAPSHOT_PATH, sources: Sequence[str] = (MOVIES_DATA_PATH, ACTORS_DATA_PATH, ACTORS_NAMES_PATH)) -> Bipartite_Graph:
+    """
+    Loads the graph from its snapshot, building it from the TSVs (with load_graph_streaming) and saving the
+    snapshot first if it is missing, unreadable or the source files changed
+    :param path: the snapshot file
+    :param sources: the movies, actors and actor names TSVs
+    :return: a Bipartite_Graph
+    """
+    if fresh_snapshot(path, sources) is not None:
+        print("Reading graph snapshot")
+        return open_graph(path)
+    if os.path.exists(path):
+        print("Graph snapshot is outdated")
+    graph = load_graph_streaming(*sources)
+    save_graph(graph, path, sources)
+    return graph
+
+
+def apply_movie_delta(graph: Bipartite_Graph, movies_by_id, actors_by_movie, actor_names_by_id,
+                      distance_index: Optional['Distance_Index'] = None) -> int:
+    """
+    Adds new movies with their casts to a loaded graph (for example the output of read_data over a delta of the TSVs),
+    instead of loading everything again, and repairs the distance index if one is given (see Distance_Index.repair).
+    Vectorized copies and landmark labels of the graph are not updated, build them again.
+    :param graph: the graph
+    :param movies_by_id: the new movies data by id as dict
+    :param actors_by_movie: the actors of every new movie
+    :param actor_names_by_id: the names of the new actors by their ids
+    :param distance_index: optional distance index of the graph to repair
+    :return: the number of edges added
+    """
+    casts = []
+    added_edges = 0
+    for movie_id, movie in movies_by_id.items():
+        movie_title = movie['primaryTitle']
+        if not graph.vertex_exists(movie_id):
+            graph.add_vertex(movie_id, "movie", movie_title)
+        cast = list(dict.fromkeys(actors_by_movie.get(movie_id, ())))
+        for actor_id in cast:
+            if not graph.vertex_exists(actor_id):
+                graph.add_vertex(actor_id, "actor", actor_names_by_id.get(actor_id, "ERROR"))
+            elif graph.edge_exists(movie_id, actor_id):
+                continue
+            graph.add_edge(movie_id, actor_id, movie_title)
+            added_edges += 1
+        casts.append(cast)
+    if distance_index is not None:
+        distance_index.repair(graph, casts)
+    return added_edges
+
+
+def add_movie(graph: Bipartite_Graph, movie_id: str, movie_title: str, cast: Sequence[str], actor_names_by_id: Optional[dict] = None,
+              distance_index: Optional['Distance_Index'] = None) -> int:
+    """
+    Adds a new movie with its cast to a loaded graph (see apply_movie_delta)
+    :param graph: the graph
+    :param movie_id: the movie id
+    :param movie_title: the movie title
+    :param cast: the ids of its actors
+    :param actor_names_by_id: optional names of the new actors by their ids
+    :param distance_index: optional distance index of the graph to repair
+    :return: the number of edges added
+    """
+    return apply_movie_delta(graph, {movie_id: {'primaryTitle': movie_title}}, {movie_id: cast}, actor_names_by_id or {}, distance_index)
+
+
 """	
 Ejercicio 1
 
@@ -173,9 +354,10 @@ Dados dos actores, queremos conocer su grado de separación. El grado de separac
 
 """
 
-def degree_of_separation(graph: Bipartite_Graph, vertex1: str, vertex2: str) -> float:
+def degree_of_separation(graph: Bipartite_Graph, vertex1: str, vertex2: str, labels: Optional[Landmark_Labels] = None) -> float:
     """	
     Calculate the degree of separation between two vertices in the graph (minimum number of films away at which both are). 
+    It runs a bidirectional BFS that always expands the smaller frontier one whole level at a time.
     
     Parameters
     ----------
@@ -185,28 +367,154 @@ def degree_of_separation(graph: Bipartite_Graph, vertex1: str, vertex2: str) ->
         The first vertex's ID (where the search begins).
     vertex2 : str
         The second vertex's ID (where the search ends).
+    labels : Landmark_Labels
+        Optional pruned landmark labels of the graph (see load_or_build_landmark_labels), answered without a BFS.
 
     Returns
     -------
     float
         The degree of separation between the two vertices (inf if they are not connected).
     """
+    if labels is not None: return labels.distance(vertex1, vertex2)
     if not graph.vertex_exists(vertex1) or not graph.vertex_exists(vertex2): return float('inf')
     if graph.get_vertex_data(vertex1)["type"] != 'actor' or graph.get_vertex_data(vertex2)["type"]  != 'actor': return float('inf') 
     if vertex1 == vertex2: return 0.0
-    visited = set()
-    queues = deque()
-    queues.append((vertex1, 0.0))
-    while queues:
-        current_vertex, current_distance = queues.popleft()
-        if current_vertex == vertex2: return current_distance/2 
-        if current_vertex not in visited:
-            visited.add(current_vertex)
-            for neighbor in graph.get_neighbors(current_vertex):
-                queues.append((neighbor, current_distance + 1.0))
+    distances = ({vertex1: 0}, {vertex2: 0})
+    frontiers = ([vertex1], [vertex2])
+    while frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        current_distances, other_distances = distances[side], distances[1 - side]
+        next_frontier = []
+        best_distance = float('inf')
+        for current_vertex in frontiers[side]:
+            new_distance = current_distances[current_vertex] + 1
+            for neighbor in graph.neighbors(current_vertex):
+                if neighbor in other_distances:
+                    best_distance = min(best_distance, new_distance + other_distances[neighbor])
+                elif neighbor not in current_distances:
+                    current_distances[neighbor] = new_distance
+                    next_frontier.append(neighbor)
+        if best_distance != float('inf'): return best_distance / 2
+        if side == 0: frontiers = (next_frontier, frontiers[1])
+        else: frontiers = (frontiers[0], next_frontier)
     return float('inf')
 
 
+def degrees_of_separation(graph: Bipartite_Graph, pairs: list) -> dict:
+    """
+    Calculate the degree of separation of many pairs of actors. The pairs are grouped by a shared actor
+    (the one that appears in more pairs) and every group of several pairs is answered with a single BFS from it,
+    which stops as soon as all the actors of the group were reached. A group of one pair is answered with the
+    bidirectional BFS of degree_of_separation, that explores much less of the graph than a BFS from one end.
+
+    Parameters
+    ----------
+    graph : Bipartite_Graph
+        The graph to search.
+    pairs : list
+        The pairs of actor IDs.
+
+    Returns
+    -------
+    dict
+        A dictionary with the format {(vertex1, vertex2): degree of separation} (inf if they are not connected).
+    """
+    results = {}
+    appearances = {}
+    for vertex1, vertex2 in pairs:
+        appearances[vertex1] = appearances.get(vertex1, 0) + 1
+        appearances[vertex2] = appearances.get(vertex2, 0) + 1
+    targets_by_source = {}
+    for vertex1, vertex2 in pairs:
+        valid = True
+        for vertex in (vertex1, vertex2):
+            if not graph.vertex_exists(vertex) or graph.get_vertex_data(vertex)["type"] != 'actor': valid = False
+        if not valid: results[(vertex1, vertex2)] = float('inf')
+        elif appearances[vertex1] >= appearances[vertex2]: targets_by_source.setdefault(vertex1, set()).add(vertex2)
+        else: targets_by_source.setdefault(vertex2, set()).add(vertex1)
+    for source, targets in targets_by_source.items():
+        if len(targets) == 1:
+            target, = targets
+            results[(source, target)] = results[(target, source)] = degree_of_separation(graph, source, target)
+            continue
+        pending = set(targets)
+        pending.discard(source)
+        distances = {source: 0}
+        frontier = [source]
+        while frontier and pending:
+            next_frontier = []
+            for current_vertex in frontier:
+                new_distance = distances[current_vertex] + 1
+                for neighbor in graph.neighbors(current_vertex):
+                    if neighbor not in distances:
+                        distances[neighbor] = new_distance
+                        next_frontier.append(neighbor)
+                        pending.discard(neighbor)
+            frontier = next_frontier
+        for target in targets:
+            degree = distances[target] / 2 if target in distances else float('inf')
+            results[(source, target)] = degree
+            results[(target, source)] = degree
+    return {(vertex1, vertex2): results[(vertex1, vertex2)] for vertex1, vertex2 in pairs}
+
+
+def load_or_build_landmark_labels(graph: Bipartite_Graph, path: str = LABELS_PATH, sources: Sequence[str] = (MOVIES_DATA_PATH, ACTORS_DATA_PATH, ACTORS_NAMES_PATH),
+                                  workers: int = 1) -> Landmark_Labels:
+    """
+    Opens the pruned landmark labels file, rebuilding it first if it is missing, unreadable or the source files changed.
+
+    Parameters
+    ----------
+    graph : Bipartite_Graph
+        The graph built from the source files.
+    path : str
+        The labels file.
+    sources : Sequence[str]
+        The source files.
+    workers : int
+        The number of processes building the labels if they are rebuilt (default 1, see landmark_labels.build_landmark_labels).
+
+    Returns
+    -------
+    Landmark_Labels
+        The labels, answering the degree of separation of any two actors.
+    """
+    if fresh_snapshot(path, sources) is not None:
+        return Landmark_Labels.load(path)
+    labels = build_landmark_labels(graph, workers)
+    labels.save(path, sources)
+    return Landmark_Labels.load(path)
+
+
+def degree_of_separation_vectorized(graph: Vectorized_Graph, vertex1: str, vertex2: str) -> float:
+    """
+    Calculate the degree of separation between two vertices in the graph (minimum number of films away at which both are),
+    expanding whole BFS levels with NumPy (see vectorized_bfs.bfs).
+
+    Parameters
+    ----------
+    graph : Vectorized_Graph
+        The vectorized Bipartite_Graph to search.
+    vertex1 : str
+        The first vertex's ID (where the search begins).
+    vertex2 : str
+        The second vertex's ID (where the search ends).
+
+    Returns
+    -------
+    float
+        The degree of separation between the two vertices (inf if they are not connected).
+    """
+    source, target = graph.index_of(vertex1), graph.index_of(vertex2)
+    if source < 0 or target < 0: return float('inf')
+    actors = graph.actor_mask()
+    if not actors[source] or not actors[target]: return float('inf')
+    if source == target: return 0.0
+    distances, _ = bfs(graph, source, target)
+    if distances[target] < 0: return float('inf')
+    return int(distances[target]) / 2
+
+
 """
 Ejercicio 2
 
@@ -241,15 +549,46 @@ def min_distance_to_all_vertices(graph: Bipartite_Graph, vertex_id: str) -> dict
     queues.append((vertex_id, 0))
     while queues:
         current_vertex, current_distance = queues.popleft()
-        for movie in graph.get_neighbors(current_vertex):
-            for neighbor in graph.get_neighbors(movie):
+        for movie in graph.neighbors(current_vertex):
+            for neighbor in graph.neighbors(movie):
                 if distances[neighbor] == float('inf'):
                     distances[neighbor] = current_distance + 1.0
                     queues.append((neighbor, current_distance + 1.0))
     return distances
 
 
-def greatest_distance_to_Kevin_Bacon(graph: Bipartite_Graph) -> tuple: 
+def min_distance_to_all_vertices_vectorized(graph: Vectorized_Graph, vertex_id: str) -> dict:
+    """
+    Calculate the minimum distance from a vertex to all the other vertices in the graph (minimum number of films away at which both are),
+    expanding whole BFS levels with NumPy (see vectorized_bfs.bfs).
+
+    Parameters
+    ----------
+    graph : Vectorized_Graph
+        The vectorized Bipartite_Graph to search.
+    vertex_id : str
+        The vertex's ID to search from.
+
+    Returns
+    -------
+    dict
+        A dictionary with the minimum distance to all vertices in the graph, as min_distance_to_all_vertices.
+    """
+    source = graph.index_of(vertex_id)
+    if source < 0: return {"The vertex does not exist" : float('inf')}
+    actors = graph.actor_mask()
+    if not actors[source]: return {"The vertex is not an actor" : float('inf')}
+    distances, _ = bfs(graph, source)
+    actor_ids = actors.nonzero()[0]
+    actor_distances = distances[actor_ids]
+    results = {}
+    for idx, distance in zip(actor_ids.tolist(), actor_distances.tolist()):
+        results[graph.vertices[idx]] = distance / 2 if distance >= 0 else float('inf')
+    results[vertex_id] = 0
+    return results
+
+
+def greatest_distance_to_Kevin_Bacon(graph: Bipartite_Graph, distance_index: Optional['Distance_Index'] = None) -> tuple: 
     """
     Calculate the greatest distance from Kevin Bacon to all the other actors in the graph (minimum number of films away at which both are).
 
@@ -257,12 +596,16 @@ def greatest_distance_to_Kevin_Bacon(graph: Bipartite_Graph) -> tuple:
     ----------
     graph : Bipartite_Graph
         The graph to search.
+    distance_index : Distance_Index
+        Optional precomputed distances with Kevin Bacon as a hub (see load_or_build_distance_index), answered without a BFS.
 
     Returns
     -------
     tuple
         A tuple with the greatest distance and a list with all the actors with that distance.
     """
+    if distance_index is not None and Kevin_Bacon in distance_index.hubs:
+        return distance_index.farthest(Kevin_Bacon)
     bacon_max_distance_actors = []  
     max_distance = 0
     distances = min_distance_to_all_vertices(graph, Kevin_Bacon)
@@ -275,6 +618,205 @@ def greatest_distance_to_Kevin_Bacon(graph: Bipartite_Graph) -> tuple:
     return max_distance, bacon_max_distance_actors
 
 
+class Distance_Index:
+    """
+    Distance_Index class (distance in films from a few hub actors to every actor). Actors are interned to their
+    position in sorted order (actors added later by repair go at the end) and the distances of every hub are one
+    int16 row, -1 when the actor is not reachable.
+    """
+    def __init__(self, hubs: List[str], actors: Sequence[str], distances: Sequence[int]):
+        self.hubs = hubs
+        self._actors = actors
+        self._distances = np.frombuffer(distances, dtype=np.int16).reshape(len(hubs), len(actors))
+        self._raw_distances = distances
+        self._actor_ids = None
+        self._farthest = {}
+
+    def _row(self, hub: str) -> np.ndarray:
+        if hub not in self.hubs:
+            raise ValueError(f"{hub} is not a hub of the distance index")
+        return self._distances[self.hubs.index(hub)]
+
+    def index_of(self, actor: str) -> int:
+        """
+        Gets the interned ID of an actor (the first call reads every actor name once)
+        :param actor: the actor ID
+        :return: the interned ID, or -1 if the actor is not in the index
+        """
+        if self._actor_ids is None:
+            self._actor_ids = {name: idx for idx, name in enumerate(self._actors)}
+        return self._actor_ids.get(actor, -1)
+
+    def distance(self, actor: str, hub: str = Kevin_Bacon) -> float:
+        """
+        Gets the distance between a hub and an actor
+        :param actor: the actor ID
+        :param hub: the hub actor ID (default Kevin Bacon)
+        :return: the number of films away at which both are (inf if they are not connected or the actor is unknown)
+        """
+        row = self._row(hub)
+        idx = self.index_of(actor)
+        if idx < 0 or row[idx] < 0:
+            return float('inf')
+        return float(row[idx])
+
+    def farthest(self, hub: str = Kevin_Bacon) -> tuple:
+        """
+        Gets the actors at the greatest distance from a hub, among the ones connected to it
+        :param hub: the hub actor ID (default Kevin Bacon)
+        :return: a tuple with the greatest distance and a list with all the actors with that distance
+        """
+        if hub not in self._farthest:
+            row = self._row(hub)
+            max_distance = int(row.max(initial=-1))
+            actors = [self._actors[idx] for idx in np.flatnonzero(row == max_distance).tolist()] if max_distance >= 0 else []
+            self._farthest[hub] = (float(max(max_distance, 0)), actors)
+        max_distance, actors = self._farthest[hub]
+        return max_distance, list(actors)
+
+    def histogram(self, hub: str = Kevin_Bacon) -> dict:
+        """
+        Gets how many actors are at every distance from a hub
+        :param hub: the hub actor ID (default Kevin Bacon)
+        :return: a dictionary with the format {distance: number of actors}, inf for the actors not connected to the hub
+        """
+        row = self._row(hub)
+        counts = np.bincount(row[row >= 0])
+        histogram = {float(distance): int(count) for distance, count in enumerate(counts.tolist()) if count}
+        unreachable = int((row < 0).sum())
+        if unreachable: histogram[float('inf')] = unreachable
+        return histogram
+
+    def repair(self, graph: 'Bipartite_Graph', casts: Sequence[Sequence[str]]) -> None:
+        """
+        Updates the distances after some movies were added to the graph (see apply_movie_delta). Adding movies only
+        makes distances shorter, so every new movie offers its cast one film more than its closest actor, and only
+        the actors whose distance improves are propagated, one level at a time. The index is left as it was if the
+        repair fails.
+        :param graph: the graph, with the movies already added
+        :param casts: the cast of every added movie
+        :raises ValueError: if the graph has an actor that is neither in the index nor in casts (the index is stale)
+        """
+        new_ids = {}
+        for cast in casts:
+            for actor in cast:
+                if self.index_of(actor) < 0 and actor not in new_ids:
+                    new_ids[actor] = len(self._actors) + len(new_ids)
+
+        def index_of(actor: str) -> int:
+            idx = self.index_of(actor)
+            if idx < 0:
+                idx = new_ids.get(actor, -1)
+                if idx < 0: raise ValueError(f"{actor} is not in the distance index, it must be rebuilt")
+            return idx
+
+        distances = np.hstack([self._distances, np.full((len(self.hubs), len(new_ids)), -1, dtype=np.int16)])
+        for row in distances:
+            levels = {}
+            for cast in casts:
+                known = [row[idx] for idx in map(index_of, cast) if row[idx] >= 0]
+                if not known: continue
+                offered = int(min(known)) + 1
+                for actor in cast:
+                    idx = index_of(actor)
+                    if row[idx] < 0 or row[idx] > offered:
+                        row[idx] = offered
+                        levels.setdefault(offered, []).append(actor)
+            while levels:
+                level = min(levels)
+                for actor in levels.pop(level):
+                    if row[index_of(actor)] != level: continue
+                    for movie in graph.neighbors(actor):
+                        for costar in graph.neighbors(movie):
+                            idx = index_of(costar)
+                            if row[idx] < 0 or row[idx] > level + 1:
+                                row[idx] = level + 1
+                                levels.setdefault(level + 1, []).append(costar)
+        if new_ids:
+            self._actors = list(self._actors) + list(new_ids)
+            self._actor_ids.update(new_ids)
+        self._distances = distances
+        self._farthest = {}
+
+    def save(self, path: str, sources: Sequence[str]) -> None:
+        """
+        Saves the distance index as a snapshot file
+        :param path: the distance index file
+        :param sources: the source files the graph was built from
+        """
+        write_snapshot(path, sections={"distances": array('h', bytes(self._distances))},
+                       strings={"hubs": self.hubs, "actors": list(self._actors)}, sources=sources)
+
+    @classmethod
+    def load(cls, path: str) -> 'Distance_Index':
+        """
+        Opens a distance index file without copying its distances
+        :param path: the distance index file
+        :return: the Distance_Index
+        """
+        snapshot = Snapshot(path)
+        return cls(list(snapshot.strings("hubs")), snapshot.strings("actors"), snapshot.section("distances"))
+
+
+def build_distance_index(graph: Bipartite_Graph, hubs: Sequence[str] = (Kevin_Bacon,)) -> Distance_Index:
+    """
+    Computes the distance from every hub to every actor with one BFS per hub.
+
+    Parameters
+    ----------
+    graph : Bipartite_Graph
+        The graph to search.
+    hubs : Sequence[str]
+        The hub actors' IDs (default Kevin Bacon).
+
+    Returns
+    -------
+    Distance_Index
+        The distances from every hub to every actor.
+    """
+    vectorized_graph = Vectorized_Graph(graph)
+    actor_mask = vectorized_graph.actor_mask()
+    actors = sorted(vectorized_graph.vertices[idx] for idx in np.flatnonzero(actor_mask).tolist())
+    actor_vertex_ids = np.array([vectorized_graph.index_of(actor) for actor in actors], dtype=np.int64)
+    distances = np.full((len(hubs), len(actors)), -1, dtype=np.int16)
+    for row, hub in enumerate(hubs):
+        source = vectorized_graph.index_of(hub)
+        if source < 0 or not actor_mask[source]: raise ValueError(f"{hub} is not an actor of the graph")
+        hops, _ = bfs(vectorized_graph, source)
+        hub_distances = hops[actor_vertex_ids]
+        distances[row] = np.where(hub_distances >= 0, hub_distances // 2, -1)
+    return Distance_Index(list(hubs), actors, distances.tobytes())
+
+
+def load_or_build_distance_index(graph: Bipartite_Graph, path: str = DISTANCE_INDEX_PATH, sources: Sequence[str] = (MOVIES_DATA_PATH, ACTORS_DATA_PATH, ACTORS_NAMES_PATH),
+                                 hubs: Sequence[str] = (Kevin_Bacon,)) -> Distance_Index:
+    """
+    Opens the distance index file, rebuilding it first if it is missing, unreadable, the source files changed or it has other hubs.
+
+    Parameters
+    ----------
+    graph : Bipartite_Graph
+        The graph built from the source files.
+    path : str
+        The distance index file.
+    sources : Sequence[str]
+        The source files.
+    hubs : Sequence[str]
+        The hub actors' IDs (default Kevin Bacon).
+
+    Returns
+    -------
+    Distance_Index
+        The distances from every hub to every actor.
+    """
+    snapshot = fresh_snapshot(path, sources)
+    if snapshot is not None and list(snapshot.strings("hubs")) == list(hubs):
+        return Distance_Index.load(path)
+    distance_index = build_distance_index(graph, hubs)
+    distance_index.save(path, sources)
+    return distance_index
+
+
 """	
 Ejercicio 3
 
@@ -353,23 +895,164 @@ def estimate_central_vertices(graph: Bipartite_Graph, num_walks: int, walk_lengt
             central_movies.append(movie)
         elif movie_counts[movie] ==  max_num_of_presences_movies: central_movies.append(movie)
     return max_num_of_presences_actors, central_actors, max_num_of_presences_movies, central_movies
+
+
+def _most_visited(vectorized_graph: Vectorized_Graph, visits: np.ndarray) -> tuple:
+    """
+    Gets the most visited actors and movies from the visit counts of a walk engine (see random_walks.walk_visits).
+    Returns (visits of the most visited actors, their IDs, visits of the most visited movies, their IDs).
+    """
+    results = []
+    actor_mask = vectorized_graph.actor_mask()
+    for mask in (actor_mask, ~actor_mask):
+        type_visits = np.where(mask, visits, 0)
+        max_visits = int(type_visits.max(initial=0))
+        if max_visits == 0:
+            results += [0, []]
+            continue
+        results += [max_visits, [vectorized_graph.vertices[idx] for idx in np.flatnonzero(type_visits == max_visits).tolist()]]
+    return tuple(results)
+
+
+def estimate_central_vertices_vectorized(graph, num_walks: int, walk_length: int, non_backtracking: bool = True,
+                                         seed: Optional[int] = None, workers: int = 1) -> tuple:
+    """
+    Estimate the most central vertices in the graph by using random walks (differentiating actors and movies), running
+    all the walks in lockstep with NumPy (see random_walks.walk_visits), or split among processes when workers > 1
+    (see random_walks.parallel_walk_visits).
+    The walks do not retry to avoid every vertex already visited like estimate_central_vertices, they can only
+    avoid going back to the previous vertex.
+
+    Parameters
+    ----------
+    graph : Bipartite_Graph or Vectorized_Graph
+        The graph to search.
+    num_walks : int
+        The number of random walks to perform.
+    walk_length : int
+        The length of each random walk.
+    non_backtracking : bool
+        Never go back to the previous vertex unless it is the only neighbor (default True).
+    seed : int
+        The seed of the random generator (default None, a different one every time).
+    workers : int
+        The number of processes that run the walks (default 1, in this process).
+
+    Returns
+    -------
+    tuple
+        A tuple with the most central actors, and the number of times they appeared, the most central movies and the number of times they appeared.
+    """
+    vectorized_graph = graph if isinstance(graph, Vectorized_Graph) else Vectorized_Graph(graph)
+    if workers > 1:
+        visits = parallel_walk_visits(vectorized_graph, num_walks, walk_length, non_backtracking, seed, workers)
+    else:
+        visits = walk_visits(vectorized_graph, num_walks, walk_length, non_backtracking, seed)
+    return _most_visited(vectorized_graph, visits)
+
+
+def pagerank_scores(graph, seed_actor: Optional[str] = None, damping: float = 0.85, tolerance: float = 1e-10,
+                    approximate: bool = False, epsilon: float = 1e-7) -> tuple:
+    """
+    Calculate the PageRank of every vertex (differentiating actors and movies), or the personalized PageRank
+    of a seed actor, where the random surfer always teleports back to the seed.
+
+    Parameters
+    ----------
+    graph : Bipartite_Graph or Vectorized_Graph
+        The graph to search.
+    seed_actor : str
+        The seed actor's ID for a personalized PageRank (default None, the global PageRank).
+    damping : float
+        The probability of following an edge instead of teleporting (default 0.85).
+    tolerance : float
+        The L1 change of the scores at which the power iteration stops (default 1e-10).
+    approximate : bool
+        Compute the personalized PageRank by residual push, touching only the vertices near the seed (default False).
+    epsilon : float
+        The residual per unit of degree left unpushed in the approximate mode (default 1e-7).
+
+    Returns
+    -------
+    tuple
+        A tuple with the scores of the actors and the scores of the movies, as dictionaries with the format {vertex ID: score}.
+        All the scores add up to 1 (in the approximate mode only the vertices with some score are included, adding up to a bit less).
+    """
+    vectorized_graph = graph if isinstance(graph, Vectorized_Graph) else Vectorized_Graph(graph)
+    actor_mask = vectorized_graph.actor_mask()
+    if seed_actor is not None:
+        seed = vectorized_graph.index_of(seed_actor)
+        if seed < 0 or not actor_mask[seed]: raise ValueError(f"{seed_actor} is not an actor of the graph")
+    if seed_actor is not None and approximate:
+        scores = approximate_personalized_pagerank(vectorized_graph, seed, damping, epsilon)
+        score_items = scores.items()
+    else:
+        personalization = None
+        if seed_actor is not None:
+            personalization = np.zeros(len(vectorized_graph.degrees))
+            personalization[seed] = 1.0
+        scores = pagerank(vectorized_graph, damping, tolerance, personalization=personalization)
+        score_items = enumerate(scores.tolist())
+    actor_scores, movie_scores = {}, {}
+    for idx, score in score_items:
+        if actor_mask[idx]: actor_scores[vectorized_graph.vertices[idx]] = score
+        else: movie_scores[vectorized_graph.vertices[idx]] = score
+    return actor_scores, movie_scores
+
+
+def estimate_central_vertices_pagerank(graph, damping: float = 0.85, tolerance: float = 1e-10) -> tuple:
+    """
+    Find the most central vertices in the graph by PageRank (differentiating actors and movies). With damping close
+    to 1 the scores tend to the share of the visits of long random walks, what estimate_central_vertices samples.
+
+    Parameters
+    ----------
+    graph : Bipartite_Graph or Vectorized_Graph
+        The graph to search.
+    damping : float
+        The probability of following an edge instead of teleporting (default 0.85).
+    tolerance : float
+        The L1 change of the scores at which the power iteration stops (default 1e-10).
+
+    Returns
+    -------
+    tuple
+        A tuple with the greatest actor score and the actors with it, and the greatest movie score and the movies with it
+        (the same format as estimate_central_vertices, with scores instead of appearances).
+    """
+    actor_scores, movie_scores = pagerank_scores(graph, damping=damping, tolerance=tolerance)
+    results = []
+    for scores in (actor_scores, movie_scores):
+        max_score = max(scores.values(), default=0)
+        results += [max_score, [vertex for vertex, score in scores.items() if score == max_score]]
+    return tuple(results)
       
 
 def main():
-    movies_by_id, actors_by_movie, actor_names_by_id = read_data(MOVIES_DATA_PATH, ACTORS_DATA_PATH, ACTORS_NAMES_PATH)
-    graph = load_graph(movies_by_id, actors_by_movie, actor_names_by_id)
-    print("Graph loaded")
+    graph = load_or_build_graph()
     print("Number of vertices:", len(graph._graph))
     print("Example of calculating the degree of separation between two actors")
-    print(f"The degree of separation between {actor_names_by_id['nm2900398']} and {actor_names_by_id['nm1001351']} is {degree_of_separation(graph, 'nm2900398', 'nm1001351')}")
+    print(f"The degree of separation between {graph.get_vertex_data('nm2900398')['data']} and {graph.get_vertex_data('nm1001351')['data']} is {degree_of_separation(graph, 'nm2900398', 'nm1001351')}")
     print("Example of calculating the greatest distance to Kevin Bacon")
-    KB_distance = greatest_distance_to_Kevin_Bacon(graph)
+    distance_index = load_or_build_distance_index(graph)
+    KB_distance = greatest_distance_to_Kevin_Bacon(graph, distance_index)
     print(f"The greatest distance to Kevin Bacon is {KB_distance[0]}")
     print(f"The actors with the greatest distance to Kevin Bacon are {len(KB_distance[1])}")
+    print(f"Number of actors at every distance from Kevin Bacon: {distance_index.histogram()}")
     print("Example of estimating the central vertices")
     central_vertices = estimate_central_vertices(graph, 1000, 30)
     print(f"The actors with the most centrality appear on average {central_vertices[0]} times and their IDs are {central_vertices[1]}")
     print(f"The movies with the most centrality appear on average {central_vertices[2]} times and their IDs are {central_vertices[3]}")
+    print("Example of estimating the central vertices with a million vectorized walks")
+    central_vertices = estimate_central_vertices_vectorized(graph, 1000000, 30, seed=0)
+    print(f"The actors with the most centrality appear {central_vertices[0]} times and their IDs are {central_vertices[1]}")
+    print(f"The movies with the most centrality appear {central_vertices[2]} times and their IDs are {central_vertices[3]}")
+    print("Example of finding the central vertices with PageRank")
+    central_vertices = estimate_central_vertices_pagerank(graph)
+    print(f"The actors with the most centrality have a score of {central_vertices[0]} and their IDs are {central_vertices[1]}")
+    print(f"The movies with the most centrality have a score of {central_vertices[2]} and their IDs are {central_vertices[3]}")
+    actor_scores, _ = pagerank_scores(graph, Kevin_Bacon, approximate=True)
+    print(f"The actors closest to Kevin Bacon by personalized PageRank are {sorted(actor_scores, key=actor_scores.get, reverse=True)[1:11]}")
 
 
 if __name__ == '__main__':
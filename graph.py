@@ -1,4 +1,9 @@
-from typing import Optional, Any, List
+from typing import Optional, Any, List, Sequence, Dict, Iterable, Tuple
+from array import array
+from bisect import bisect_left
+from itertools import count
+import numpy as np
+_versions = count(1)  # process-wide, so no two graphs (or two states of a graph) share a version
 
 
 class Graph:
@@ -7,6 +12,21 @@ class Graph:
     """
     def __init__(self):
         self._graph = {}
+        self._components = None
+        self._version = next(_versions)
+
+    @classmethod
+    def from_adjacency(cls, adjacency: Dict[str, Dict[str, Any]], vertex_data: Dict[str, Any]) -> 'Graph':
+        """
+        Builds a graph adopting an adjacency without copying it
+        :param adjacency: the edge data by neighbor, by vertex (it must be symmetric)
+        :param vertex_data: data associated with each vertex
+        :return: a Graph
+        """
+        graph = cls()
+        for vertex, neighbors in adjacency.items():
+            graph._graph[vertex] = {'data': vertex_data.get(vertex), 'neighbors': neighbors}
+        return graph
 
     def add_vertex(self, vertex: str, data: Optional[Any]=None) -> None:
         """
@@ -16,6 +36,9 @@ class Graph:
         """
         if vertex not in self._graph:
             self._graph[vertex] = {'data': data, 'neighbors': {}}
+            self._version = next(_versions)
+            if self._components is not None:
+                self._components.add_vertex(vertex)
 
     def add_edge(self, vertex1: str, vertex2: str, data: Optional[Any]=None) -> None:
         """
@@ -28,6 +51,17 @@ class Graph:
             raise ValueError("The vertexes do not exist")
         self._graph[vertex1]['neighbors'][vertex2] = data
         self._graph[vertex2]['neighbors'][vertex1] = data
+        self._version = next(_versions)
+        if self._components is not None:
+            self._components.union(vertex1, vertex2)
+
+    def version(self) -> int:
+        """
+        Gets the version of the graph, a new one after every add_vertex or add_edge (edge data changed in place
+        does not change it, set it again with add_edge)
+        :return: the version
+        """
+        return self._version
 
     def get_neighbors(self, vertex) -> List[str]:
         """
@@ -40,6 +74,46 @@ class Graph:
         else:
             return []
 
+    def neighbors(self, vertex) -> Iterable[str]:
+        """
+        Get a view of the vertex neighbors (nothing is copied, do not modify the graph while iterating it)
+        :param vertex: the vertex to query
+        :return: the neighbor vertexes
+        """
+        if vertex in self._graph:
+            return self._graph[vertex]['neighbors'].keys()
+        return ()
+
+    def neighbors_with_data(self, vertex) -> Iterable[Tuple[str, Any]]:
+        """
+        Get a view of the vertex neighbors with their edge data (nothing is copied, do not modify the graph while iterating it)
+        :param vertex: the vertex to query
+        :return: the (neighbor, edge data) pairs
+        """
+        if vertex in self._graph:
+            return self._graph[vertex]['neighbors'].items()
+        return ()
+
+    def degree(self, vertex) -> int:
+        """
+        Get the number of vertex neighbors
+        :param vertex: the vertex to query
+        :return: the number of neighbors
+        """
+        if vertex in self._graph:
+            return len(self._graph[vertex]['neighbors'])
+        return 0
+
+    def set_vertex_data(self, vertex: str, data: Optional[Any]=None) -> None:
+        """
+        Sets vertex associated data
+        :param vertex: the vertex name
+        :param data: data associated with the vertex
+        """
+        if vertex not in self._graph:
+            raise ValueError("The vertex does not exist")
+        self._graph[vertex]['data'] = data
+
     def get_vertex_data(self, vertex: str) -> Optional[Any]:
         """
         Gets  vertex associated data
@@ -96,7 +170,908 @@ class Graph:
         """
         return self._graph
 
-        
-        
-    
-    
\ No newline at end of file
+    def get_components_index(self) -> 'Components_Index':
+        """
+        Gets the connected components index, built on the first call and kept up to date by add_vertex and add_edge
+        :return: the components index
+        """
+        if self._components is None:
+            components = Components_Index()
+            for vertex in self._graph:
+                components.add_vertex(vertex)
+            for vertex, data in self._graph.items():
+                for neighbor in data['neighbors']:
+                    components.union(vertex, neighbor)
+            self._components = components
+        return self._components
+
+
+class Payload_Table:
+    """
+    Payload_Table class (read-only sequence of edge payloads, each one the frozenset of its titles,
+    or of its tconst numbers when there is no titles table)
+    """
+    def __init__(self, offsets: Sequence[int], items: Sequence[int], titles: Optional[Sequence[str]]):
+        self._offsets = offsets
+        self._items = items
+        self._titles = titles
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, idx: int) -> frozenset:
+        items = self._items[self._offsets[idx]:self._offsets[idx + 1]]
+        if self._titles is None:
+            return frozenset(items)
+        return frozenset(self._titles[item] for item in items)
+
+
+class CSR_Graph:
+    """
+    Immutable compressed sparse row graph.
+    Vertex names are interned to dense ints in sorted order, so a vertex id can be
+    found by binary search over the names and the neighbors of vertex i are
+    neighbors[offsets[i]:offsets[i + 1]] (sorted). Every undirected edge is stored
+    in both rows, and both slots point to the same entry of the edge data table.
+    """
+    def __init__(self, vertices: Sequence[str], vertex_data: Sequence[Any], offsets: Sequence[int],
+                 neighbors: Sequence[int], edge_ids: Sequence[int], edge_data: Sequence[Any],
+                 snapshot_path: Optional[str] = None):
+        self._vertices = vertices
+        self._vertex_data = vertex_data
+        self._offsets = offsets
+        self._neighbors = neighbors
+        self._edge_ids = edge_ids
+        self._edge_data = edge_data
+        self.snapshot_path = snapshot_path  # the file the arrays are mapped from, if any
+        self._components = None
+        self._version = next(_versions)
+
+    @classmethod
+    def from_graph(cls, graph: Graph) -> 'CSR_Graph':
+        """
+        Builds a CSR graph from a Graph (for example the output of grafo_a.load_graph)
+        :param graph: the graph to compact
+        :return: a CSR_Graph with the same vertices, edges and data
+        """
+        vertices = sorted(graph.get_graph_elements())
+        index = {vertex: idx for idx, vertex in enumerate(vertices)}
+        vertex_data = [graph.get_vertex_data(vertex) for vertex in vertices]
+        offsets = array('q', [0])
+        neighbors = array('i')
+        edge_ids = array('i')
+        edge_data = []
+        for idx, vertex in enumerate(vertices):
+            for neighbor in sorted(index[n] for n in graph.neighbors(vertex)):
+                neighbors.append(neighbor)
+                if idx <= neighbor:
+                    edge_ids.append(len(edge_data))
+                    edge_data.append(graph.get_edge_data(vertex, vertices[neighbor]))
+                else:
+                    # The reverse slot was already written when the neighbor's row was built
+                    slot = bisect_left(neighbors, idx, offsets[neighbor], offsets[neighbor + 1])
+                    edge_ids.append(edge_ids[slot])
+            offsets.append(len(neighbors))
+        return cls(vertices, vertex_data, offsets, neighbors, edge_ids, edge_data)
+
+    @classmethod
+    def from_casts(cls, casts: Iterable[Tuple[Any, Iterable[str]]], actor_names: Dict[str, Any]) -> 'CSR_Graph':
+        """
+        Builds the co-star graph straight from the title (or tconst number) and cast of every movie, as
+        grafo_a.load_graph_bulk does but without a Graph in between: the casts are interned to int arrays and
+        the pairs of every cast size are expanded at once with NumPy, so the peak memory is a few int arrays
+        per (pair of co-stars, movie) instead of the dictionaries of a Graph. The edge data are the frozensets
+        of the distinct titles (or tconst numbers) shared, in a Payload_Table.
+        :param casts: the (title or tconst number, actor ids) of every movie
+        :param actor_names: the actors names by their ids ("ERROR" for the missing ones, as in load_graph)
+        :return: a CSR_Graph
+        """
+        index = {}
+        titles = {}
+        movie_items = array('q')
+        cast_offsets = array('q', [0])
+        cast_actors = array('i')
+        movie_ids_as_int = None
+        for movie, cast in casts:
+            cast = list(dict.fromkeys(cast))
+            if len(cast) < 2:
+                continue
+            if movie_ids_as_int is None:
+                movie_ids_as_int = isinstance(movie, int)
+            elif isinstance(movie, int) != movie_ids_as_int:
+                raise ValueError("The movies mix tconst numbers and titles")
+            movie_items.append(movie if movie_ids_as_int else titles.setdefault(movie, len(titles)))
+            cast_actors.extend(index.setdefault(actor, len(index)) for actor in cast)
+            cast_offsets.append(len(cast_actors))
+        vertices = sorted(index)
+        rank = np.empty(len(index), dtype=np.int32)
+        rank[np.fromiter((index[actor] for actor in vertices), dtype=np.int64, count=len(index))] = \
+            np.arange(len(index), dtype=np.int32)
+        del index
+        cast_ids = rank[np.frombuffer(cast_actors, dtype=np.int32)] if len(cast_actors) else np.zeros(0, dtype=np.int32)
+        starts = np.frombuffer(cast_offsets, dtype=np.int64)[:-1]
+        sizes = np.diff(np.frombuffer(cast_offsets, dtype=np.int64))
+        items = np.frombuffer(movie_items, dtype=np.int64) if len(movie_items) else np.zeros(0, dtype=np.int64)
+        lows, highs, pair_items = [np.zeros(0, dtype=np.int32)], [np.zeros(0, dtype=np.int32)], [np.zeros(0, dtype=np.int64)]
+        for size in np.unique(sizes).tolist():
+            movies = np.flatnonzero(sizes == size)
+            members = cast_ids[starts[movies][:, None] + np.arange(size)]
+            first, second = np.triu_indices(size, 1)
+            lows.append(np.minimum(members[:, first], members[:, second]).ravel())
+            highs.append(np.maximum(members[:, first], members[:, second]).ravel())
+            pair_items.append(np.repeat(items[movies], len(first)))
+        lows, highs, pair_items = np.concatenate(lows), np.concatenate(highs), np.concatenate(pair_items)
+        # One payload per edge (low < high) with its distinct movies
+        order = np.lexsort((pair_items, highs, lows))
+        lows, highs, pair_items = lows[order], highs[order], pair_items[order]
+        distinct = np.ones(len(lows), dtype=bool)
+        distinct[1:] = (lows[1:] != lows[:-1]) | (highs[1:] != highs[:-1]) | (pair_items[1:] != pair_items[:-1])
+        lows, highs, pair_items = lows[distinct], highs[distinct], pair_items[distinct]
+        new_edge = np.ones(len(lows), dtype=bool)
+        new_edge[1:] = (lows[1:] != lows[:-1]) | (highs[1:] != highs[:-1])
+        payload_offsets = np.append(np.flatnonzero(new_edge), len(lows)).astype(np.int64)
+        lows, highs = lows[new_edge], highs[new_edge]
+        del new_edge, distinct, order
+        # Both slots of every edge, sorted by row and neighbor
+        rows = np.concatenate([lows, highs])
+        columns = np.concatenate([highs, lows])
+        edge_ids = np.tile(np.arange(len(lows), dtype=np.int32), 2)
+        order = np.lexsort((columns, rows))
+        offsets = np.zeros(len(vertices) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(vertices)), out=offsets[1:])
+        edge_data = Payload_Table(array('q', payload_offsets.tobytes()), array('q', pair_items.tobytes()),
+                                  None if movie_ids_as_int else list(titles))
+        return cls(vertices, [actor_names.get(actor, "ERROR") for actor in vertices], array('q', offsets.tobytes()),
+                   array('i', columns[order].astype(np.int32).tobytes()), array('i', edge_ids[order].tobytes()), edge_data)
+
+    def version(self) -> int:
+        """
+        Gets the version of the graph (a CSR_Graph never changes, so it keeps the one it was built with)
+        :return: the version
+        """
+        return self._version
+
+    def index_of(self, vertex: str) -> int:
+        """
+        Gets the interned id of a vertex
+        :param vertex: the vertex name
+        :return: the vertex id, or -1 if the vertex does not exist
+        """
+        idx = bisect_left(self._vertices, vertex)
+        if idx < len(self._vertices) and self._vertices[idx] == vertex:
+            return idx
+        return -1
+
+    def vertex_name(self, idx: int) -> str:
+        """
+        Gets the vertex name of an interned id
+        :param idx: the vertex id
+        :return: the vertex name
+        """
+        return self._vertices[idx]
+
+    def number_of_vertices(self) -> int:
+        """
+        Gets the number of vertices
+        :return: the number of vertices
+        """
+        return len(self._vertices)
+
+    def number_of_edges(self) -> int:
+        """
+        Gets the number of undirected edges
+        :return: the number of edges
+        """
+        return len(self._edge_data)
+
+    def get_csr_arrays(self) -> tuple:
+        """
+        Gets the raw CSR arrays
+        :return: a tuple with the format (offsets, neighbors, edge_ids)
+        """
+        return self._offsets, self._neighbors, self._edge_ids
+
+    def get_edge_payload(self, edge_id: int) -> Optional[Any]:
+        """
+        Gets the data of an edge by its position in the edge data table
+        :param edge_id: the edge id
+        :return: the edge data
+        """
+        return self._edge_data[edge_id]
+
+    def neighbor_ids(self, idx: int) -> Sequence[int]:
+        """
+        Gets the ids of the neighbors of a vertex id, without copying them
+        :param idx: the vertex id
+        :return: a sorted view of the neighbor ids
+        """
+        return memoryview(self._neighbors)[self._offsets[idx]:self._offsets[idx + 1]]
+
+    def neighbor_ids_with_data(self, idx: int) -> Iterable[Tuple[int, Any]]:
+        """
+        Gets the ids of the neighbors of a vertex id with the data of their edges
+        :param idx: the vertex id
+        :return: an iterable of (neighbor id, edge data)
+        """
+        return ((self._neighbors[slot], self._edge_data[self._edge_ids[slot]]) for slot in range(self._offsets[idx], self._offsets[idx + 1]))
+
+    def get_neighbors(self, vertex) -> List[str]:
+        """
+        Get the list of vertex neighbors
+        :param vertex: the vertex to query
+        :return: the list of neighbor vertexes
+        """
+        idx = self.index_of(vertex)
+        if idx < 0:
+            return []
+        return [self._vertices[neighbor] for neighbor in self.neighbor_ids(idx)]
+
+    def neighbors(self, vertex) -> Iterable[str]:
+        """
+        Get the vertex neighbors lazily, without building a list
+        :param vertex: the vertex to query
+        :return: the neighbor vertexes
+        """
+        idx = self.index_of(vertex)
+        if idx < 0:
+            return ()
+        return map(self._vertices.__getitem__, self.neighbor_ids(idx))
+
+    def neighbors_with_data(self, vertex) -> Iterable[Tuple[str, Any]]:
+        """
+        Get the vertex neighbors with their edge data lazily, without building a list
+        :param vertex: the vertex to query
+        :return: the (neighbor, edge data) pairs
+        """
+        idx = self.index_of(vertex)
+        if idx < 0:
+            return ()
+        return ((self._vertices[self._neighbors[slot]], self._edge_data[self._edge_ids[slot]])
+                for slot in range(self._offsets[idx], self._offsets[idx + 1]))
+
+    def degree(self, vertex) -> int:
+        """
+        Get the number of vertex neighbors
+        :param vertex: the vertex to query
+        :return: the number of neighbors
+        """
+        idx = self.index_of(vertex)
+        if idx < 0:
+            return 0
+        return self._offsets[idx + 1] - self._offsets[idx]
+
+    def get_vertex_data(self, vertex: str) -> Optional[Any]:
+        """
+        Gets  vertex associated data
+        :param vertex: the vertex name
+        :return: the vertex data
+        """
+        idx = self.index_of(vertex)
+        if idx < 0:
+            return None
+        return self._vertex_data[idx]
+
+    def _edge_slot(self, idx1: int, idx2: int) -> int:
+        """
+        Gets the position of an edge in the neighbors array
+        :param idx1: the vertex1 id
+        :param idx2: the vertex2 id
+        :return: the slot, or -1 if the edge does not exist
+        """
+        if idx1 < 0 or idx2 < 0:
+            return -1
+        end = self._offsets[idx1 + 1]
+        slot = bisect_left(self._neighbors, idx2, self._offsets[idx1], end)
+        if slot < end and self._neighbors[slot] == idx2:
+            return slot
+        return -1
+
+    def get_edge_data(self, vertex1: str, vertex2: str) -> Optional[Any]:
+        """
+        Gets the vertexes edge data
+        :param vertex1: the vertex1 name
+        :param vertex2: the vertex2 name
+        :return: vertexes edge data
+        """
+        slot = self._edge_slot(self.index_of(vertex1), self.index_of(vertex2))
+        if slot < 0:
+            raise ValueError("The edge does not exist")
+        return self._edge_data[self._edge_ids[slot]]
+
+    def get_edge_data_by_ids(self, idx1: int, idx2: int) -> Optional[Any]:
+        """
+        Gets the edge data of two vertex ids
+        :param idx1: the vertex1 id
+        :param idx2: the vertex2 id
+        :return: the edge data, or None if the edge does not exist
+        """
+        slot = self._edge_slot(idx1, idx2)
+        return self._edge_data[self._edge_ids[slot]] if slot >= 0 else None
+
+    def print_graph(self) -> None:
+        """
+        Prints the graph
+        """
+        for idx, vertex in enumerate(self._vertices):
+            print("Vertex:", vertex)
+            print("Data:", self._vertex_data[idx])
+            print("Neighbors:", {self._vertices[neighbor]: self._edge_data[self._edge_ids[slot]]
+                                 for slot, neighbor in enumerate(self.neighbor_ids(idx), self._offsets[idx])})
+            print("")
+
+    def vertex_exists(self, vertex: str) -> bool:
+        """
+        If contains a vertex
+        :param vertex: the vertex name
+        :return: boolean
+        """
+        return self.index_of(vertex) >= 0
+
+    def edge_exists(self, vertex1: str, vertex2: str) -> bool:
+        """
+        If contains an edge
+        :param vertex1: the vertex1 name
+        :param vertex2: the vertex2 name
+        :return: boolean
+        """
+        return self._edge_slot(self.index_of(vertex1), self.index_of(vertex2)) >= 0
+
+    def get_graph_elements(self) -> Sequence[str]:
+        """
+        Gets the graph elements
+        :return: the vertex names, sorted by id
+        """
+        return self._vertices
+
+    def get_components_index(self) -> 'Component_Labels':
+        """
+        Gets the connected components index, built on the first call
+        :return: the components index
+        """
+        if self._components is None:
+            self._components = Component_Labels(self)
+        return self._components
+
+    def has_components_index(self) -> bool:
+        """
+        Checks if the connected components index was built
+        :return: True if it was built, False otherwise
+        """
+        return self._components is not None
+
+    def set_components_index(self, components: 'Component_Labels') -> None:
+        """
+        Adopts a components index computed elsewhere (see Component_Labels.extended)
+        :param components: the components index of this graph
+        """
+        self._components = components
+
+
+class Actor_Projection:
+    """
+    Actor_Projection class (the co-star graph of the actors, answered through the movie layer of a bipartite CSR).
+    Only the movies of every actor and the cast of every movie are stored, so the clique of a big cast is never
+    built: the neighbors of an actor are the distinct actors of their movies, and the data of an edge are the
+    distinct titles both actors were in, as in the graph of grafo_a.load_graph_bulk. It has the read API of a Graph
+    and never changes. Actors are interned to dense ints in sorted order, as in a CSR_Graph, and the movies keep
+    the order they were given in, so the neighbors of an actor come in the order load_graph_bulk adds them.
+    """
+    def __init__(self, actors: Sequence[str], actor_names: Sequence[Any], titles: Sequence[Any], actor_offsets: Sequence[int],
+                 actor_movies: Sequence[int], movie_offsets: Sequence[int], movie_actors: Sequence[int]):
+        self._actors = actors
+        self._actor_names = actor_names
+        self._titles = titles
+        self._actor_offsets = actor_offsets
+        self._actor_movies = actor_movies
+        self._movie_offsets = movie_offsets
+        self._movie_actors = movie_actors
+        self._components = None
+        self._version = next(_versions)
+
+    @classmethod
+    def from_casts(cls, casts: Iterable[Tuple[Any, Iterable[str]]], actor_names: Dict[str, Any],
+                   max_cast_size: Optional[int] = None) -> 'Actor_Projection':
+        """
+        Builds the projection from the title and cast of every movie. Movies with less than two actors add no
+        edge and are left out, and so are the actors that are only in them.
+        :param casts: the (title, actor ids) of every movie
+        :param actor_names: the actors names by their ids ("ERROR" for the missing ones, as in load_graph)
+        :param max_cast_size: optional cap, movies with a larger cast are left out (they add the most co-star edges)
+        :return: an Actor_Projection
+        """
+        titles = []
+        kept_casts = []
+        for title, cast in casts:
+            cast = list(dict.fromkeys(cast))
+            if len(cast) < 2 or (max_cast_size is not None and len(cast) > max_cast_size):
+                continue
+            titles.append(title)
+            kept_casts.append(cast)
+        actors = sorted({actor for cast in kept_casts for actor in cast})
+        index = {actor: idx for idx, actor in enumerate(actors)}
+        movie_offsets = array('q', [0])
+        movie_actors = array('i')
+        movies_per_actor = array('q', [0]) * (len(actors) + 1)
+        for cast in kept_casts:
+            for actor in cast:
+                idx = index[actor]
+                movie_actors.append(idx)
+                movies_per_actor[idx + 1] += 1
+            movie_offsets.append(len(movie_actors))
+        del kept_casts, index
+        # Counting sort of the (movie, actor) pairs by actor, the movies of every actor stay in order
+        actor_offsets = array('q', [0]) * (len(actors) + 1)
+        for idx in range(len(actors)):
+            actor_offsets[idx + 1] = actor_offsets[idx] + movies_per_actor[idx + 1]
+        next_slot = actor_offsets[:-1]
+        actor_movies = array('i', [0]) * len(movie_actors)
+        for movie in range(len(titles)):
+            for idx in movie_actors[movie_offsets[movie]:movie_offsets[movie + 1]]:
+                actor_movies[next_slot[idx]] = movie
+                next_slot[idx] += 1
+        actor_names = [actor_names.get(actor, "ERROR") for actor in actors]
+        return cls(actors, actor_names, titles, actor_offsets, actor_movies, movie_offsets, movie_actors)
+
+    @classmethod
+    def from_bipartite(cls, graph, max_cast_size: Optional[int] = None) -> 'Actor_Projection':
+        """
+        Builds the projection of the actors of a grafo_b.Bipartite_Graph, sharing its titles and names
+        :param graph: the Bipartite_Graph
+        :param max_cast_size: optional cap, movies with a larger cast are left out
+        :return: an Actor_Projection
+        """
+        vertices = graph.get_graph_elements()
+        casts = ((vertex['data'], vertex['neighbors']) for vertex in vertices.values() if vertex['type'] == 'movie')
+        actor_names = {actor: vertex['data'] for actor, vertex in vertices.items() if vertex['type'] == 'actor'}
+        return cls.from_casts(casts, actor_names, max_cast_size)
+
+    def version(self) -> int:
+        """
+        Gets the version of the graph (an Actor_Projection never changes, so it keeps the one it was built with)
+        :return: the version
+        """
+        return self._version
+
+    def index_of(self, vertex: str) -> int:
+        """
+        Gets the interned id of an actor
+        :param vertex: the actor id
+        :return: the vertex id, or -1 if the actor does not exist
+        """
+        idx = bisect_left(self._actors, vertex)
+        if idx < len(self._actors) and self._actors[idx] == vertex:
+            return idx
+        return -1
+
+    def vertex_name(self, idx: int) -> str:
+        """
+        Gets the actor id of an interned id
+        :param idx: the vertex id
+        :return: the actor id
+        """
+        return self._actors[idx]
+
+    def number_of_vertices(self) -> int:
+        """
+        Gets the number of actors
+        :return: the number of actors
+        """
+        return len(self._actors)
+
+    def number_of_movies(self) -> int:
+        """
+        Gets the number of movies kept
+        :return: the number of movies
+        """
+        return len(self._titles)
+
+    def get_projection_arrays(self) -> tuple:
+        """
+        Gets the raw arrays of the movie layer
+        :return: a tuple with the format (actor offsets, actor movies, movie offsets, movie actors)
+        """
+        return self._actor_offsets, self._actor_movies, self._movie_offsets, self._movie_actors
+
+    def movie_ids(self, idx: int) -> Sequence[int]:
+        """
+        Gets the movies of an actor id, without copying them
+        :param idx: the vertex id
+        :return: a view of the movie ids, in movie order
+        """
+        return memoryview(self._actor_movies)[self._actor_offsets[idx]:self._actor_offsets[idx + 1]]
+
+    def cast_ids(self, movie: int) -> Sequence[int]:
+        """
+        Gets the actors of a movie id, without copying them
+        :param movie: the movie id
+        :return: a view of the actor ids
+        """
+        return memoryview(self._movie_actors)[self._movie_offsets[movie]:self._movie_offsets[movie + 1]]
+
+    def movie_title(self, movie: int) -> Any:
+        """
+        Gets the title of a movie id
+        :param movie: the movie id
+        :return: the title
+        """
+        return self._titles[movie]
+
+    def movie_layer_arrays(self) -> Tuple[array, array]:
+        """
+        Gets the CSR arrays of the bipartite graph of actors and movies (actor i is vertex i and movie m is vertex
+        number_of_vertices() + m), where a BFS reaches the co-stars of an actor every two levels
+        :return: a tuple with the format (offsets, neighbors)
+        """
+        number_of_actors = len(self._actors)
+        offsets = array('q', self._actor_offsets)
+        movies_start = offsets[-1]
+        offsets.extend(movies_start + offset for offset in self._movie_offsets[1:])
+        neighbors = array('i', (number_of_actors + movie for movie in self._actor_movies))
+        neighbors.extend(self._movie_actors)
+        return offsets, neighbors
+
+    def neighbor_ids(self, idx: int) -> Iterable[int]:
+        """
+        Gets the ids of the co-stars of an actor id
+        :param idx: the vertex id
+        :return: the neighbor ids, in the order of their first shared movie
+        """
+        costars = {}
+        for movie in self.movie_ids(idx):
+            costars.update(dict.fromkeys(self.cast_ids(movie)))
+        costars.pop(idx, None)
+        return costars.keys()
+
+    def _costar_titles(self, idx: int) -> Dict[int, List[Any]]:
+        costars = {}
+        for movie in self.movie_ids(idx):
+            title = self._titles[movie]
+            for costar in self.cast_ids(movie):
+                titles = costars.get(costar)
+                if titles is None:
+                    costars[costar] = [title]
+                elif title not in titles:
+                    titles.append(title)
+        costars.pop(idx, None)
+        return costars
+
+    def get_neighbors(self, vertex) -> List[str]:
+        """
+        Get the list of vertex neighbors
+        :param vertex: the vertex to query
+        :return: the list of neighbor vertexes
+        """
+        return list(self.neighbors(vertex))
+
+    def neighbors(self, vertex) -> Iterable[str]:
+        """
+        Get the vertex neighbors, gathered from the casts of its movies
+        :param vertex: the vertex to query
+        :return: the neighbor vertexes
+        """
+        idx = self.index_of(vertex)
+        if idx < 0:
+            return ()
+        return map(self._actors.__getitem__, self.neighbor_ids(idx))
+
+    def neighbors_with_data(self, vertex) -> Iterable[Tuple[str, Any]]:
+        """
+        Get the vertex neighbors with their edge data (the list of titles they share), gathered from the casts of its movies
+        :param vertex: the vertex to query
+        :return: the (neighbor, edge data) pairs
+        """
+        idx = self.index_of(vertex)
+        if idx < 0:
+            return ()
+        return ((self._actors[costar], titles) for costar, titles in self._costar_titles(idx).items())
+
+    def degree(self, vertex) -> int:
+        """
+        Get the number of vertex neighbors
+        :param vertex: the vertex to query
+        :return: the number of neighbors
+        """
+        idx = self.index_of(vertex)
+        if idx < 0:
+            return 0
+        return len(self.neighbor_ids(idx))
+
+    def get_vertex_data(self, vertex: str) -> Optional[Any]:
+        """
+        Gets  vertex associated data
+        :param vertex: the vertex name
+        :return: the vertex data (the actor name)
+        """
+        idx = self.index_of(vertex)
+        if idx < 0:
+            return None
+        return self._actor_names[idx]
+
+    def _shared_titles(self, idx1: int, idx2: int) -> List[Any]:
+        if idx1 < 0 or idx2 < 0 or idx1 == idx2:
+            return []
+        movies2 = set(self.movie_ids(idx2))
+        return list(dict.fromkeys(self._titles[movie] for movie in self.movie_ids(idx1) if movie in movies2))
+
+    def get_edge_data(self, vertex1: str, vertex2: str) -> Optional[Any]:
+        """
+        Gets the vertexes edge data
+        :param vertex1: the vertex1 name
+        :param vertex2: the vertex2 name
+        :return: vertexes edge data (the list of titles they share)
+        """
+        titles = self._shared_titles(self.index_of(vertex1), self.index_of(vertex2))
+        if not titles:
+            raise ValueError("The edge does not exist")
+        return titles
+
+    def print_graph(self) -> None:
+        """
+        Prints the graph
+        """
+        for idx, vertex in enumerate(self._actors):
+            print("Vertex:", vertex)
+            print("Data:", self._actor_names[idx])
+            print("Neighbors:", {self._actors[costar]: titles for costar, titles in self._costar_titles(idx).items()})
+            print("")
+
+    def vertex_exists(self, vertex: str) -> bool:
+        """
+        If contains a vertex
+        :param vertex: the vertex name
+        :return: boolean
+        """
+        return self.index_of(vertex) >= 0
+
+    def edge_exists(self, vertex1: str, vertex2: str) -> bool:
+        """
+        If contains an edge
+        :param vertex1: the vertex1 name
+        :param vertex2: the vertex2 name
+        :return: boolean
+        """
+        return bool(self._shared_titles(self.index_of(vertex1), self.index_of(vertex2)))
+
+    def get_graph_elements(self) -> Sequence[str]:
+        """
+        Gets the graph elements
+        :return: the actor ids, sorted by id
+        """
+        return self._actors
+
+    def get_components_index(self) -> 'Component_Labels':
+        """
+        Gets the connected components index, built on the first call by one scan over the movie layer
+        (every movie is expanded once, instead of every co-star edge)
+        :return: the components index
+        """
+        if self._components is None:
+            labels = array('i', [-1]) * len(self._actors)
+            sizes = []
+            expanded = bytearray(len(self._titles))
+            for start in range(len(self._actors)):
+                if labels[start] >= 0:
+                    continue
+                label = len(sizes)
+                labels[start] = label
+                stack = [start]
+                size = 0
+                while stack:
+                    idx = stack.pop()
+                    size += 1
+                    for movie in self.movie_ids(idx):
+                        if expanded[movie]:
+                            continue
+                        expanded[movie] = 1
+                        for costar in self.cast_ids(movie):
+                            if labels[costar] < 0:
+                                labels[costar] = label
+                                stack.append(costar)
+                sizes.append(size)
+            self._components = Component_Labels(self, labels, sizes)
+        return self._components
+
+    def nbytes(self) -> int:
+        """
+        Gets the size of the CSR arrays (the titles and names are shared with the data the projection was built from)
+        :return: the number of bytes
+        """
+        return sum(len(values) * values.itemsize for values in (self._actor_offsets, self._actor_movies,
+                                                                  self._movie_offsets, self._movie_actors))
+
+
+def _ranked_components(groups: List[List[str]]) -> Dict[str, List[str]]:
+    groups.sort(key=len, reverse=True)
+    return {f"Component {idx+1}": group for idx, group in enumerate(groups)}
+
+
+class Components_Index:
+    """
+    Components_Index class (union-find with path halving and union by size, updated one vertex or edge at a time)
+    """
+    def __init__(self):
+        self._parent = {}
+        self._size = {}
+        self._ranked = None
+
+    def add_vertex(self, vertex: str) -> None:
+        """
+        Adds a vertex as its own component
+        :param vertex: the vertex name
+        """
+        if vertex not in self._parent:
+            self._parent[vertex] = vertex
+            self._size[vertex] = 1
+            self._ranked = None
+
+    def find(self, vertex: str) -> str:
+        """
+        Gets the representative of the component of a vertex
+        :param vertex: the vertex name
+        :return: the representative vertex
+        """
+        parent = self._parent
+        while parent[vertex] != vertex:
+            parent[vertex] = parent[parent[vertex]]
+            vertex = parent[vertex]
+        return vertex
+
+    def union(self, vertex1: str, vertex2: str) -> None:
+        """
+        Merges the components of two vertices
+        :param vertex1: the vertex1 name
+        :param vertex2: the vertex2 name
+        """
+        root1, root2 = self.find(vertex1), self.find(vertex2)
+        if root1 == root2:
+            return
+        if self._size[root1] < self._size[root2]:
+            root1, root2 = root2, root1
+        self._parent[root2] = root1
+        self._size[root1] += self._size.pop(root2)
+        self._ranked = None
+
+    def component_of(self, vertex: str) -> str:
+        """
+        Gets the component id of a vertex
+        :param vertex: the vertex name
+        :return: the component id (its representative vertex)
+        """
+        return self.find(vertex)
+
+    def component_size(self, vertex: str) -> int:
+        """
+        Gets the size of the component of a vertex
+        :param vertex: the vertex name
+        :return: the number of vertices in the component
+        """
+        return self._size[self.find(vertex)]
+
+    def number_of_components(self) -> int:
+        """
+        Gets the number of components
+        :return: the number of components
+        """
+        return len(self._size)
+
+    def ranked_components(self) -> Dict[str, List[str]]:
+        """
+        Gets the vertices of every component, cached until the next change
+        :return: a dictionary with the format {"Component i": [vertex1, vertex2, ...]} from the largest component
+        """
+        if self._ranked is None:
+            groups = {}
+            for vertex in self._parent:
+                groups.setdefault(self.find(vertex), []).append(vertex)
+            self._ranked = _ranked_components(list(groups.values()))
+        return self._ranked
+
+
+class Component_Labels:
+    """
+    Component_Labels class (component id of every vertex of an immutable CSR_Graph, labeled by one linear scan,
+    or of an Actor_Projection, that labels itself)
+    """
+    def __init__(self, graph, labels: Optional[array] = None, sizes: Optional[List[int]] = None):
+        self._graph = graph
+        self._ranked = None
+        if labels is not None:
+            self._labels = labels
+            self._sizes = sizes
+            return
+        offsets, neighbors, _ = graph.get_csr_arrays()
+        number_of_vertices = graph.number_of_vertices()
+        self._labels = array('i', [-1]) * number_of_vertices
+        self._sizes = []
+        for start in range(number_of_vertices):
+            if self._labels[start] >= 0:
+                continue
+            label = len(self._sizes)
+            self._labels[start] = label
+            stack = [start]
+            size = 0
+            while stack:
+                vertex = stack.pop()
+                size += 1
+                for slot in range(offsets[vertex], offsets[vertex + 1]):
+                    neighbor = neighbors[slot]
+                    if self._labels[neighbor] < 0:
+                        self._labels[neighbor] = label
+                        stack.append(neighbor)
+            self._sizes.append(size)
+
+    def component_of(self, vertex: str) -> int:
+        """
+        Gets the component id of a vertex
+        :param vertex: the vertex name
+        :return: the component id
+        """
+        idx = self._graph.index_of(vertex)
+        if idx < 0:
+            raise KeyError(vertex)
+        return self._labels[idx]
+
+    def component_size(self, vertex: str) -> int:
+        """
+        Gets the size of the component of a vertex
+        :param vertex: the vertex name
+        :return: the number of vertices in the component
+        """
+        return self._sizes[self.component_of(vertex)]
+
+    def number_of_components(self) -> int:
+        """
+        Gets the number of components
+        :return: the number of components
+        """
+        return len(self._sizes)
+
+    def extended(self, graph: CSR_Graph, new_ids: Sequence[int], edges: Iterable[Tuple[int, int]]) -> 'Component_Labels':
+        """
+        Gets the components index of a graph made of the vertices of this one (at other ids) plus some vertices and
+        edges (see snapshot.extend_graph), merging the components joined by the new edges instead of labeling again
+        :param graph: the extended graph
+        :param new_ids: the id in the extended graph of every vertex id of this one
+        :param edges: the new edges, as pairs of vertex ids of the extended graph
+        :return: the components index of the extended graph
+        """
+        labels = array('i', [-1]) * graph.number_of_vertices()
+        for idx, label in zip(new_ids, self._labels):
+            labels[idx] = label
+        sizes = list(self._sizes)
+        for idx in range(len(labels)):
+            if labels[idx] < 0:
+                labels[idx] = len(sizes)
+                sizes.append(1)
+        parent = list(range(len(sizes)))
+
+        def find(label: int) -> int:
+            while parent[label] != label:
+                parent[label] = parent[parent[label]]
+                label = parent[label]
+            return label
+        for idx1, idx2 in edges:
+            root1, root2 = find(labels[idx1]), find(labels[idx2])
+            if root1 != root2:
+                if sizes[root1] < sizes[root2]:
+                    root1, root2 = root2, root1
+                parent[root2] = root1
+                sizes[root1] += sizes[root2]
+        roots = [find(label) for label in range(len(sizes))]
+        dense = {root: label for label, root in enumerate(dict.fromkeys(roots))}
+        relabel = [dense[root] for root in roots]
+        for idx in range(len(labels)):
+            labels[idx] = relabel[labels[idx]]
+        return Component_Labels(graph, labels, [sizes[root] for root in dense])
+
+    def ranked_components(self) -> Dict[str, List[str]]:
+        """
+        Gets the vertices of every component, cached
+        :return: a dictionary with the format {"Component i": [vertex1, vertex2, ...]} from the largest component
+        """
+        if self._ranked is None:
+            groups = [[] for _ in self._sizes]
+            for idx, vertex in enumerate(self._graph.get_graph_elements()):
+                groups[self._labels[idx]].append(vertex)
+            self._ranked = _ranked_components(groups)
+        return self._ranked
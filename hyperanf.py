@@ -0,0 +1,189 @@
+from typing import Optional, Sequence, List
+import math
+import numpy as np
+from vectorized_bfs import Vectorized_Graph
+REGISTERS_LOG2 = 6  # 64 registers (one byte each) per vertex, about 13% standard error per counter
+EDGE_BLOCK = 1 << 14  # edges whose registers are gathered at once while propagating (about 1 MB, it stays in cache)
+ESTIMATE_BLOCK = 1 << 16  # vertices whose counters are estimated at once
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """
+    splitmix64 finalizer, a fast well mixed 64-bit hash of an array of integers
+    """
+    with np.errstate(over='ignore'):
+        values = values.astype(np.uint64)
+        values = (values ^ (values >> np.uint64(30))) * np.uint64(0xbf58476d1ce4e5b9)
+        values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94d049bb133111eb)
+        return values ^ (values >> np.uint64(31))
+
+
+def _alpha(number_of_registers: int) -> float:
+    if number_of_registers == 16: return 0.673
+    if number_of_registers == 32: return 0.697
+    if number_of_registers == 64: return 0.709
+    return 0.7213 / (1 + 1.079 / number_of_registers)
+
+
+class Distance_Distribution:
+    """
+    Distance_Distribution class (estimated neighborhood function N(t), the number of ordered pairs of vertices
+    at distance t or less, with its standard error, and the standard error of every bin N(t) - N(t - 1))
+    """
+    def __init__(self, neighborhood: Sequence[float], errors: Sequence[float], bin_errors: Sequence[float]):
+        self.neighborhood = list(neighborhood)
+        self.errors = list(errors)
+        self.bin_errors = list(bin_errors)
+
+    def histogram(self) -> List[tuple]:
+        """
+        Gets the number of ordered pairs of distinct vertices at every distance. The error of a bin is the standard
+        error of its mean across the independent runs (NaN with a single run, it does not include the bias of the
+        counters), it cannot be derived from the errors of N(t), that are relative to the cumulative count and
+        would dwarf the small bins of the tail.
+        :return: a list of (distance, number of pairs, standard error) from distance 1
+        """
+        return [(distance, self.neighborhood[distance] - self.neighborhood[distance - 1], self.bin_errors[distance])
+                for distance in range(1, len(self.neighborhood))]
+
+    def connected_pairs(self) -> float:
+        """
+        Gets the number of ordered pairs of distinct vertices that are connected
+        :return: the number of pairs
+        """
+        return self.neighborhood[-1] - self.neighborhood[0]
+
+    def mean_separation(self) -> float:
+        """
+        Gets the average distance between connected vertices
+        :return: the average distance (0 if no vertex is connected to another one)
+        """
+        if self.connected_pairs() <= 0:
+            return 0.0
+        return sum(distance * pairs for distance, pairs, _ in self.histogram()) / self.connected_pairs()
+
+    def effective_diameter(self, fraction: float = 0.9) -> float:
+        """
+        Gets the distance within which a fraction of the connected pairs are, interpolating between distances
+        :param fraction: the fraction of the connected pairs (default 0.9)
+        :return: the effective diameter
+        """
+        if self.connected_pairs() <= 0:
+            return 0.0
+        goal = self.neighborhood[0] + fraction * self.connected_pairs()
+        for distance in range(1, len(self.neighborhood)):
+            if self.neighborhood[distance] >= goal:
+                previous = self.neighborhood[distance - 1]
+                return distance - 1 + (goal - previous) / (self.neighborhood[distance] - previous)
+        return float(len(self.neighborhood) - 1)
+
+    def diameter(self) -> int:
+        """
+        Gets the last distance at which the counters grew. It is a lower bound of the diameter, a counter
+        can miss the few vertices of the last levels.
+        :return: the diameter estimate
+        """
+        return len(self.neighborhood) - 1
+
+
+def _initial_registers(number_of_vertices: int, registers_log2: int, seed: int) -> np.ndarray:
+    number_of_registers = 1 << registers_log2
+    with np.errstate(over='ignore'):
+        hashes = _mix(np.arange(number_of_vertices, dtype=np.uint64) + np.uint64(seed) * np.uint64(0x9e3779b97f4a7c15))
+    registers = np.zeros((number_of_vertices, number_of_registers), dtype=np.uint8)
+    buckets = (hashes & np.uint64(number_of_registers - 1)).astype(np.int64)
+    rest = hashes >> np.uint64(registers_log2)
+    with np.errstate(over='ignore'):
+        lowest_bit = np.maximum(rest & (~rest + np.uint64(1)), np.uint64(1))
+    trailing_zeros = np.log2(lowest_bit.astype(np.float64))
+    ranks = np.where(rest == 0, 64 - registers_log2 + 1, trailing_zeros + 1).astype(np.uint8)
+    registers[np.arange(number_of_vertices), buckets] = ranks
+    return registers
+
+
+def _propagate(graph: Vectorized_Graph, registers: np.ndarray, edge_block: int) -> np.ndarray:
+    """
+    One HyperANF step: every counter becomes the union (register-wise max) of itself and its neighbors' counters
+    """
+    updated = registers.copy()
+    number_of_vertices = len(graph.degrees)
+    start = 0
+    while start < number_of_vertices:
+        end = int(np.searchsorted(graph.offsets, graph.offsets[start] + edge_block, side='right')) - 1
+        end = min(max(end, start + 1), number_of_vertices)
+        first_edge, last_edge = int(graph.offsets[start]), int(graph.offsets[end])
+        if last_edge > first_edge:
+            has_neighbors = start + np.flatnonzero(graph.degrees[start:end])
+            block = registers[graph.neighbors[first_edge:last_edge]]
+            merged = np.maximum.reduceat(block, graph.offsets[has_neighbors] - first_edge, axis=0)
+            updated[has_neighbors] = np.maximum(updated[has_neighbors], merged)
+        start = end
+    return updated
+
+
+def _neighborhood_size(registers: np.ndarray, vertex_ids: Optional[np.ndarray]) -> float:
+    """
+    Sum of the HyperLogLog estimates of the counters of some vertices (all of them when vertex_ids is None)
+    """
+    number_of_registers = registers.shape[1]
+    powers = np.ldexp(1.0, -np.arange(256)).astype(np.float64)
+    alpha = _alpha(number_of_registers)
+    total = 0.0
+    rows = np.arange(len(registers)) if vertex_ids is None else vertex_ids
+    for start in range(0, len(rows), ESTIMATE_BLOCK):
+        block = registers[rows[start:start + ESTIMATE_BLOCK]]
+        estimates = alpha * number_of_registers ** 2 / powers[block].sum(axis=1)
+        zeros = (block == 0).sum(axis=1)
+        small = (estimates <= 2.5 * number_of_registers) & (zeros > 0)
+        estimates[small] = number_of_registers * np.log(number_of_registers / zeros[small])
+        total += float(estimates.sum())
+    return total
+
+
+def hyper_anf(graph, vertices: Optional[Sequence[str]] = None, registers_log2: int = REGISTERS_LOG2, runs: int = 1,
+              seed: int = 0, max_distance: Optional[int] = None, edge_block: int = EDGE_BLOCK) -> Distance_Distribution:
+    """
+    Estimates the neighborhood function of a graph with HyperANF: every vertex keeps a HyperLogLog counter of
+    the vertices within distance t, and one pass over the edges takes every counter from t to t + 1. It stops
+    when no counter changes. Memory is one byte per register and vertex (twice, while propagating) plus
+    edge_block gathered counters, whatever the number of pairs.
+    :param graph: a Graph, CSR_Graph or Vectorized_Graph
+    :param vertices: optional vertices whose pairs are counted, for example a connected component (default all)
+    :param registers_log2: log2 of the number of registers per counter
+    :param runs: independent runs averaged together, the error shrinks with the square root of runs
+                 (at least 2 to measure the errors of the histogram bins)
+    :param seed: seed of the hash function of the first run
+    :param max_distance: optional maximum number of passes
+    :param edge_block: edges processed at once, bounds the working memory
+    :return: the distance distribution, N(0) is the exact number of counted vertices
+    """
+    if not isinstance(graph, Vectorized_Graph):
+        graph = Vectorized_Graph(graph)
+    if not 4 <= registers_log2 <= 16:
+        raise ValueError("registers_log2 must be between 4 and 16")
+    vertex_ids = None
+    number_of_vertices = len(graph.degrees)
+    if vertices is not None:
+        vertex_ids = np.array([idx for idx in (graph.index_of(vertex) for vertex in vertices) if idx >= 0], dtype=np.int64)
+        number_of_vertices = len(vertex_ids)
+    runs_neighborhood = []
+    for run in range(runs):
+        registers = _initial_registers(len(graph.degrees), registers_log2, seed + run)
+        neighborhood = [float(number_of_vertices)]
+        while max_distance is None or len(neighborhood) <= max_distance:
+            updated = _propagate(graph, registers, edge_block)
+            if np.array_equal(updated, registers):
+                break
+            registers = updated
+            neighborhood.append(max(_neighborhood_size(registers, vertex_ids), neighborhood[-1]))
+        runs_neighborhood.append(neighborhood)
+    length = max(len(neighborhood) for neighborhood in runs_neighborhood)
+    by_run = np.array([neighborhood + [neighborhood[-1]] * (length - len(neighborhood)) for neighborhood in runs_neighborhood])
+    averaged = by_run.mean(axis=0).tolist()
+    relative_error = 1.04 / math.sqrt((1 << registers_log2) * runs)
+    errors = [0.0] + [value * relative_error for value in averaged[1:]]
+    if runs > 1:
+        bin_errors = [0.0] + (np.diff(by_run, axis=1).std(axis=0, ddof=1) / math.sqrt(runs)).tolist()
+    else:
+        bin_errors = [0.0] + [float('nan')] * (length - 1)
+    return Distance_Distribution(averaged, errors, bin_errors)
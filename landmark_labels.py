@@ -0,0 +1,281 @@
+from typing import List, Sequence, Tuple, Dict, Any
+from array import array
+import os
+import tempfile
+import numpy as np
+from tqdm import tqdm
+from snapshot import Snapshot, write_snapshot
+from parallel_bfs import snapshot_pool, worker_state
+from vectorized_bfs import Vectorized_Graph
+SEQUENTIAL_ROOTS = 256  # the first roots label most pairs, they are always processed in order
+MAX_BATCH_SIZE = 4096
+CHUNK_SIZE = 16
+UNREACHABLE = 1 << 16  # larger than any sum of two label distances
+NUMPY_MERGE_SIZE = 64  # labels at least this long are intersected with NumPy instead of a Python merge
+
+
+
+class Landmark_Labels:
+    """
+    Landmark_Labels class (pruned landmark labeling of the actor projection of a Bipartite_Graph).
+    Actors are interned by rank (most co-stars first) and every actor has a label, the list of (hub rank, distance
+    in films) sorted by rank. Two actors are at the minimum of d(s, h) + d(h, t) over the hubs h of both labels.
+    """
+    def __init__(self, actors: Sequence[str], offsets: Sequence[int], hubs: Sequence[int], distances: Sequence[int]):
+        self._actors = actors
+        self._offsets = offsets
+        self._hubs = hubs
+        self._distances = distances
+        self._hub_array = np.frombuffer(hubs, dtype=np.int32) if len(hubs) else np.zeros(0, dtype=np.int32)
+        self._distance_array = np.frombuffer(distances, dtype=np.uint8) if len(distances) else np.zeros(0, dtype=np.uint8)
+        self._actor_ids = None
+
+    def index_of(self, actor: str) -> int:
+        """
+        Gets the rank of an actor (the first call reads every actor name once)
+        :param actor: the actor ID
+        :return: the rank, or -1 if the actor is not in the index
+        """
+        if self._actor_ids is None:
+            self._actor_ids = {name: idx for idx, name in enumerate(self._actors)}
+        return self._actor_ids.get(actor, -1)
+
+    def distance_by_rank(self, rank1: int, rank2: int) -> float:
+        """
+        Merges the labels of two actors
+        :param rank1: the rank of the first actor
+        :param rank2: the rank of the second actor
+        :return: the number of films away at which both are (inf if they are not connected)
+        """
+        hubs, distances = self._hubs, self._distances
+        idx1, end1 = self._offsets[rank1], self._offsets[rank1 + 1]
+        idx2, end2 = self._offsets[rank2], self._offsets[rank2 + 1]
+        if min(end1 - idx1, end2 - idx2) >= NUMPY_MERGE_SIZE:
+            _, common1, common2 = np.intersect1d(self._hub_array[idx1:end1], self._hub_array[idx2:end2],
+                                                 assume_unique=True, return_indices=True)
+            if not len(common1):
+                return float('inf')
+            return float((self._distance_array[idx1:end1][common1].astype(np.int32) + self._distance_array[idx2:end2][common2]).min())
+        best = float('inf')
+        while idx1 < end1 and idx2 < end2:
+            hub1, hub2 = hubs[idx1], hubs[idx2]
+            if hub1 == hub2:
+                best = min(best, distances[idx1] + distances[idx2])
+                idx1 += 1
+                idx2 += 1
+            elif hub1 < hub2: idx1 += 1
+            else: idx2 += 1
+        return float(best)
+
+    def distance(self, actor1: str, actor2: str) -> float:
+        """
+        Gets the degree of separation between two actors
+        :param actor1: the first actor ID
+        :param actor2: the second actor ID
+        :return: the number of films away at which both are (inf if they are not connected or not in the index)
+        """
+        rank1, rank2 = self.index_of(actor1), self.index_of(actor2)
+        if rank1 < 0 or rank2 < 0:
+            return float('inf')
+        return self.distance_by_rank(rank1, rank2)
+
+    def number_of_actors(self) -> int:
+        """
+        Gets the number of labeled actors
+        :return: the number of actors
+        """
+        return len(self._offsets) - 1
+
+    def number_of_entries(self) -> int:
+        """
+        Gets the total size of the labels
+        :return: the number of (hub, distance) entries
+        """
+        return len(self._hubs)
+
+    def size_in_bytes(self) -> int:
+        """
+        Gets the size of the label arrays (without the actor names)
+        :return: the size in bytes
+        """
+        return len(self._offsets) * 8 + len(self._hubs) * 4 + len(self._distances)
+
+    def save(self, path: str, sources: Sequence[str]) -> None:
+        """
+        Saves the labels as a snapshot file
+        :param path: the labels file
+        :param sources: the source files the graph was built from
+        """
+        write_snapshot(path, sections={"label_offsets": array('q', self._offsets), "label_hubs": array('i', self._hubs),
+                                       "label_distances": array('B', self._distances)},
+                       strings={"actors": list(self._actors)}, sources=sources)
+
+    @classmethod
+    def load(cls, path: str) -> 'Landmark_Labels':
+        """
+        Opens a labels file without copying its arrays
+        :param path: the labels file
+        :return: the Landmark_Labels
+        """
+        snapshot = Snapshot(path)
+        return cls(snapshot.strings("actors"), snapshot.section("label_offsets"), snapshot.section("label_hubs"),
+                   snapshot.section("label_distances"))
+
+
+def _pruned_bfs(offsets: Sequence[int], neighbors: Sequence[int], vertex_of_rank: Sequence[int], rank_of: Sequence[int],
+                root: int, first_unlabeled: int, label_of, root_label: List[int]) -> List[Tuple[int, int]]:
+    """
+    BFS over the actor projection (actor -> movie -> actor, every movie expanded once) from the actor of rank root.
+    An actor is not labeled nor expanded when the labels of the hubs before it already give a distance as short,
+    and actors ranked before first_unlabeled are skipped, their labels are complete.
+    root_label is scratch space, one UNREACHABLE per actor, and is left as it was found.
+    :return: a list of (actor rank, distance) to add to the labels
+    """
+    root_hubs, root_distances = label_of(root)
+    for hub, root_distance in zip(root_hubs, root_distances):
+        root_label[hub] = root_distance
+    source = vertex_of_rank[root]
+    seen = {source}
+    expanded_movies = set()
+    frontier = [source]
+    distance = 0
+    new_entries = []
+    while frontier:
+        next_frontier = []
+        for vertex in frontier:
+            rank = rank_of[vertex]
+            if rank < first_unlabeled and rank != root: continue
+            hubs, distances = label_of(rank)
+            pruned = False
+            for hub, hub_distance in zip(hubs, distances):
+                if root_label[hub] + hub_distance <= distance:
+                    pruned = True
+                    break
+            if pruned: continue
+            new_entries.append((rank, distance))
+            for slot in range(offsets[vertex], offsets[vertex + 1]):
+                movie = neighbors[slot]
+                if movie in expanded_movies: continue
+                expanded_movies.add(movie)
+                for movie_slot in range(offsets[movie], offsets[movie + 1]):
+                    actor = neighbors[movie_slot]
+                    if actor not in seen:
+                        seen.add(actor)
+                        next_frontier.append(actor)
+        frontier = next_frontier
+        distance += 1
+    for hub in root_hubs:
+        root_label[hub] = UNREACHABLE
+    return new_entries
+
+
+def _setup_labels(state: Dict[str, Any]) -> None:
+    state['labels_path'] = None
+    state['root_label'] = [UNREACHABLE] * len(state['vertex_of_rank'])
+
+
+def _label_batch(task: Tuple[str, int, List[int]]) -> List[Tuple[int, List[Tuple[int, int]]]]:
+    labels_path, first_unlabeled, roots = task
+    if worker_state['labels_path'] != labels_path:
+        snapshot = Snapshot(labels_path)
+        worker_state['labels'] = (snapshot.section("label_offsets"), snapshot.section("label_hubs"),
+                                  snapshot.section("label_distances"))
+        worker_state['labels_path'] = labels_path
+    label_offsets, label_hubs, label_distances = worker_state['labels']
+
+    def label_of(rank: int) -> tuple:
+        start, end = label_offsets[rank], label_offsets[rank + 1]
+        return label_hubs[start:end], label_distances[start:end]
+    offsets, neighbors = worker_state['offsets'], worker_state['neighbors']
+    vertex_of_rank, rank_of = worker_state['vertex_of_rank'], worker_state['rank_of']
+    root_label = worker_state['root_label']
+    return [(root, _pruned_bfs(offsets, neighbors, vertex_of_rank, rank_of, root, first_unlabeled, label_of, root_label))
+            for root in roots]
+
+
+def _label_arrays(label_hubs: List[List[int]], label_distances: List[List[int]]) -> Tuple[array, array, array]:
+    offsets = array('q', [0])
+    hubs = array('i')
+    distances = array('B')
+    for rank_hubs, rank_distances in zip(label_hubs, label_distances):
+        hubs.extend(rank_hubs)
+        distances.extend(rank_distances)
+        offsets.append(len(hubs))
+    return offsets, hubs, distances
+
+
+def build_landmark_labels(graph, workers: int = 1, progress: bool = True) -> Landmark_Labels:
+    """
+    Builds the pruned landmark labeling of the actor projection of a Bipartite_Graph, one pruned BFS per actor
+    from the one with the most co-stars down. With workers > 1, after the first SEQUENTIAL_ROOTS roots the BFS run
+    in batches on a pool of processes: the roots of a batch are pruned only by the labels of the previous batches
+    (mapped by every worker from a temporary file), which adds some redundant entries but keeps the distances exact.
+    :param graph: a Bipartite_Graph (or its Vectorized_Graph)
+    :param workers: the number of processes (default 1, everything runs in order in this process)
+    :param progress: show a progress bar
+    :return: the labels
+    """
+    if not isinstance(graph, Vectorized_Graph):
+        graph = Vectorized_Graph(graph)
+    actor_ids = np.array(sorted(np.flatnonzero(graph.actor_mask()).tolist(), key=graph.vertices.__getitem__), dtype=np.int64)
+    has_neighbors = np.flatnonzero(graph.degrees)
+    cast_sums = np.zeros(len(graph.degrees), dtype=np.int64)
+    if len(has_neighbors):
+        cast_sums[has_neighbors] = np.add.reduceat(graph.degrees[graph.neighbors], graph.offsets[has_neighbors])
+    co_stars = cast_sums[actor_ids] - graph.degrees[actor_ids]  # projection degree, counting repeated co-stars (ties by actor ID)
+    vertex_of_rank = actor_ids[np.argsort(-co_stars, kind='stable')]
+    rank_of = np.full(len(graph.degrees), -1, dtype=np.int64)
+    rank_of[vertex_of_rank] = np.arange(len(vertex_of_rank))
+    offsets, neighbors = graph.offsets.tolist(), graph.neighbors.tolist()
+    vertex_of_rank_list, rank_of_list = vertex_of_rank.tolist(), rank_of.tolist()
+    number_of_actors = len(vertex_of_rank_list)
+    label_hubs = [[] for _ in range(number_of_actors)]
+    label_distances = [[] for _ in range(number_of_actors)]
+    root_label = [UNREACHABLE] * number_of_actors
+
+    def label_of(rank: int) -> tuple:
+        return label_hubs[rank], label_distances[rank]
+
+    def add_entries(root: int, entries: List[Tuple[int, int]]) -> None:
+        for rank, distance in entries:
+            label_hubs[rank].append(root)
+            label_distances[rank].append(distance)
+
+    with tqdm(total=number_of_actors, disable=not progress, desc="Labeling actors") as progress_bar:
+        sequential_roots = number_of_actors if workers <= 1 else min(SEQUENTIAL_ROOTS, number_of_actors)
+        for root in range(sequential_roots):
+            add_entries(root, _pruned_bfs(offsets, neighbors, vertex_of_rank_list, rank_of_list, root, root, label_of, root_label))
+            progress_bar.update(1)
+        if sequential_roots < number_of_actors:
+            directory = tempfile.mkdtemp()
+            topology = {"offsets": array('q', offsets), "neighbors": array('i', neighbors),
+                        "vertex_of_rank": array('q', vertex_of_rank_list), "rank_of": array('q', rank_of_list)}
+            try:
+                with snapshot_pool(workers, topology, setup=_setup_labels) as pool:
+                    first_unlabeled = sequential_roots
+                    batch_size = SEQUENTIAL_ROOTS
+                    batch_number = 0
+                    while first_unlabeled < number_of_actors:
+                        batch_size = min(batch_size * 2, MAX_BATCH_SIZE)
+                        batch_end = min(first_unlabeled + batch_size, number_of_actors)
+                        labels_path = os.path.join(directory, f"labels-{batch_number}.snapshot")
+                        label_offsets, hubs, distances = _label_arrays(label_hubs, label_distances)
+                        write_snapshot(labels_path, sections={"label_offsets": label_offsets, "label_hubs": hubs,
+                                                              "label_distances": distances}, strings={}, sources=[])
+                        tasks = [(labels_path, first_unlabeled, list(range(start, min(start + CHUNK_SIZE, batch_end))))
+                                 for start in range(first_unlabeled, batch_end, CHUNK_SIZE)]
+                        results = []
+                        for chunk_results in pool.imap_unordered(_label_batch, tasks):
+                            results.extend(chunk_results)
+                            progress_bar.update(len(chunk_results))
+                        for root, entries in sorted(results):
+                            add_entries(root, entries)
+                        first_unlabeled = batch_end
+                        batch_number += 1
+            finally:
+                for name in os.listdir(directory):
+                    os.remove(os.path.join(directory, name))
+                os.rmdir(directory)
+    label_offsets, hubs, distances = _label_arrays(label_hubs, label_distances)
+    actors = [graph.vertices[vertex] for vertex in vertex_of_rank_list]
+    return Landmark_Labels(actors, label_offsets, hubs, distances)
@@ -0,0 +1,90 @@
+from typing import Optional, Dict
+from collections import deque
+import numpy as np
+from vectorized_bfs import Vectorized_Graph
+DAMPING = 0.85
+TOLERANCE = 1e-10
+MAX_ITERATIONS = 200
+
+
+def pagerank(graph, damping: float = DAMPING, tolerance: float = TOLERANCE, max_iterations: int = MAX_ITERATIONS,
+             personalization: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    PageRank by power iteration over the CSR arrays: every iteration spreads the score of each vertex evenly
+    over its neighbors (one gather and one np.add.reduceat over the edges), and the score of vertices without
+    neighbors plus the 1 - damping teleport go back to the personalization vector.
+    :param graph: a Graph, CSR_Graph, Bipartite_Graph or Vectorized_Graph
+    :param damping: the probability of following an edge instead of teleporting
+    :param tolerance: stop when the L1 change of the scores is below it
+    :param max_iterations: the maximum number of iterations
+    :param personalization: optional teleport distribution by vertex id (default uniform), a personalized PageRank
+    :return: the scores by vertex id, they add up to 1
+    """
+    if not isinstance(graph, Vectorized_Graph):
+        graph = Vectorized_Graph(graph)
+    number_of_vertices = len(graph.degrees)
+    if number_of_vertices == 0:
+        return np.zeros(0)
+    if personalization is None:
+        teleport = np.full(number_of_vertices, 1 / number_of_vertices)
+    else:
+        teleport = np.asarray(personalization, dtype=np.float64)
+        if teleport.shape != (number_of_vertices,) or teleport.min() < 0 or teleport.sum() <= 0:
+            raise ValueError("The personalization must be a non-negative vector with one value per vertex")
+        teleport = teleport / teleport.sum()
+    has_neighbors = np.flatnonzero(graph.degrees)
+    dangling = graph.degrees == 0
+    inverse_degrees = np.zeros(number_of_vertices)
+    inverse_degrees[has_neighbors] = 1 / graph.degrees[has_neighbors]
+    scores = teleport.copy()
+    for _ in range(max_iterations):
+        spread = scores * inverse_degrees
+        updated = np.zeros(number_of_vertices)
+        if len(has_neighbors):
+            updated[has_neighbors] = np.add.reduceat(spread[graph.neighbors], graph.offsets[has_neighbors])
+        updated = damping * updated + (damping * scores[dangling].sum() + 1 - damping) * teleport
+        change = np.abs(updated - scores).sum()
+        scores = updated
+        if change < tolerance:
+            break
+    return scores
+
+
+def approximate_personalized_pagerank(graph, seed: int, damping: float = DAMPING, epsilon: float = 1e-7) -> Dict[int, float]:
+    """
+    Personalized PageRank of a single seed by residual push (Andersen, Chung and Lang): the seed starts with all
+    the residual, and any vertex whose residual is at least epsilon times its degree keeps 1 - damping of it as
+    score and pushes the rest evenly to its neighbors. Only the vertices near the seed are touched.
+    Every score is below the exact one by less than epsilon times the degree of the vertex.
+    :param graph: a Graph, CSR_Graph, Bipartite_Graph or Vectorized_Graph
+    :param seed: the seed vertex id
+    :param damping: the probability of following an edge instead of teleporting back to the seed
+    :param epsilon: the residual per unit of degree left unpushed
+    :return: a dictionary with the format {vertex id: score} for the vertices with some score
+    """
+    if not isinstance(graph, Vectorized_Graph):
+        graph = Vectorized_Graph(graph)
+    offsets, neighbors, degrees = graph.offsets, graph.neighbors, graph.degrees
+    scores = {}
+    residuals = {seed: 1.0}
+    queue = deque([seed])
+    while queue:
+        vertex = queue.popleft()
+        residual = residuals[vertex]
+        degree = int(degrees[vertex])
+        if degree == 0:
+            scores[vertex] = scores.get(vertex, 0.0) + residual
+            residuals[vertex] = 0.0
+            continue
+        if residual < epsilon * degree:
+            continue
+        scores[vertex] = scores.get(vertex, 0.0) + (1 - damping) * residual
+        residuals[vertex] = 0.0
+        share = damping * residual / degree
+        vertex_neighbors = neighbors[offsets[vertex]:offsets[vertex + 1]]
+        for neighbor, threshold in zip(vertex_neighbors.tolist(), (epsilon * degrees[vertex_neighbors]).tolist()):
+            before = residuals.get(neighbor, 0.0)
+            residuals[neighbor] = before + share
+            if before < threshold <= before + share:
+                queue.append(neighbor)
+    return scores
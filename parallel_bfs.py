@@ -0,0 +1,176 @@
+from typing import Sequence, Dict, Tuple, Optional, List, Callable, Iterator, Any
+from array import array
+from contextlib import contextmanager
+from multiprocessing import Pool
+import os
+import tempfile
+import time
+from tqdm import tqdm
+from graph import CSR_Graph, Actor_Projection
+from snapshot import Snapshot, write_snapshot
+CHUNK_SIZE = 4
+
+worker_state = {}  # in every worker of a snapshot_pool: the mapped sections by name, and what its setup adds
+
+
+def topology_arrays(graph) -> tuple:
+    """
+    Gets the CSR topology of a graph without its vertex or edge data
+    :param graph: a Graph, a CSR_Graph or a Bipartite_Graph (an Actor_Projection has no co-star edges to copy)
+    :return: a tuple with the format (vertex names by id, {vertex name: id} or None for a CSR_Graph, offsets, neighbors)
+    """
+    if isinstance(graph, Actor_Projection):
+        raise ValueError("An Actor_Projection keeps no co-star edges, traverse its movie layer (see Actor_Projection.movie_layer_arrays) "
+                         "or load the co-star graph with grafo_a.load_graph_bulk")
+    if isinstance(graph, CSR_Graph):
+        offsets, neighbors, _ = graph.get_csr_arrays()
+        return graph.get_graph_elements(), None, offsets, neighbors
+    vertices = list(graph.get_graph_elements())
+    index = {vertex: idx for idx, vertex in enumerate(vertices)}
+    offsets = array('q', [0])
+    neighbors = array('i')
+    for vertex in vertices:
+        neighbors.extend(index[neighbor] for neighbor in graph.neighbors(vertex))
+        offsets.append(len(neighbors))
+    return vertices, index, offsets, neighbors
+
+
+def _attach(path: str, names: Sequence[str], setup: Optional[Callable[[Dict[str, Any]], None]]) -> None:
+    """
+    Pool initializer: maps the shared snapshot file once per worker
+    :param path: the snapshot file
+    :param names: the sections to map
+    :param setup: optional function that adds the per-worker state
+    """
+    snapshot = Snapshot(path)
+    worker_state.clear()
+    worker_state.update((name, snapshot.section(name)) for name in names)
+    if setup is not None:
+        setup(worker_state)
+
+
+def snapshot_path_of(graph) -> Optional[str]:
+    """
+    Gets the snapshot file a graph is mapped from
+    :param graph: a graph, or a Vectorized_Graph of one
+    :return: the file of a CSR_Graph opened from a snapshot, None otherwise
+    """
+    graph = getattr(graph, 'graph', graph)
+    return graph.snapshot_path if isinstance(graph, CSR_Graph) else None
+
+
+@contextmanager
+def snapshot_pool(workers: Optional[int], sections: Dict[str, array], path: Optional[str] = None,
+                  setup: Optional[Callable[[Dict[str, Any]], None]] = None) -> Iterator[Pool]:
+    """
+    Starts a pool of processes that share arrays through a snapshot file: every worker maps the sections once
+    into worker_state, so all of them read the same page-cached copy, and then runs setup(worker_state).
+    The sections are written to a temporary file, removed when the pool closes, unless path is a snapshot
+    that already has them (for example the one a CSR_Graph was opened from, see snapshot_path_of).
+    :param workers: the number of processes (default: one per core)
+    :param sections: typed arrays by section name (only the names are used with a path)
+    :param path: optional snapshot file that already has the sections
+    :param setup: optional function that adds the per-worker state
+    :return: the pool
+    """
+    temporary = path is None
+    if temporary:
+        file_descriptor, path = tempfile.mkstemp(suffix=".snapshot")
+        os.close(file_descriptor)
+    try:
+        if temporary:
+            write_snapshot(path, sections=sections, strings={}, sources=[])
+        with Pool(workers, initializer=_attach, initargs=(path, list(sections), setup)) as pool:
+            yield pool
+    finally:
+        if temporary:
+            os.remove(path)
+
+
+def _setup_bfs(state: Dict[str, Any]) -> None:
+    state['seen'] = array('i', [-1]) * (len(state['offsets']) - 1)
+    state['step'] = 1
+
+
+def _setup_movie_layer_bfs(state: Dict[str, Any]) -> None:
+    _setup_bfs(state)
+    state['step'] = 2
+
+
+def bfs_stats(offsets: Sequence[int], neighbors: Sequence[int], source: int, seen: array, step: int = 1) -> Tuple[int, int, int]:
+    """
+    Level-synchronous BFS over CSR arrays
+    :param offsets: the CSR offsets
+    :param neighbors: the CSR neighbors
+    :param source: the source vertex id
+    :param seen: per-vertex marks, reused between runs (a vertex is seen when it holds the source id)
+    :param step: the levels of every hop (2 over the movie layer of an Actor_Projection, only the vertices at
+                 multiples of it count and their distance is the level divided by it)
+    :return: a tuple with the format (eccentricity, sum of distances, number of reached vertices)
+    """
+    seen[source] = source
+    frontier = [source]
+    level = 0
+    distance_sum = 0
+    reached = 1
+    while True:
+        next_frontier = []
+        for vertex in frontier:
+            for slot in range(offsets[vertex], offsets[vertex + 1]):
+                neighbor = neighbors[slot]
+                if seen[neighbor] != source:
+                    seen[neighbor] = source
+                    next_frontier.append(neighbor)
+        if not next_frontier:
+            return level // step, distance_sum, reached
+        level += 1
+        if level % step == 0:
+            distance_sum += level // step * len(next_frontier)
+            reached += len(next_frontier)
+        frontier = next_frontier
+
+
+def _bfs_chunk(sources: List[int]) -> List[Tuple[int, int, int, int]]:
+    offsets, neighbors, seen = worker_state['offsets'], worker_state['neighbors'], worker_state['seen']
+    return [(source,) + bfs_stats(offsets, neighbors, source, seen, worker_state['step']) for source in sources]
+
+
+def multi_source_bfs(graph, sources: Sequence[str], workers: Optional[int] = None, execution_time: Optional[float] = None,
+                     chunk_size: int = CHUNK_SIZE, progress: bool = True) -> Dict[str, Tuple[int, int]]:
+    """
+    Runs an unweighted BFS from many sources on a pool of processes that share the CSR arrays (see snapshot_pool,
+    a CSR_Graph opened from a snapshot is mapped from its own file). An Actor_Projection is searched over its
+    movie layer, without building its co-star edges.
+    :param graph: a Graph, a CSR_Graph or an Actor_Projection
+    :param sources: the source vertices
+    :param workers: the number of processes (default: one per core)
+    :param execution_time: optional time budget in seconds, the sources not finished by then are skipped
+    :param chunk_size: the number of sources sent to a worker at once
+    :param progress: show a progress bar
+    :return: a dictionary with the format {source: (eccentricity, sum of distances)}
+    """
+    setup = _setup_bfs
+    if isinstance(graph, Actor_Projection):
+        offsets, neighbors = graph.movie_layer_arrays()
+        vertices, index, setup = graph.get_graph_elements(), None, _setup_movie_layer_bfs
+    else:
+        vertices, index, offsets, neighbors = topology_arrays(graph)
+    if index is None:
+        source_ids = [graph.index_of(source) for source in sources if graph.vertex_exists(source)]
+    else:
+        source_ids = [index[source] for source in sources if source in index]
+    chunks = [source_ids[idx:idx + chunk_size] for idx in range(0, len(source_ids), chunk_size)]
+    results = {}
+    start_time = time.time()
+    path = snapshot_path_of(graph)
+    sections = {"offsets": offsets, "neighbors": neighbors} if path else {"offsets": array('q', offsets), "neighbors": array('i', neighbors)}
+    with snapshot_pool(workers, sections, path, setup) as pool, \
+            tqdm(total=len(source_ids), disable=not progress, desc="BFS sources") as progress_bar:
+        for chunk_results in pool.imap_unordered(_bfs_chunk, chunks):
+            for source, eccentricity, distance_sum, _ in chunk_results:
+                results[vertices[source]] = (eccentricity, distance_sum)
+            progress_bar.update(len(chunk_results))
+            if execution_time is not None and time.time() - start_time >= execution_time:
+                break
+        pool.terminate()
+    return results
@@ -0,0 +1,133 @@
+from typing import Optional, Tuple, Hashable, List, Sequence
+from collections import OrderedDict
+import numpy as np
+MAX_BYTES = 256 << 20  # distance and predecessor arrays kept at most (about 20 results of a million vertices)
+
+
+class Path_Cache:
+    """
+    Path_Cache class (LRU cache of single-source shortest path results, keyed by (graph version, source, weighting)).
+    A result is kept compact, as its distance and predecessor arrays by vertex id (-1 for the vertices that were
+    not reached). As the version of a graph changes with every mutation, results of an older version are never
+    returned, they just stop being used and are evicted in time. The least recently used results are evicted
+    when the arrays add up to more than max_bytes.
+    """
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+
+    def get(self, version: int, source: Hashable, weighting: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Gets a result, marking it as the most recently used one
+        :param version: the graph version
+        :param source: the source vertex
+        :param weighting: the weight channel
+        :return: a tuple with the format (distances, predecessors) by vertex id, or None if it is not cached
+        """
+        key = (version, source, weighting)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def get_any(self, version: int, sources: Sequence[Hashable], weighting: str) -> Optional[Tuple[Hashable, np.ndarray, np.ndarray]]:
+        """
+        Gets the result of the first of some sources that is cached, marking it as the most recently used one.
+        It counts as one lookup (a single hit or miss), for queries that can be answered from any of them.
+        :param version: the graph version
+        :param sources: the source vertices, by preference
+        :param weighting: the weight channel
+        :return: a tuple with the format (source, distances, predecessors), or None if none of them is cached
+        """
+        for source in sources:
+            key = (version, source, weighting)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return (source,) + entry
+        self.misses += 1
+        return None
+
+    def put(self, version: int, source: Hashable, weighting: str, distances: np.ndarray, predecessors: np.ndarray) -> None:
+        """
+        Adds a result, evicting the least recently used ones if the cache goes over max_bytes
+        (a result larger than max_bytes on its own is not kept)
+        :param version: the graph version
+        :param source: the source vertex
+        :param weighting: the weight channel
+        :param distances: the distances by vertex id
+        :param predecessors: the predecessor ids by vertex id
+        """
+        size = distances.nbytes + predecessors.nbytes
+        if size > self.max_bytes:
+            return
+        key = (version, source, weighting)
+        if key in self._entries:
+            self._bytes -= self._size_of(self._entries.pop(key))
+        self._entries[key] = (distances, predecessors)
+        self._bytes += size
+        self._evict()
+
+    def take(self, version: int) -> List[Tuple[Hashable, str, np.ndarray, np.ndarray]]:
+        """
+        Removes the results of a graph version, to repair them after a change of the graph
+        (they do not count as hits, misses or evictions)
+        :param version: the graph version
+        :return: a list of (source, weighting, distances, predecessors)
+        """
+        keys = [key for key in self._entries if key[0] == version]
+        results = []
+        for key in keys:
+            entry = self._entries.pop(key)
+            self._bytes -= self._size_of(entry)
+            results.append((key[1], key[2]) + entry)
+        return results
+
+    def resize(self, max_bytes: int) -> None:
+        """
+        Changes the memory cap, evicting results if needed
+        :param max_bytes: the new cap
+        """
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def clear(self) -> None:
+        """
+        Removes every result (the counters are kept)
+        """
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Gets the counters of the cache
+        :return: a dictionary with the hits, misses, hit rate, evictions, evicted bytes, entries, bytes and max bytes
+        """
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions, 'evicted bytes': self.evicted_bytes, 'entries': len(self._entries),
+                'bytes': self._bytes, 'max bytes': self.max_bytes}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _size_of(entry: Tuple[np.ndarray, np.ndarray]) -> int:
+        return entry[0].nbytes + entry[1].nbytes
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            size = self._size_of(entry)
+            self._bytes -= size
+            self.evictions += 1
+            self.evicted_bytes += size
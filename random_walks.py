@@ -0,0 +1,111 @@
+from typing import Optional, Union, Tuple, Dict, Any
+from array import array
+import os
+import numpy as np
+from parallel_bfs import snapshot_pool, snapshot_path_of, worker_state
+from vectorized_bfs import Vectorized_Graph
+WALK_BATCH = 1 << 16  # walks advanced together
+
+
+def _walk_batch(offsets: np.ndarray, neighbors: np.ndarray, degrees: np.ndarray, rng: np.random.Generator,
+                num_walks: int, walk_length: int, non_backtracking: bool) -> np.ndarray:
+    """
+    Runs a batch of walks in lockstep and counts the visits of every vertex
+    """
+    number_of_vertices = len(degrees)
+    position = rng.integers(0, number_of_vertices, size=num_walks)
+    previous = np.full(len(position), -1, dtype=np.int64)
+    steps = [position]
+    for _ in range(walk_length):
+        position_degrees = degrees[position]
+        alive = position_degrees > 0
+        if not alive.all():
+            position, previous, position_degrees = position[alive], previous[alive], position_degrees[alive]
+            if not len(position): break
+        first_slot = offsets[position]
+        if non_backtracking:
+            choices = np.maximum(position_degrees - (previous >= 0), 1)
+            slot = first_slot + (rng.random(len(position)) * choices).astype(np.int64)
+            backtrack = (neighbors[slot] == previous) & (position_degrees > 1)
+            slot[backtrack] = first_slot[backtrack] + position_degrees[backtrack] - 1
+        else:
+            slot = first_slot + (rng.random(len(position)) * position_degrees).astype(np.int64)
+        previous = position
+        position = neighbors[slot].astype(np.int64)
+        steps.append(position)
+    return np.bincount(np.concatenate(steps), minlength=number_of_vertices)
+
+
+def walk_visits(graph, num_walks: int, walk_length: int, non_backtracking: bool = False,
+                seed: Optional[Union[int, np.random.SeedSequence, np.random.Generator]] = None,
+                batch_size: int = WALK_BATCH) -> np.ndarray:
+    """
+    Runs random walks in lockstep: every step moves a whole batch of walks at once, each one to a uniformly
+    chosen neighbor (offsets[v] + floor(random * degree of v), so no per-vertex table is needed).
+    Walks start at uniformly chosen vertices and stop early at vertices without neighbors.
+    :param graph: a Graph, CSR_Graph, Bipartite_Graph or Vectorized_Graph
+    :param num_walks: the number of walks
+    :param walk_length: the number of steps of every walk
+    :param non_backtracking: never step back to the previous vertex, unless it is the only neighbor
+    :param seed: seed of the random generator (an int, a SeedSequence or a Generator), None for a fresh one
+    :param batch_size: the number of walks advanced together
+    :return: the number of visits of every vertex, by vertex id (the start of every walk counts as a visit)
+    """
+    if not isinstance(graph, Vectorized_Graph):
+        graph = Vectorized_Graph(graph)
+    rng = np.random.default_rng(seed)
+    number_of_vertices = len(graph.degrees)
+    visits = np.zeros(number_of_vertices, dtype=np.int64)
+    if number_of_vertices == 0:
+        return visits
+    for first_walk in range(0, num_walks, batch_size):
+        visits += _walk_batch(graph.offsets, graph.neighbors, graph.degrees, rng,
+                              min(batch_size, num_walks - first_walk), walk_length, non_backtracking)
+    return visits
+
+
+def _setup_walks(state: Dict[str, Any]) -> None:
+    state['offsets'] = np.frombuffer(state['offsets'], dtype=np.int64)
+    state['neighbors'] = np.frombuffer(state['neighbors'], dtype=np.int32)
+    state['degrees'] = np.diff(state['offsets'])
+
+
+def _walk_task(task: Tuple[np.random.SeedSequence, int, int, bool]) -> np.ndarray:
+    seed_sequence, num_walks, walk_length, non_backtracking = task
+    return _walk_batch(worker_state['offsets'], worker_state['neighbors'], worker_state['degrees'],
+                       np.random.default_rng(seed_sequence), num_walks, walk_length, non_backtracking)
+
+
+def parallel_walk_visits(graph, num_walks: int, walk_length: int, non_backtracking: bool = False,
+                         seed: Optional[Union[int, np.random.SeedSequence]] = None, workers: Optional[int] = None,
+                         batch_size: int = WALK_BATCH) -> np.ndarray:
+    """
+    Runs the walks of walk_visits on a pool of processes. The walks are split in batches of batch_size, and
+    every batch gets its own random stream spawned from the seed (SeedSequence.spawn), so the counts only
+    depend on the seed and the batch size, not on the number of workers or the order batches finish in.
+    The workers share the CSR arrays (see parallel_bfs.snapshot_pool), and the visit counts of the batches are
+    added up as they arrive.
+    :param graph: a Graph, CSR_Graph, Bipartite_Graph or Vectorized_Graph
+    :param num_walks: the number of walks
+    :param walk_length: the number of steps of every walk
+    :param non_backtracking: never step back to the previous vertex, unless it is the only neighbor
+    :param seed: seed of the random streams (an int or a SeedSequence), None for a fresh one
+    :param workers: the number of processes (default: one per core)
+    :param batch_size: the number of walks advanced together, and sent to a worker at once
+    :return: the number of visits of every vertex, by vertex id (the start of every walk counts as a visit)
+    """
+    if not isinstance(graph, Vectorized_Graph):
+        graph = Vectorized_Graph(graph)
+    number_of_vertices = len(graph.degrees)
+    visits = np.zeros(number_of_vertices, dtype=np.int64)
+    if number_of_vertices == 0 or num_walks <= 0:
+        return visits
+    seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    batches = range(0, num_walks, batch_size)
+    tasks = [(stream, min(batch_size, num_walks - first_walk), walk_length, non_backtracking)
+             for stream, first_walk in zip(seed_sequence.spawn(len(batches)), batches)]
+    sections = {"offsets": array('q', graph.offsets.tobytes()), "neighbors": array('i', graph.neighbors.tobytes())}
+    with snapshot_pool(workers or os.cpu_count(), sections, snapshot_path_of(graph), _setup_walks) as pool:
+        for batch_visits in pool.imap_unordered(_walk_task, tasks):
+            visits += batch_visits
+    return visits
@@ -0,0 +1,448 @@
+from typing import Optional, Any, List, Sequence, Dict, Tuple, Callable
+from array import array
+from bisect import bisect_left
+import hashlib
+import mmap
+import os
+import struct
+import numpy as np
+from graph import CSR_Graph, Actor_Projection, Payload_Table
+MAGIC = b"TP4SNAP\0"
+FORMAT_VERSION = 1
+BYTE_ORDER_MARK = 0x01020304
+HEADER = struct.Struct("<8sIIII")  # magic, version, byte order mark, number of sources, number of sections
+SOURCE = struct.Struct("<qq32s")  # size, mtime_ns, sha256
+SECTION = struct.Struct("<32s1sxxxxxxxqq")  # name, typecode, offset, number of items
+ALIGNMENT = 8
+HASH_CHUNK_SIZE = 1 << 24
+
+
+def _align(position: int) -> int:
+    return (position + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _file_hash(path: str) -> bytes:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def source_fingerprints(sources: Sequence[str]) -> List[Tuple[int, int, bytes]]:
+    """
+    Gets the fingerprint of every source file
+    :param sources: the source files
+    :return: a list of (size, mtime_ns, sha256) tuples
+    """
+    fingerprints = []
+    for path in sources:
+        stat = os.stat(path)
+        fingerprints.append((stat.st_size, stat.st_mtime_ns, _file_hash(path)))
+    return fingerprints
+
+
+class String_Table:
+    """
+    String_Table class (read-only sequence of strings decoded on demand from a utf-8 blob)
+    """
+    def __init__(self, offsets: Sequence[int], blob: memoryview):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, idx: int) -> str:
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("String_Table index out of range")
+        return bytes(self._blob[self._offsets[idx]:self._offsets[idx + 1]]).decode("utf-8")
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
+
+def _string_sections(strings: Sequence[str]) -> Tuple[array, array]:
+    offsets = array('q', [0])
+    blob = bytearray()
+    for string in strings:
+        blob += string.encode("utf-8")
+        offsets.append(len(blob))
+    return offsets, array('B', blob)
+
+
+class Snapshot:
+    """
+    Snapshot class (memory mapped snapshot file whose sections are exposed as zero-copy views)
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        if len(view) < HEADER.size:
+            raise ValueError(f"{path} is not a graph snapshot")
+        magic, version, byte_order_mark, number_of_sources, number_of_sections = HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a graph snapshot")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} has snapshot version {version}, expected {FORMAT_VERSION}")
+        if byte_order_mark != BYTE_ORDER_MARK:
+            raise ValueError(f"{path} was written on a machine with another byte order")
+        position = HEADER.size
+        if position + SOURCE.size * number_of_sources + SECTION.size * number_of_sections > len(view):
+            raise ValueError(f"{path} is truncated")
+        self.sources = []
+        for _ in range(number_of_sources):
+            self.sources.append(SOURCE.unpack_from(view, position))
+            position += SOURCE.size
+        self._sections = {}
+        for _ in range(number_of_sections):
+            name, typecode, offset, length = SECTION.unpack_from(view, position)
+            position += SECTION.size
+            typecode = typecode.decode("ascii")
+            end = offset + length * array(typecode).itemsize
+            if end > len(view):
+                raise ValueError(f"{path} is truncated")
+            self._sections[name.rstrip(b"\0").decode("ascii")] = view[offset:end].cast(typecode)
+
+    def has_section(self, name: str) -> bool:
+        """
+        If contains a section
+        :param name: the section name
+        :return: boolean
+        """
+        return name in self._sections
+
+    def section(self, name: str) -> memoryview:
+        """
+        Gets a section as a typed view over the mapped file
+        :param name: the section name
+        :return: the section view
+        """
+        if name not in self._sections:
+            raise ValueError(f"{self.path} has no section {name}")
+        return self._sections[name]
+
+    def strings(self, name: str) -> String_Table:
+        """
+        Gets a string table stored with write_snapshot
+        :param name: the string table name
+        :return: the string table
+        """
+        return String_Table(self.section(name + ".offsets"), self.section(name + ".blob"))
+
+    def is_fresh(self, sources: Sequence[str]) -> bool:
+        """
+        If the snapshot was built from the current version of the source files.
+        Files with the same size and mtime are trusted, otherwise their content hash is compared.
+        :param sources: the source files, in the order used to write the snapshot
+        :return: boolean
+        """
+        if len(sources) != len(self.sources):
+            return False
+        for path, (size, mtime_ns, digest) in zip(sources, self.sources):
+            if not os.path.exists(path):
+                return False
+            stat = os.stat(path)
+            if stat.st_size != size:
+                return False
+            if stat.st_mtime_ns != mtime_ns and _file_hash(path) != digest:
+                return False
+        return True
+
+
+def write_snapshot(path: str, sections: Dict[str, array], strings: Dict[str, Sequence[str]],
+                   sources: Sequence[str]) -> None:
+    """
+    Writes a snapshot file. The file is written next to its final path and renamed, so readers
+    never see a partial snapshot.
+    :param path: the snapshot file
+    :param sections: typed arrays by section name
+    :param strings: string sequences by table name
+    :param sources: the source files the data was built from
+    """
+    sections = dict(sections)
+    for name, values in strings.items():
+        sections[name + ".offsets"], sections[name + ".blob"] = _string_sections(values)
+    fingerprints = source_fingerprints(sources)
+    position = _align(HEADER.size + SOURCE.size * len(fingerprints) + SECTION.size * len(sections))
+    layout = []
+    for name, values in sections.items():
+        layout.append((name, values, position))
+        position = _align(position + len(values) * values.itemsize)
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, BYTE_ORDER_MARK, len(fingerprints), len(sections)))
+        for size, mtime_ns, digest in fingerprints:
+            file.write(SOURCE.pack(size, mtime_ns, digest))
+        for name, values, offset in layout:
+            file.write(SECTION.pack(name.encode("ascii"), values.typecode.encode("ascii"), offset, len(values)))
+        for name, values, offset in layout:
+            file.write(b"\0" * (offset - file.tell()))
+            values.tofile(file)
+    os.replace(temporary_path, path)
+
+
+def save_graph(graph: CSR_Graph, path: str, sources: Sequence[str]) -> None:
+    """
+    Saves a CSR graph whose vertex data are names and whose edge data are sets of titles
+    (or sets of tconst numbers, see grafo_a.load_graph_bulk)
+    :param graph: the graph to save
+    :param path: the snapshot file
+    :param sources: the source files the graph was built from
+    """
+    offsets, neighbors, edge_ids = graph.get_csr_arrays()
+    title_ids = {}
+    edge_data = array('q', [0])
+    edge_items = array('q')
+    movie_ids_as_int = None
+    for idx in range(graph.number_of_edges()):
+        for movie in graph.get_edge_payload(idx):
+            is_int = isinstance(movie, int)
+            if movie_ids_as_int is None:
+                movie_ids_as_int = is_int
+            elif is_int != movie_ids_as_int:
+                raise ValueError("The edge data mix tconst numbers and titles, the snapshot can only store one of them")
+            if is_int:
+                edge_items.append(movie)
+            else:
+                edge_items.append(title_ids.setdefault(movie, len(title_ids)))
+        edge_data.append(len(edge_items))
+    strings = {}
+    if title_ids or not edge_items:
+        strings["titles"] = list(title_ids)
+    vertices = graph.get_graph_elements()
+    vertex_data = []
+    for vertex in vertices:
+        data = graph.get_vertex_data(vertex)
+        vertex_data.append("" if data is None else str(data))
+    write_snapshot(path,
+                   sections={"offsets": array('q', offsets), "neighbors": array('i', neighbors),
+                             "edge_ids": array('i', edge_ids), "edge_data": edge_data, "edge_items": edge_items},
+                   strings={"vertices": vertices, "vertex_data": vertex_data, **strings},
+                   sources=sources)
+
+
+def open_graph(path: str) -> CSR_Graph:
+    """
+    Opens a graph snapshot without copying its arrays
+    :param path: the snapshot file
+    :return: a CSR_Graph backed by the mapped file
+    """
+    return _graph_from_snapshot(Snapshot(path))
+
+
+def _graph_from_snapshot(snapshot: Snapshot) -> CSR_Graph:
+    titles = snapshot.strings("titles") if snapshot.has_section("titles.offsets") else None
+    edge_data = Payload_Table(snapshot.section("edge_data"), snapshot.section("edge_items"), titles)
+    return CSR_Graph(snapshot.strings("vertices"), snapshot.strings("vertex_data"), snapshot.section("offsets"),
+                     snapshot.section("neighbors"), snapshot.section("edge_ids"), edge_data, os.path.abspath(snapshot.path))
+
+
+def _typed(values: np.ndarray, typecode: str) -> array:
+    return array(typecode, values.astype(np.int64 if typecode == 'q' else np.int32).tobytes())
+
+
+def _compact_payloads(edge_ids: np.ndarray, edge_data: np.ndarray, edge_items: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Drops the payloads no edge slot points to (the ones replaced by extend_graph), keeping the order of the rest,
+    so there is one payload per edge. Returns the renumbered (edge_ids, edge_data, edge_items).
+    """
+    used = np.zeros(len(edge_data) - 1, dtype=bool)
+    used[edge_ids] = True
+    new_ids = np.cumsum(used) - 1
+    starts, lengths = edge_data[:-1][used], np.diff(edge_data)[used]
+    kept_offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    item_ids = np.repeat(starts - kept_offsets[:-1], lengths) + np.arange(kept_offsets[-1])
+    return new_ids[edge_ids], kept_offsets, edge_items[item_ids]
+
+
+def extend_graph(graph: CSR_Graph, path: str, sources: Sequence[str], vertex_data: Dict[str, Any],
+                 edges: Dict[Tuple[str, str], Sequence[Any]]) -> Tuple[CSR_Graph, np.ndarray]:
+    """
+    Writes the snapshot of a graph with some vertices and movies added, merging them into the arrays of the
+    snapshot it was opened from instead of building the graph again: the new neighbor slots are inserted in
+    their sorted place, an edge that gets more movies points both its slots to a new payload with all of them,
+    and the new titles are appended to the titles table.
+    :param graph: a CSR_Graph opened from a snapshot
+    :param path: the new snapshot file (it can be the one the graph was opened from, the graph keeps its old contents)
+    :param sources: the source files the new graph comes from
+    :param vertex_data: the data of the new vertices
+    :param edges: the movies (titles or tconst numbers, as the edge data of the graph) to add to every edge by
+                  its two vertices, only the ones it does not have yet; the edges that do not exist are created
+    :return: a tuple with the format (the new CSR_Graph, the new id of every old vertex id)
+    """
+    if graph.snapshot_path is None:
+        raise ValueError("The graph was not opened from a snapshot, save it with save_graph first")
+    snapshot = Snapshot(graph.snapshot_path)
+    old_vertices = snapshot.strings("vertices")
+    number_of_old_vertices = len(old_vertices)
+    new_vertices = sorted(vertex for vertex in vertex_data if graph.index_of(vertex) < 0)
+    insert_at = np.array([bisect_left(old_vertices, vertex) for vertex in new_vertices], dtype=np.int64)
+    old_to_new = np.arange(number_of_old_vertices) + np.searchsorted(insert_at, np.arange(number_of_old_vertices), side='right')
+    new_ids = {vertex: int(position) + rank for rank, (vertex, position) in enumerate(zip(new_vertices, insert_at.tolist()))}
+    row_starts = {vertex: int(position) for vertex, position in zip(new_vertices, insert_at.tolist())}
+    number_of_vertices = number_of_old_vertices + len(new_vertices)
+    offsets = np.frombuffer(snapshot.section("offsets"), dtype=np.int64)
+    old_neighbors = np.frombuffer(snapshot.section("neighbors"), dtype=np.int32)
+    neighbors = old_to_new[old_neighbors]
+    edge_ids = np.frombuffer(snapshot.section("edge_ids"), dtype=np.int32).astype(np.int64)
+    edge_data = np.frombuffer(snapshot.section("edge_data"), dtype=np.int64)
+    edge_items = np.frombuffer(snapshot.section("edge_items"), dtype=np.int64)
+    titles_offsets = np.frombuffer(snapshot.section("titles.offsets"), dtype=np.int64) if snapshot.has_section("titles.offsets") else None
+    new_titles = {}
+    payload_ends = []
+    payload_items = []
+    inserts = []  # (position in the old neighbors, row, neighbor, edge id) of every new slot
+
+    def slot_of(idx: int, neighbor_idx: int) -> int:
+        start, end = offsets[idx], offsets[idx + 1]
+        slot = start + int(np.searchsorted(old_neighbors[start:end], neighbor_idx))
+        return slot if slot < end and old_neighbors[slot] == neighbor_idx else -1
+    ids = {}
+    for (vertex1, vertex2), movies in edges.items():
+        for vertex in (vertex1, vertex2):
+            if vertex not in ids: ids[vertex] = graph.index_of(vertex)
+        payload = len(edge_data) - 1 + len(payload_ends)
+        items = []
+        for movie in movies:
+            if isinstance(movie, int) != (titles_offsets is None):
+                raise ValueError("The edge data mix tconst numbers and titles, the snapshot can only store one of them")
+            items.append(movie if titles_offsets is None else len(titles_offsets) - 1 + new_titles.setdefault(movie, len(new_titles)))
+        idx1, idx2 = ids[vertex1], ids[vertex2]
+        slot = slot_of(idx1, idx2) if idx1 >= 0 and idx2 >= 0 else -1
+        if slot >= 0:
+            old_payload = edge_ids[slot]
+            items = edge_items[edge_data[old_payload]:edge_data[old_payload + 1]].tolist() + items
+            edge_ids[slot] = edge_ids[slot_of(idx2, idx1)] = payload
+        else:
+            for vertex, idx, other, other_idx in ((vertex1, idx1, vertex2, idx2), (vertex2, idx2, vertex1, idx1)):
+                row = int(old_to_new[idx]) if idx >= 0 else new_ids[vertex]
+                neighbor = int(old_to_new[other_idx]) if other_idx >= 0 else new_ids[other]
+                if idx >= 0:
+                    start, end = offsets[idx], offsets[idx + 1]
+                    position = start + int(np.searchsorted(neighbors[start:end], neighbor))
+                else:
+                    position = offsets[row_starts[vertex]]
+                inserts.append((int(position), row, neighbor, payload))
+        payload_items.extend(items)
+        payload_ends.append(len(edge_items) + len(payload_items))
+    inserts.sort()
+    positions = [position for position, _, _, _ in inserts]
+    neighbors = np.insert(neighbors, positions, [neighbor for _, _, neighbor, _ in inserts])
+    edge_ids = np.insert(edge_ids, positions, [payload for _, _, _, payload in inserts])
+    counts = np.zeros(number_of_vertices, dtype=np.int64)
+    counts[old_to_new] = np.diff(offsets)
+    np.add.at(counts, [row for _, row, _, _ in inserts], 1)
+    edge_ids, edge_data, edge_items = _compact_payloads(edge_ids, np.concatenate([edge_data, np.array(payload_ends, dtype=np.int64)]),
+                                                        np.concatenate([edge_items, np.array(payload_items, dtype=np.int64)]))
+    sections = {"offsets": _typed(np.concatenate([[0], np.cumsum(counts)]), 'q'), "neighbors": _typed(neighbors, 'i'),
+                "edge_ids": _typed(edge_ids, 'i'), "edge_data": _typed(edge_data, 'q'), "edge_items": _typed(edge_items, 'q')}
+    if titles_offsets is not None:
+        added_offsets, added_blob = _string_sections(list(new_titles))
+        sections["titles.offsets"] = _typed(np.concatenate([titles_offsets, titles_offsets[-1] + np.frombuffer(added_offsets, dtype=np.int64)[1:]]), 'q')
+        sections["titles.blob"] = array('B', bytes(snapshot.section("titles.blob")) + added_blob.tobytes())
+    vertices = [None] * number_of_vertices
+    names = [None] * number_of_vertices
+    for idx, vertex, name in zip(old_to_new.tolist(), old_vertices, snapshot.strings("vertex_data")):
+        vertices[idx] = vertex
+        names[idx] = name
+    for vertex, idx in new_ids.items():
+        vertices[idx] = vertex
+        data = vertex_data[vertex]
+        names[idx] = "" if data is None else str(data)
+    write_snapshot(path, sections=sections, strings={"vertices": vertices, "vertex_data": names}, sources=sources)
+    return open_graph(path), old_to_new
+
+
+def fresh_snapshot(path: str, sources: Sequence[str]) -> Optional[Snapshot]:
+    """
+    Opens a snapshot if it exists, this version can read it and it was built from the current version of the
+    source files (a file of another format version, or a damaged one, is just as outdated as one of older sources)
+    :param path: the snapshot file
+    :param sources: the source files, in the order used to write the snapshot
+    :return: the snapshot, or None if it has to be built again
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        snapshot = Snapshot(path)
+    except ValueError:
+        return None
+    return snapshot if snapshot.is_fresh(sources) else None
+
+
+def load_or_build_graph(path: str, sources: Sequence[str], build: Callable[[], Any]) -> CSR_Graph:
+    """
+    Opens a graph snapshot, rebuilding it first if it is missing, unreadable or its sources changed (see fresh_snapshot)
+    :param path: the snapshot file
+    :param sources: the source files
+    :param build: a function that builds the graph (Graph or CSR_Graph) from the sources
+    :return: a CSR_Graph backed by the mapped file
+    """
+    snapshot = fresh_snapshot(path, sources)
+    if snapshot is not None:
+        print("Reading graph snapshot")
+        return _graph_from_snapshot(snapshot)
+    if os.path.exists(path):
+        print("Graph snapshot is outdated")
+    graph = build()
+    if not isinstance(graph, CSR_Graph):
+        graph = CSR_Graph.from_graph(graph)
+    save_graph(graph, path, sources)
+    return open_graph(path)
+
+
+def save_projection(graph: Actor_Projection, path: str, sources: Sequence[str]) -> None:
+    """
+    Saves an actor projection: its actors with their names, the titles of its movies and the CSR arrays of
+    the movies of every actor and the cast of every movie
+    :param graph: the projection to save
+    :param path: the snapshot file
+    :param sources: the source files the projection was built from
+    """
+    actor_offsets, actor_movies, movie_offsets, movie_actors = graph.get_projection_arrays()
+    actors = graph.get_graph_elements()
+    names = []
+    for actor in actors:
+        data = graph.get_vertex_data(actor)
+        names.append("" if data is None else str(data))
+    write_snapshot(path, sections={"actor_offsets": array('q', actor_offsets), "actor_movies": array('i', actor_movies),
+                                   "movie_offsets": array('q', movie_offsets), "movie_actors": array('i', movie_actors)},
+                   strings={"actors": list(actors), "actor_names": names,
+                            "titles": [str(graph.movie_title(movie)) for movie in range(graph.number_of_movies())]},
+                   sources=sources)
+
+
+def open_projection(path: str) -> Actor_Projection:
+    """
+    Opens an actor projection snapshot without copying its arrays
+    :param path: the snapshot file
+    :return: an Actor_Projection backed by the mapped file
+    """
+    snapshot = Snapshot(path)
+    return Actor_Projection(snapshot.strings("actors"), snapshot.strings("actor_names"), snapshot.strings("titles"),
+                            snapshot.section("actor_offsets"), snapshot.section("actor_movies"),
+                            snapshot.section("movie_offsets"), snapshot.section("movie_actors"))
+
+
+def load_or_build_projection(path: str, sources: Sequence[str], build: Callable[[], Actor_Projection]) -> Actor_Projection:
+    """
+    Opens an actor projection snapshot, rebuilding it first if it is missing, unreadable or its sources changed
+    (see fresh_snapshot)
+    :param path: the snapshot file
+    :param sources: the source files
+    :param build: a function that builds the projection from the sources
+    :return: an Actor_Projection backed by the mapped file
+    """
+    if fresh_snapshot(path, sources) is not None:
+        print("Reading actor projection snapshot")
+        return open_projection(path)
+    if os.path.exists(path):
+        print("Actor projection snapshot is outdated")
+    save_projection(build(), path, sources)
+    return open_projection(path)
@@ -0,0 +1,37 @@
+import grafo_a
+from snapshot import load_or_build_projection
+
+MOVIES = {"tt1": {"primaryTitle": "A"}, "tt2": {"primaryTitle": "B"}, "tt3": {"primaryTitle": "A"},
+          "tt4": {"primaryTitle": "D"}, "tt5": {"primaryTitle": "E"}}
+CASTS = {"tt1": {"nm1", "nm2", "nm3"}, "tt2": {"nm2", "nm3"}, "tt3": {"nm3", "nm4"}, "tt4": {"nm5", "nm6"}, "tt5": {"nm7"}}
+NAMES = {"nm1": "One", "nm2": "Two", "nm3": "Three", "nm4": "Four", "nm5": "Five", "nm6": "Six"}
+
+
+def assert_same_graph(projection, graph):
+    assert list(projection.get_graph_elements()) == sorted(graph.get_graph_elements())
+    for vertex in graph.get_graph_elements():
+        assert projection.get_vertex_data(vertex) == graph.get_vertex_data(vertex)
+        assert sorted(projection.neighbors(vertex)) == sorted(graph.neighbors(vertex))
+        for neighbor in graph.neighbors(vertex):
+            assert set(projection.get_edge_data(vertex, neighbor)) == set(graph.get_edge_data(vertex, neighbor))
+
+
+def test_projection_answers_as_the_co_star_graph():
+    assert_same_graph(grafo_a.load_graph_projection(MOVIES, CASTS, NAMES), grafo_a.load_graph_bulk(MOVIES, CASTS, NAMES))
+
+
+def test_projection_snapshot_is_not_rebuilt(tmp_path):
+    path = str(tmp_path / "projection.snapshot")
+    builds = []
+
+    def build():
+        builds.append(1)
+        return grafo_a.load_graph_projection(MOVIES, CASTS, NAMES)
+    load_or_build_projection(path, [], build)
+    projection = load_or_build_projection(path, [], build)
+    assert builds == [1]
+    assert isinstance(projection.get_projection_arrays()[0], memoryview)
+    assert_same_graph(projection, grafo_a.load_graph_bulk(MOVIES, CASTS, NAMES))
+    components = grafo_a.find_connected_components(projection)
+    assert sorted(len(component) for component in components.values()) == [2, 4]
+    assert grafo_a.find_shortest_path_between_vertices(projection, "nm1", "nm4")[0] == 2
@@ -0,0 +1,60 @@
+import itertools
+import pytest
+import grafo_a
+from weight_channels import weight_table
+from test_movie_delta import synthetic_casts
+
+
+def brute_force_betweenness(graph, weighted: bool) -> dict:
+    vertices = list(graph.get_graph_elements())
+    weights = weight_table('shared')
+    inf = float('inf')
+    distance = {(u, v): (0 if u == v else inf) for u in vertices for v in vertices}
+    for u in vertices:
+        for v, movies in graph.neighbors_with_data(u):
+            distance[u, v] = weights[len(movies)] if weighted else 1
+    for k, i, j in itertools.product(vertices, repeat=3):
+        if distance[i, k] + distance[k, j] < distance[i, j]:
+            distance[i, j] = distance[i, k] + distance[k, j]
+    sigma = {}
+    for s in vertices:
+        sigma[s, s] = 1
+        for t in sorted((t for t in vertices if t != s and distance[s, t] < inf), key=lambda t: distance[s, t]):
+            sigma[s, t] = sum(sigma[s, u] for u, movies in graph.neighbors_with_data(t)
+                              if distance[s, u] + (weights[len(movies)] if weighted else 1) == distance[s, t])
+    scores = dict.fromkeys(vertices, 0.0)
+    for s, t in itertools.combinations(vertices, 2):
+        if distance[s, t] == inf: continue
+        for v in vertices:
+            if v not in (s, t) and distance[s, v] + distance[v, t] == distance[s, t]:
+                scores[v] += sigma[s, v] * sigma[v, t] / sigma[s, t]
+    return scores
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_brandes_matches_brute_force(weighted):
+    movies, casts, names = synthetic_casts(40, 30, seed=11)
+    graph = grafo_a.load_graph_bulk(movies, casts, names)
+    scores, number_of_sources = grafo_a.brandes_betweenness(graph, weighted=weighted)
+    assert number_of_sources == len(list(graph.get_graph_elements()))
+    for vertex, expected in brute_force_betweenness(graph, weighted).items():
+        assert scores.get(vertex, 0.0) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_approximate_betweenness_is_within_its_bound(weighted):
+    movies, casts, names = synthetic_casts(120, 80, seed=12)
+    graph = grafo_a.load_graph_bulk(movies, casts, names)
+    exact, _ = grafo_a.brandes_betweenness(graph, weighted=weighted)
+    estimates, samples, error = grafo_a.approximate_betweenness(graph, epsilon=0.05, delta=0.05, weighted=weighted, seed=13)
+    assert samples > 0
+    assert max(abs(estimates.get(vertex, 0.0) - exact.get(vertex, 0.0)) for vertex in graph.get_graph_elements()) <= error
+
+
+def test_approximate_betweenness_widens_the_bound_when_stopped_early():
+    movies, casts, names = synthetic_casts(120, 80, seed=12)
+    graph = grafo_a.load_graph_bulk(movies, casts, names)
+    _, full_samples, full_error = grafo_a.approximate_betweenness(graph, epsilon=0.05, seed=13)
+    _, samples, error = grafo_a.approximate_betweenness(graph, epsilon=0.05, seed=13, max_samples=full_samples // 4)
+    assert samples == full_samples // 4
+    assert error > full_error
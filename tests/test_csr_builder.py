@@ -0,0 +1,43 @@
+import pytest
+import grafo_a
+from graph import CSR_Graph
+from snapshot import save_graph, open_graph
+from test_movie_delta import synthetic_casts
+
+
+def assert_same_csr(graph, expected):
+    assert list(graph.get_graph_elements()) == list(expected.get_graph_elements())
+    assert graph.number_of_edges() == expected.number_of_edges()
+    for vertex in expected.get_graph_elements():
+        assert graph.get_vertex_data(vertex) == expected.get_vertex_data(vertex)
+        assert [(neighbor, set(movies)) for neighbor, movies in graph.neighbors_with_data(vertex)] == \
+               [(neighbor, set(movies)) for neighbor, movies in expected.neighbors_with_data(vertex)]
+
+
+@pytest.mark.parametrize("movie_ids_as_int", [False, True])
+def test_from_casts_matches_from_graph(movie_ids_as_int):
+    movies, casts, names = synthetic_casts(500, 200, seed=3)
+    casts["tt0000001"] = {"nm0000001", "nm9999999"}  # an actor without a name
+    graph = grafo_a.load_graph_csr(movies, casts, names, movie_ids_as_int=movie_ids_as_int)
+    expected = CSR_Graph.from_graph(grafo_a.load_graph_bulk(movies, casts, names, movie_ids_as_int=movie_ids_as_int))
+    assert_same_csr(graph, expected)
+    assert graph.get_vertex_data("nm9999999") == "ERROR"
+
+
+def test_from_casts_keeps_repeated_titles_and_actors_once():
+    graph = CSR_Graph.from_casts([("A", ["x", "y", "y"]), ("A", ["y", "x"]), ("B", ["x", "y", "z"]), ("C", ["w"])], {})
+    assert list(graph.get_graph_elements()) == ["x", "y", "z"]
+    assert graph.number_of_edges() == 3
+    assert graph.get_edge_data("x", "y") == frozenset({"A", "B"})
+
+
+def test_from_casts_rejects_mixed_movies():
+    with pytest.raises(ValueError):
+        CSR_Graph.from_casts([("A", ["x", "y"]), (2, ["x", "z"])], {})
+
+
+def test_from_casts_round_trips_through_a_snapshot(tmp_path):
+    movies, casts, names = synthetic_casts(300, 150, seed=4)
+    graph = grafo_a.load_graph_csr(movies, casts, names)
+    save_graph(graph, str(tmp_path / "graph.snapshot"), [])
+    assert_same_csr(open_graph(str(tmp_path / "graph.snapshot")), graph)
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+import grafo_a
+from graph import CSR_Graph
+from snapshot import save_graph, open_graph, extend_graph
+from test_movie_delta import synthetic_casts, split, edges_of, assert_repaired
+
+
+def snapshot_graph(path, movies, casts, names, movie_ids_as_int):
+    save_graph(CSR_Graph.from_graph(grafo_a.load_graph_bulk(movies, casts, names, movie_ids_as_int=movie_ids_as_int)), path, [])
+    return open_graph(path)
+
+
+@pytest.mark.parametrize("movie_ids_as_int", [False, True])
+def test_snapshot_delta_matches_a_full_load(tmp_path, movie_ids_as_int):
+    movies, casts, names = synthetic_casts(500, 400, seed=4)
+    before, delta = split(movies, 350)
+    path = str(tmp_path / "graph.snapshot")
+    graph = snapshot_graph(path, before, casts, names, movie_ids_as_int)
+    sources = [graph.vertex_name(idx) for idx in range(0, graph.number_of_vertices(), 50)]
+    for weighting in ('shared', 'hops'):
+        for source in sources:
+            grafo_a.find_shortest_path_to_all(graph, source, weighting)
+    graph.get_components_index()
+    extended = grafo_a.apply_movie_delta_to_snapshot(graph, delta, casts, names, path=path, sources=[])
+    expected = snapshot_graph(str(tmp_path / "expected.snapshot"), movies, casts, names, movie_ids_as_int)
+    assert list(extended.get_graph_elements()) == list(expected.get_graph_elements())
+    assert [extended.get_vertex_data(vertex) for vertex in expected.get_graph_elements()] == \
+           [expected.get_vertex_data(vertex) for vertex in expected.get_graph_elements()]
+    assert edges_of(extended) == edges_of(expected)
+    assert extended.number_of_edges() == expected.number_of_edges() == len(edges_of(expected)) // 2
+    assert extended.has_components_index()
+    labels, expected_labels = extended.get_components_index(), expected.get_components_index()
+    assert labels.number_of_components() == expected_labels.number_of_components()
+    for vertex in expected.get_graph_elements():
+        for neighbor in expected.neighbors(vertex):
+            assert labels.component_of(vertex) == labels.component_of(neighbor)
+        assert labels.component_size(vertex) == expected_labels.component_size(vertex)
+    for weighting in ('shared', 'hops'):
+        assert_repaired(extended, sources, weighting)
+    # The old graph keeps reading the file it was mapped from
+    assert graph.number_of_vertices() < extended.number_of_vertices()
+
+
+def test_extend_graph_ids(tmp_path):
+    movies, casts, names = synthetic_casts(60, 40, seed=5)
+    path = str(tmp_path / "graph.snapshot")
+    graph = snapshot_graph(path, movies, casts, names, False)
+    first, last = graph.vertex_name(0), graph.vertex_name(graph.number_of_vertices() - 1)
+    extended, old_to_new = extend_graph(graph, str(tmp_path / "extended.snapshot"), [], {"nm": "Before all", "nz": "After all"},
+                                        {("nm", first): ["New"], (first, last): ["Other"], ("nm", "nz"): ["New"]})
+    assert extended.index_of("nm") == 0 and extended.index_of("nz") == extended.number_of_vertices() - 1
+    assert np.array_equal(old_to_new, np.arange(1, graph.number_of_vertices() + 1))
+    assert extended.get_edge_data("nz", "nm") == {"New"}
+    assert "Other" in extended.get_edge_data(last, first)
+    assert extended.number_of_edges() == graph.number_of_edges() + 2 + (0 if graph.edge_exists(first, last) else 1)
+    with pytest.raises(ValueError):
+        extend_graph(graph, str(tmp_path / "mixed.snapshot"), [], {}, {(first, last): [7]})
+
+
+def test_snapshot_delta_needs_a_snapshot():
+    movies, casts, names = synthetic_casts(20, 20, seed=6)
+    with pytest.raises(ValueError):
+        grafo_a.apply_movie_delta_to_snapshot(CSR_Graph.from_graph(grafo_a.load_graph_bulk(movies, casts, names)), movies, casts, names)
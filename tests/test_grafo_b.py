@@ -0,0 +1,87 @@
+import random
+from collections import deque
+import grafo_b
+
+
+def small_bipartite():
+    movies = {"tt1": {"primaryTitle": "A"}, "tt2": {"primaryTitle": "B"}, "tt3": {"primaryTitle": "C"}}
+    casts = {"tt1": {"nm1", "nm2"}, "tt2": {"nm2", "nm3"}, "tt3": {"nm3", "nm4", "nm5"}}
+    names = {"nm1": "One", "nm2": "Two", "nm3": "Three", "nm4": "Four", "nm5": "Five"}
+    return grafo_b.load_graph(movies, casts, names)
+
+
+def test_snapshot_round_trip(tmp_path):
+    graph = small_bipartite()
+    path = str(tmp_path / "graph-b.snapshot")
+    grafo_b.save_graph(graph, path, [])
+    loaded = grafo_b.open_graph(path)
+    assert list(loaded.get_graph_elements()) == list(graph.get_graph_elements())
+    for vertex in graph.get_graph_elements():
+        assert loaded.get_vertex_data(vertex)['type'] == graph.get_vertex_data(vertex)['type']
+        assert loaded.get_vertex_data(vertex)['data'] == graph.get_vertex_data(vertex)['data']
+        assert list(loaded.neighbors(vertex)) == list(graph.neighbors(vertex))
+
+
+def random_bipartite(number_of_movies: int, number_of_actors: int, seed: int):
+    generator = random.Random(seed)
+    movies = {f"tt{idx:07d}": {"primaryTitle": f"Title {idx}"} for idx in range(number_of_movies)}
+    casts = {movie_id: {f"nm{generator.randrange(number_of_actors):07d}" for _ in range(generator.randint(1, 4))} for movie_id in movies}
+    return grafo_b.load_graph(movies, casts, {})
+
+
+def bfs_degree(graph, vertex1: str, vertex2: str) -> float:
+    distances = {vertex1: 0}
+    queue = deque([vertex1])
+    while queue:
+        vertex = queue.popleft()
+        for neighbor in graph.neighbors(vertex):
+            if neighbor not in distances:
+                distances[neighbor] = distances[vertex] + 1
+                queue.append(neighbor)
+    return distances[vertex2] / 2 if vertex2 in distances else float('inf')
+
+
+def test_degrees_of_separation_match_bfs():
+    graph = random_bipartite(300, 400, seed=7)
+    generator = random.Random(8)
+    actors = sorted(vertex for vertex in graph.get_graph_elements() if graph.get_vertex_data(vertex)['type'] == 'actor')
+    hub = actors[0]
+    pairs = [(hub, generator.choice(actors)) for _ in range(20)]
+    pairs += [(generator.choice(actors), generator.choice(actors)) for _ in range(200)]
+    pairs += [(hub, hub), (hub, "nm_missing"), (hub, "tt0000001")]
+    results = grafo_b.degrees_of_separation(graph, pairs)
+    for vertex1, vertex2 in pairs:
+        expected = bfs_degree(graph, vertex1, vertex2) if vertex2 in actors else float('inf')
+        assert results[(vertex1, vertex2)] == expected
+        assert grafo_b.degree_of_separation(graph, vertex1, vertex2) == expected
+
+
+def test_distance_index_repair_matches_a_rebuild():
+    graph = random_bipartite(300, 400, seed=9)
+    actors = sorted(vertex for vertex in graph.get_graph_elements() if graph.get_vertex_data(vertex)['type'] == 'actor')
+    hubs = actors[:2]
+    index = grafo_b.build_distance_index(graph, hubs)
+    delta = {"tt9000000": {"primaryTitle": "New"}, "tt9000001": {"primaryTitle": "Newer"}}
+    casts = {"tt9000000": {actors[5], actors[300], "nm9000000"}, "tt9000001": {"nm9000000", "nm9000001", actors[17]}}
+    grafo_b.apply_movie_delta(graph, delta, casts, {}, index)
+    expected = grafo_b.build_distance_index(graph, hubs)
+    for hub in hubs:
+        for actor in actors + ["nm9000000", "nm9000001"]:
+            assert index.distance(actor, hub) == expected.distance(actor, hub)
+
+
+def test_distance_index_repair_rejects_a_stale_index():
+    graph = random_bipartite(300, 400, seed=9)
+    actors = sorted(vertex for vertex in graph.get_graph_elements() if graph.get_vertex_data(vertex)['type'] == 'actor')
+    index = grafo_b.build_distance_index(graph, actors[:1])
+    # An actor added behind the index's back, then reached by a repaired movie
+    grafo_b.apply_movie_delta(graph, {"tt9000000": {"primaryTitle": "Unseen"}}, {"tt9000000": {actors[3], "nm9000000"}}, {})
+    before = [index.distance(actor, actors[0]) for actor in actors]
+    try:
+        grafo_b.apply_movie_delta(graph, {"tt9000001": {"primaryTitle": "New"}}, {"tt9000001": {actors[0], actors[3], "nm9000001"}}, {}, index)
+    except ValueError as error:
+        assert "nm9000000" in str(error)
+    else:
+        raise AssertionError("the stale index was repaired")
+    assert [index.distance(actor, actors[0]) for actor in actors] == before
+    assert index.distance("nm9000001", actors[0]) == float('inf')
@@ -0,0 +1,42 @@
+import math
+from graph import Graph
+from hyperanf import hyper_anf
+
+
+def cycle(number_of_vertices: int) -> Graph:
+    graph = Graph()
+    for idx in range(number_of_vertices):
+        graph.add_vertex(str(idx))
+    for idx in range(number_of_vertices):
+        graph.add_edge(str(idx), str((idx + 1) % number_of_vertices))
+    return graph
+
+
+def test_histogram_error_bars_follow_the_bins():
+    # An odd cycle of n vertices has 2n ordered pairs at every distance from 1 to (n - 1) / 2
+    number_of_vertices = 101
+    distribution = hyper_anf(cycle(number_of_vertices), runs=16)
+    histogram = distribution.histogram()
+    exact = 2 * number_of_vertices
+    assert len(histogram) == (number_of_vertices - 1) // 2
+    for distance, pairs, error in histogram:
+        assert 0 <= error < 0.25 * exact
+        # Statistical error plus the bias of the small HyperLogLog counters
+        assert abs(pairs - exact) <= 3 * error + 0.15 * exact
+    # The bars of the tail bins are about the size of their own spread, not of the cumulative count
+    _, _, last_error = histogram[-1]
+    assert last_error < distribution.errors[-1] / 4
+
+
+def test_histogram_error_bars_shrink_with_runs():
+    graph = cycle(61)
+    few = hyper_anf(graph, runs=4).histogram()
+    many = hyper_anf(graph, runs=32).histogram()
+    mean_error = lambda histogram: sum(error for _, _, error in histogram) / len(histogram)
+    assert mean_error(many) < mean_error(few)
+
+
+def test_single_run_has_no_bin_errors():
+    distribution = hyper_anf(cycle(21), runs=1)
+    assert all(math.isnan(error) for _, _, error in distribution.histogram())
+    assert distribution.neighborhood[0] == 21
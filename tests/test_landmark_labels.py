@@ -0,0 +1,45 @@
+import pytest
+import landmark_labels
+from landmark_labels import Landmark_Labels, build_landmark_labels
+from test_grafo_b import random_bipartite, bfs_degree
+
+
+def actors_of(graph) -> list:
+    return sorted(vertex for vertex in graph.get_graph_elements() if graph.get_vertex_data(vertex)['type'] == 'actor')
+
+
+@pytest.mark.parametrize("merge_size", [landmark_labels.NUMPY_MERGE_SIZE, 1])
+def test_labels_match_bfs(monkeypatch, merge_size):
+    monkeypatch.setattr(landmark_labels, "NUMPY_MERGE_SIZE", merge_size)
+    graph = random_bipartite(200, 250, seed=21)
+    labels = build_landmark_labels(graph, progress=False)
+    actors = actors_of(graph)
+    assert labels.number_of_actors() == len(actors)
+    for actor1 in actors[::10]:
+        for actor2 in actors:
+            assert labels.distance(actor1, actor2) == bfs_degree(graph, actor1, actor2)
+    assert labels.distance(actors[0], "nm_missing") == float('inf')
+
+
+def test_parallel_labels_match_bfs(monkeypatch):
+    monkeypatch.setattr(landmark_labels, "SEQUENTIAL_ROOTS", 8)
+    monkeypatch.setattr(landmark_labels, "MAX_BATCH_SIZE", 32)
+    graph = random_bipartite(200, 250, seed=22)
+    labels = build_landmark_labels(graph, workers=2, progress=False)
+    actors = actors_of(graph)
+    for actor1 in actors[::10]:
+        for actor2 in actors:
+            assert labels.distance(actor1, actor2) == bfs_degree(graph, actor1, actor2)
+
+
+def test_labels_round_trip(tmp_path):
+    graph = random_bipartite(100, 120, seed=23)
+    labels = build_landmark_labels(graph, progress=False)
+    path = str(tmp_path / "labels.snapshot")
+    labels.save(path, [])
+    loaded = Landmark_Labels.load(path)
+    assert loaded.number_of_entries() == labels.number_of_entries()
+    actors = actors_of(graph)
+    for actor1 in actors[::5]:
+        for actor2 in actors:
+            assert loaded.distance(actor1, actor2) == labels.distance(actor1, actor2)
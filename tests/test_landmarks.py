@@ -0,0 +1,25 @@
+import grafo_a
+from test_movie_delta import synthetic_casts, split
+
+
+def test_landmarks_are_rebuilt_for_another_count_or_graph(tmp_path):
+    movies, casts, names = synthetic_casts(300, 200, seed=5)
+    before, delta = split(movies, 250)
+    graph = grafo_a.load_graph_bulk(before, casts, names)
+    path = str(tmp_path / "landmarks.snapshot")
+    source = tmp_path / "source.tsv"
+    source.write_text("tconst\n")
+    landmarks = grafo_a.load_or_build_landmarks(graph, path, [str(source)], number_of_landmarks=4)
+    assert len(landmarks.landmarks) == 4
+    reloaded = grafo_a.load_or_build_landmarks(graph, path, [str(source)], number_of_landmarks=4)
+    assert reloaded.graph_size == landmarks.graph_size and reloaded.landmarks == landmarks.landmarks
+    assert type(reloaded._distances) is memoryview  # read from the file, not rebuilt
+    assert len(grafo_a.load_or_build_landmarks(graph, path, [str(source)], number_of_landmarks=6).landmarks) == 6
+    grafo_a.apply_movie_delta(graph, delta, casts, names)
+    rebuilt = grafo_a.load_or_build_landmarks(graph, path, [str(source)], number_of_landmarks=6)
+    assert type(rebuilt._distances) is not memoryview
+    assert rebuilt.graph_size == grafo_a._graph_size(graph) != landmarks.graph_size
+    for vertex in list(graph.get_graph_elements())[:20]:
+        expected = [grafo_a.find_shortest_path_to_all(graph, landmark, 'shared').distances().get(vertex, float('inf'))
+                    for landmark in rebuilt.landmarks]
+        assert rebuilt.distances_to(vertex) == expected
@@ -0,0 +1,73 @@
+import random
+import numpy as np
+import pytest
+import grafo_a
+from graph import CSR_Graph
+from snapshot import save_graph, open_graph
+from weight_channels import weight_table
+
+
+def synthetic_casts(number_of_movies: int, number_of_actors: int, seed: int) -> tuple:
+    generator = random.Random(seed)
+    movies = {f"tt{idx:07d}": {"primaryTitle": f"Title {idx % (number_of_movies // 2)}"} for idx in range(1, number_of_movies + 1)}
+    casts = {movie_id: {f"nm{generator.randrange(number_of_actors):07d}" for _ in range(generator.randint(1, 5))} for movie_id in movies}
+    names = {f"nm{idx:07d}": f"Actor {idx}" for idx in range(number_of_actors)}
+    return movies, casts, names
+
+
+def split(movies: dict, first: int) -> tuple:
+    ids = list(movies)
+    return {movie_id: movies[movie_id] for movie_id in ids[:first]}, {movie_id: movies[movie_id] for movie_id in ids[first:]}
+
+
+def edges_of(graph) -> dict:
+    return {(vertex, neighbor): set(movies) for vertex in graph.get_graph_elements() for neighbor, movies in graph.neighbors_with_data(vertex)}
+
+
+def assert_repaired(graph, sources, weighting):
+    vertices, index_of = grafo_a._vertex_ids(graph)
+    for source in sources:
+        cached = grafo_a.PATH_CACHE.get(graph.version(), source, weighting)
+        assert cached is not None
+        expected, _ = grafo_a._pack(graph, grafo_a.find_shortest_path_to_all(graph, source, weighting, use_cache=False),
+                                    weight_table(weighting).integral)
+        assert np.array_equal(cached[0], expected)
+        distances, predecessors = cached
+        weights = weight_table(weighting)
+        for idx in np.flatnonzero(predecessors >= 0).tolist():
+            predecessor = int(predecessors[idx])
+            assert distances[idx] == distances[predecessor] + weights[len(graph.get_edge_data(vertices[idx], vertices[predecessor]))]
+
+
+@pytest.mark.parametrize("movie_ids_as_int", [False, True])
+def test_delta_matches_a_full_load(movie_ids_as_int):
+    movies, casts, names = synthetic_casts(400, 300, seed=1)
+    before, delta = split(movies, 300)
+    graph = grafo_a.load_graph_bulk(before, casts, names, movie_ids_as_int=movie_ids_as_int)
+    sources = list(graph.get_graph_elements())[:5]
+    for source in sources:
+        grafo_a.find_shortest_path_to_all(graph, source, 'shared')
+    graph.get_components_index()
+    grafo_a.apply_movie_delta(graph, delta, casts, names)
+    expected = grafo_a.load_graph_bulk(movies, casts, names, movie_ids_as_int=movie_ids_as_int)
+    assert edges_of(graph) == edges_of(expected)
+    assert all(isinstance(movie, int) == movie_ids_as_int for movies in edges_of(graph).values() for movie in movies)
+    assert_repaired(graph, sources, 'shared')
+    components = grafo_a.find_connected_components(graph)
+    assert sorted(map(sorted, components.values())) == sorted(map(sorted, grafo_a.find_connected_components(expected).values()))
+
+
+def test_delta_on_an_int_graph_can_be_saved(tmp_path):
+    movies, casts, names = synthetic_casts(200, 150, seed=2)
+    before, delta = split(movies, 150)
+    graph = grafo_a.load_graph_bulk(before, casts, names, movie_ids_as_int=True)
+    grafo_a.add_movie(graph, "tt9999999", "New", ["nm0000001", "nm0000002", "nm9999999"], {"nm9999999": "New Actor"})
+    grafo_a.apply_movie_delta(graph, delta, casts, names)
+    save_graph(CSR_Graph.from_graph(graph), str(tmp_path / "graph.snapshot"), [])
+    assert 9999999 in open_graph(str(tmp_path / "graph.snapshot")).get_edge_data("nm0000001", "nm0000002")
+
+
+def test_delta_is_rejected_on_a_csr_graph():
+    movies, casts, names = synthetic_casts(20, 20, seed=3)
+    with pytest.raises(ValueError):
+        grafo_a.add_movie(CSR_Graph.from_graph(grafo_a.load_graph_bulk(movies, casts, names)), "tt9999999", "New", ["nm0000001", "nm0000002"])
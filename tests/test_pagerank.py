@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from pagerank import pagerank, approximate_personalized_pagerank, DAMPING
+from vectorized_bfs import Vectorized_Graph
+from test_vectorized_bfs import co_star_graph
+
+
+def exact_pagerank(vectorized: Vectorized_Graph, teleport: np.ndarray) -> np.ndarray:
+    number_of_vertices = len(vectorized.degrees)
+    transition = np.zeros((number_of_vertices, number_of_vertices))
+    for vertex in range(number_of_vertices):
+        neighbors = vectorized.neighbors[vectorized.offsets[vertex]:vectorized.offsets[vertex + 1]]
+        if len(neighbors):
+            np.add.at(transition[:, vertex], neighbors, 1 / len(neighbors))
+        else:
+            transition[:, vertex] = teleport  # dangling vertices teleport
+    return np.linalg.solve(np.eye(number_of_vertices) - DAMPING * transition, (1 - DAMPING) * teleport)
+
+
+def test_pagerank_matches_the_linear_system():
+    vectorized = Vectorized_Graph(co_star_graph(seed=41))
+    number_of_vertices = len(vectorized.degrees)
+    scores = pagerank(vectorized)
+    assert scores.sum() == pytest.approx(1)
+    assert np.allclose(scores, exact_pagerank(vectorized, np.full(number_of_vertices, 1 / number_of_vertices)), atol=1e-9)
+    personalization = np.zeros(number_of_vertices)
+    personalization[:3] = [1, 2, 3]
+    assert np.allclose(pagerank(vectorized, personalization=personalization),
+                       exact_pagerank(vectorized, personalization / personalization.sum()), atol=1e-9)
+    with pytest.raises(ValueError):
+        pagerank(vectorized, personalization=-personalization)
+
+
+def test_approximate_personalized_pagerank_is_within_its_bound():
+    vectorized = Vectorized_Graph(co_star_graph(seed=42))
+    seed = int(np.argmax(vectorized.degrees))
+    teleport = np.zeros(len(vectorized.degrees))
+    teleport[seed] = 1
+    exact = exact_pagerank(vectorized, teleport)
+    epsilon = 1e-5
+    approximate = approximate_personalized_pagerank(vectorized, seed, epsilon=epsilon)
+    estimates = np.zeros(len(exact))
+    estimates[list(approximate)] = list(approximate.values())
+    assert np.all(estimates <= exact + 1e-12)
+    assert np.all(exact - estimates < epsilon * np.maximum(vectorized.degrees, 1))
@@ -0,0 +1,37 @@
+import numpy as np
+from path_cache import Path_Cache
+
+
+def result(size: int) -> tuple:
+    return np.zeros(size, dtype=np.int64), np.full(size, -1, dtype=np.int32)
+
+
+def test_least_recently_used_results_are_evicted():
+    cache = Path_Cache(max_bytes=3 * 12 * 10)  # three results of 10 vertices
+    for source in "abc":
+        cache.put(1, source, 'shared', *result(10))
+    assert cache.get(1, "a", 'shared') is not None
+    cache.put(1, "d", 'shared', *result(10))
+    assert cache.get(1, "b", 'shared') is None
+    assert [cache.get(1, source, 'shared') is not None for source in "acd"] == [True, True, True]
+    assert cache.get(2, "a", 'shared') is None and cache.get(1, "a", 'hops') is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['entries']) == (4, 3, 1, 3)
+    assert stats['bytes'] == 3 * 12 * 10
+    cache.put(1, "huge", 'shared', *result(100))
+    assert cache.get(1, "huge", 'shared') is None and len(cache) == 3
+    cache.resize(12 * 10)
+    assert len(cache) == 1 and cache.get(1, "d", 'shared') is not None
+
+
+def test_get_any_and_take():
+    cache = Path_Cache()
+    cache.put(1, "a", 'shared', *result(5))
+    cache.put(1, "b", 'hops', *result(5))
+    cache.put(2, "c", 'shared', *result(5))
+    assert cache.get_any(1, ["x", "a"], 'shared')[0] == "a"
+    assert cache.get_any(1, ["x", "y"], 'shared') is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    taken = cache.take(1)
+    assert sorted((source, weighting) for source, weighting, _, _ in taken) == [("a", 'shared'), ("b", 'hops')]
+    assert len(cache) == 1 and cache.stats()['bytes'] == 12 * 5 and cache.evictions == 0
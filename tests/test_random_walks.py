@@ -0,0 +1,26 @@
+import numpy as np
+from random_walks import walk_visits, parallel_walk_visits
+from vectorized_bfs import Vectorized_Graph
+from test_vectorized_bfs import co_star_graph
+
+
+def test_walks_visit_in_proportion_to_the_degree():
+    vectorized = Vectorized_Graph(co_star_graph(seed=51))
+    visits = walk_visits(vectorized, num_walks=20000, walk_length=30, seed=1)
+    has_neighbors = vectorized.degrees > 0
+    # Every walk counts its start plus one visit per step, except the ones that start at a vertex without neighbors
+    assert visits.sum() == 20000 + 20000 * 30 - 30 * visits[~has_neighbors].sum()
+    assert np.array_equal(visits, walk_visits(vectorized, num_walks=20000, walk_length=30, seed=1))
+    # Long walks visit the vertices of a component in proportion to their degree
+    largest = max(vectorized.degrees.tolist())
+    hubs = np.flatnonzero(vectorized.degrees == largest)
+    leaves = np.flatnonzero(vectorized.degrees == 1)
+    assert visits[hubs].mean() > visits[leaves].mean()
+
+
+def test_parallel_walks_depend_only_on_the_seed():
+    vectorized = Vectorized_Graph(co_star_graph(seed=52))
+    one = parallel_walk_visits(vectorized, num_walks=3000, walk_length=10, seed=7, workers=1, batch_size=500)
+    two = parallel_walk_visits(vectorized, num_walks=3000, walk_length=10, seed=7, workers=2, batch_size=500)
+    assert np.array_equal(one, two)
+    assert one.sum() == walk_visits(vectorized, num_walks=3000, walk_length=10, seed=7, batch_size=500).sum()
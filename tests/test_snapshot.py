@@ -0,0 +1,58 @@
+import struct
+import pytest
+from graph import Graph, CSR_Graph
+from snapshot import HEADER, MAGIC, FORMAT_VERSION, BYTE_ORDER_MARK, Snapshot, fresh_snapshot, load_or_build_graph, open_graph, save_graph
+
+
+def small_graph() -> Graph:
+    graph = Graph()
+    for actor, name in (("nm1", "One"), ("nm2", "Two"), ("nm3", "Three")):
+        graph.add_vertex(actor, name)
+    graph.add_edge("nm1", "nm2", {"A"})
+    graph.add_edge("nm2", "nm3", {"A", "B"})
+    return graph
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "source.tsv"
+    path.write_text("data\n")
+    return [str(path)]
+
+
+def test_round_trip(tmp_path, source):
+    path = str(tmp_path / "graph.snapshot")
+    save_graph(CSR_Graph.from_graph(small_graph()), path, source)
+    graph = open_graph(path)
+    assert list(graph.get_graph_elements()) == ["nm1", "nm2", "nm3"]
+    assert graph.get_vertex_data("nm3") == "Three"
+    assert graph.get_edge_data("nm3", "nm2") == {"A", "B"}
+    assert fresh_snapshot(path, source) is not None
+
+
+@pytest.mark.parametrize("contents", [
+    b"not a snapshot at all",
+    HEADER.pack(MAGIC, FORMAT_VERSION + 1, BYTE_ORDER_MARK, 0, 0),
+    HEADER.pack(MAGIC, FORMAT_VERSION, BYTE_ORDER_MARK, 1, 3),
+    b"",
+])
+def test_unreadable_snapshot_is_rebuilt(tmp_path, source, contents):
+    path = tmp_path / "graph.snapshot"
+    path.write_bytes(contents)
+    with pytest.raises(ValueError):
+        Snapshot(str(path))
+    assert fresh_snapshot(str(path), source) is None
+    builds = []
+    graph = load_or_build_graph(str(path), source, lambda: builds.append(1) or small_graph())
+    assert builds == [1]
+    assert graph.number_of_vertices() == 3
+    assert load_or_build_graph(str(path), source, lambda: builds.append(1) or small_graph()).number_of_vertices() == 3
+    assert builds == [1]
+
+
+def test_changed_sources_are_rebuilt(tmp_path, source):
+    path = str(tmp_path / "graph.snapshot")
+    load_or_build_graph(path, source, small_graph)
+    with open(source[0], "a") as file:
+        file.write("more data\n")
+    assert fresh_snapshot(path, source) is None
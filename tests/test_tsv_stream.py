@@ -0,0 +1,53 @@
+import pytest
+import grafo_a
+from tsv_stream import iter_columns, iter_casts, iter_names
+
+MOVIES = "tconst\ttitleType\tprimaryTitle\ntt1\tmovie\tA\ntt2\tmovie\tB\ntt3\tshort\tC\n"
+SORTED_PRINCIPALS = "tconst\tordering\tnconst\ntt1\t1\tnm1\ntt1\t2\tnm2\ntt1\t3\tnm3\ntt2\t1\tnm3\ntt3\t1\tnm1\n"
+UNSORTED_PRINCIPALS = "tconst\tordering\tnconst\ntt1\t1\tnm1\ntt2\t1\tnm3\ntt1\t2\tnm2\n"
+NAMES = "nconst\tprimaryName\nnm1\tOne\nnm2\tTwo\nnm3\tThree\n"
+
+
+def write(tmp_path, name: str, text: str, newline: str = "\n") -> str:
+    path = tmp_path / name
+    path.write_bytes(text.replace("\n", newline).encode("utf-8"))
+    return str(path)
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+def test_columns_across_chunks(tmp_path, newline, chunk_size):
+    path = write(tmp_path, "names.tsv", NAMES, newline)
+    assert list(iter_columns(path, ("nconst", "primaryName"), chunk_size=chunk_size)) == [("nm1", "One"), ("nm2", "Two"), ("nm3", "Three")]
+    assert list(iter_columns(path, ("primaryName",), chunk_size=chunk_size)) == [("One",), ("Two",), ("Three",)]
+
+
+def test_names_of_a_crlf_file(tmp_path):
+    path = write(tmp_path, "names.tsv", NAMES, "\r\n")
+    assert dict(iter_names(path, {"nm1", "nm3"})) == {"nm1": "One", "nm3": "Three"}
+
+
+def test_casts(tmp_path):
+    path = write(tmp_path, "principals.tsv", SORTED_PRINCIPALS)
+    assert list(iter_casts(path, {"tt1", "tt2"}, grouped=True)) == [("tt1", {"nm1", "nm2", "nm3"}), ("tt2", {"nm3"})]
+
+
+def test_unsorted_casts(tmp_path):
+    path = write(tmp_path, "principals.tsv", UNSORTED_PRINCIPALS)
+    assert list(iter_casts(path, {"tt1", "tt2"})) == [("tt1", {"nm1"}), ("tt2", {"nm3"}), ("tt1", {"nm2"})]
+    with pytest.raises(ValueError):
+        list(iter_casts(path, {"tt1", "tt2"}, grouped=True))
+    with pytest.raises(ValueError):
+        grafo_a.load_graph_streaming(write(tmp_path, "movies.tsv", MOVIES), path, write(tmp_path, "names.tsv", NAMES))
+
+
+def test_streaming_load_matches_read_data(tmp_path):
+    files = (write(tmp_path, "movies.tsv", MOVIES), write(tmp_path, "principals.tsv", SORTED_PRINCIPALS, "\r\n"),
+             write(tmp_path, "names.tsv", NAMES, "\r\n"))
+    streamed = grafo_a.load_graph_streaming(*files)
+    loaded = grafo_a.load_graph(*grafo_a.read_data(*files))
+    for vertex in loaded.get_graph_elements():
+        assert streamed.get_vertex_data(vertex) == loaded.get_vertex_data(vertex)
+        assert {neighbor: set(movies) for neighbor, movies in streamed.neighbors_with_data(vertex)} == \
+               {neighbor: set(movies) for neighbor, movies in loaded.neighbors_with_data(vertex)}
+    assert streamed.get_vertex_data("nm3") == "Three"
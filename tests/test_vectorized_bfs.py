@@ -0,0 +1,62 @@
+from collections import deque
+import numpy as np
+import pytest
+import grafo_a
+from graph import CSR_Graph
+from parallel_bfs import multi_source_bfs
+from vectorized_bfs import Vectorized_Graph, bfs, dial_dijkstra, bit_parallel_bfs
+from test_movie_delta import synthetic_casts
+
+
+def co_star_graph(seed: int):
+    movies, casts, names = synthetic_casts(600, 500, seed=seed)
+    return grafo_a.load_graph_bulk(movies, casts, names)
+
+
+def hops_from(graph, source: str) -> dict:
+    distances = {source: 0}
+    queue = deque([source])
+    while queue:
+        vertex = queue.popleft()
+        for neighbor in graph.neighbors(vertex):
+            if neighbor not in distances:
+                distances[neighbor] = distances[vertex] + 1
+                queue.append(neighbor)
+    return distances
+
+
+@pytest.mark.parametrize("direction_optimizing", [False, True])
+def test_bfs_matches_a_sequential_bfs(direction_optimizing):
+    graph = co_star_graph(seed=31)
+    vectorized = Vectorized_Graph(graph)
+    for source in list(graph.get_graph_elements())[:10]:
+        distances, parents = bfs(vectorized, vectorized.index_of(source), direction_optimizing=direction_optimizing)
+        expected = hops_from(graph, source)
+        assert {vectorized.vertices[idx]: int(distances[idx]) for idx in np.flatnonzero(distances >= 0).tolist()} == expected
+        for idx in np.flatnonzero(parents >= 0).tolist():
+            assert distances[parents[idx]] == distances[idx] - 1
+            assert graph.edge_exists(vectorized.vertices[idx], vectorized.vertices[parents[idx]])
+
+
+@pytest.mark.parametrize("weighting", ['shared', 'inverse'])
+def test_dial_dijkstra_matches_dijkstra(weighting):
+    graph = co_star_graph(seed=32)
+    vectorized = Vectorized_Graph(graph)
+    for source in list(graph.get_graph_elements())[:5]:
+        distances, _ = dial_dijkstra(vectorized, vectorized.index_of(source), vectorized.edge_weights(weighting))
+        expected = grafo_a.find_shortest_path_to_all(graph, source, weighting, use_cache=False).distances()
+        reached = np.flatnonzero(distances >= 0).tolist()
+        assert {vectorized.vertices[idx] for idx in reached} == set(expected)
+        for idx in reached:
+            assert distances[idx] == pytest.approx(expected[vectorized.vertices[idx]])
+
+
+def test_bit_parallel_and_multi_source_bfs_match_a_sequential_bfs():
+    graph = CSR_Graph.from_graph(co_star_graph(seed=33))
+    sources = list(graph.get_graph_elements())[:70] + ["nm_missing"]
+    expected = {}
+    for source in sources[:-1]:
+        distances = hops_from(graph, source)
+        expected[source] = (max(distances.values()), sum(distances.values()))
+    assert bit_parallel_bfs(graph, sources, progress=False) == expected
+    assert multi_source_bfs(graph, sources, workers=2, progress=False) == expected
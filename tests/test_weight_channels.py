@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+from weight_channels import channel_weights, weight_table, WEIGHT_CHANNELS
+
+
+def test_channels():
+    shared = np.array([1, 2, 3])
+    assert channel_weights('shared', shared).tolist() == [1, 2, 3]
+    assert channel_weights('hops', shared).tolist() == [1, 1, 1]
+    assert np.allclose(channel_weights('inverse', shared), [1, 1 / 2, 1 / 3])
+    assert np.allclose(channel_weights('log', shared), 1 / np.log2([2, 3, 4]))
+    with pytest.raises(ValueError):
+        channel_weights('unknown', shared)
+
+
+@pytest.mark.parametrize("channel", WEIGHT_CHANNELS)
+def test_weight_tables_match_the_channels(channel):
+    table = weight_table(channel)
+    assert table is weight_table(channel)
+    assert table.integral == (channel in ('shared', 'hops'))
+    assert [table[shared] for shared in range(1, 6)] == pytest.approx(channel_weights(channel, np.arange(1, 6)).tolist())
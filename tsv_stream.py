@@ -0,0 +1,152 @@
+from typing import Iterator, Tuple, Sequence, Container, Optional
+from operator import itemgetter
+import time
+MOVIE_TITLE_TYPE = "movie"
+CHUNK_SIZE = 1 << 24  # 16 MB per read
+
+
+class Ingest_Stats:
+    """
+    Ingest_Stats class (bytes and rows consumed by the streaming readers)
+    """
+    def __init__(self):
+        self.bytes_read = 0
+        self.rows = 0
+        self.start_time = time.time()
+
+    def elapsed(self) -> float:
+        """
+        Gets the seconds since the stats were created
+        :return: elapsed seconds
+        """
+        return time.time() - self.start_time
+
+    def mb_per_second(self) -> float:
+        """
+        Gets the ingest throughput
+        :return: megabytes read per second
+        """
+        elapsed = self.elapsed()
+        if elapsed == 0:
+            return 0.0
+        return self.bytes_read / (1 << 20) / elapsed
+
+    def report(self) -> str:
+        """
+        Gets a printable summary of the stats
+        :return: the summary
+        """
+        return (f"Read {self.bytes_read / (1 << 20):.1f} MB ({self.rows} rows) in {self.elapsed():.2f} seconds "
+                f"({self.mb_per_second():.1f} MB/s)")
+
+
+def iter_columns(path: str, columns: Sequence[str], stats: Optional[Ingest_Stats] = None,
+                 chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, ...]]:
+    """
+    Streams the requested columns of a TSV file, reading it in large binary chunks.
+    IMDb TSVs are not quoted, so every line is split on tabs without a csv dialect. Lines may end in "\r\n".
+    :param path: the TSV file
+    :param columns: the column names to keep
+    :param stats: optional Ingest_Stats updated while reading
+    :param chunk_size: bytes per read
+    :return: an iterator of tuples with the requested columns, in order
+    """
+    with open(path, "rb", buffering=0) as file:
+        header = file.readline()
+        if stats is not None:
+            stats.bytes_read += len(header)
+        names = header.decode("utf-8").rstrip("\r\n").split("\t")
+        try:
+            indexes = [names.index(column) for column in columns]
+        except ValueError:
+            raise ValueError(f"{path} does not have the columns {list(columns)}")
+        max_split = max(indexes) + 1
+        getter = itemgetter(*indexes)
+        single = len(indexes) == 1
+        remainder = b""
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            if stats is not None:
+                stats.bytes_read += len(chunk)
+            chunk = remainder + chunk
+            cut = chunk.rfind(b"\n") + 1
+            remainder = chunk[cut:]
+            text = chunk[:cut].decode("utf-8")
+            if "\r" in text:
+                text = text.replace("\r\n", "\n")
+            lines = text.split("\n")
+            lines.pop()
+            if stats is not None:
+                stats.rows += len(lines)
+            for line in lines:
+                fields = line.split("\t", max_split)
+                if len(fields) < max_split:
+                    continue
+                yield (getter(fields),) if single else getter(fields)
+        if remainder:
+            fields = remainder.decode("utf-8").rstrip("\r\n").split("\t", max_split)
+            if stats is not None:
+                stats.rows += 1
+            if len(fields) >= max_split:
+                yield (getter(fields),) if single else getter(fields)
+
+
+def iter_movies(movies_file: str, stats: Optional[Ingest_Stats] = None) -> Iterator[Tuple[str, str]]:
+    """
+    Streams the movies of title.basics
+    :param movies_file: the title.basics TSV
+    :param stats: optional Ingest_Stats updated while reading
+    :return: an iterator of (tconst, primaryTitle) for every title of type movie
+    """
+    for tconst, title_type, primary_title in iter_columns(movies_file, ("tconst", "titleType", "primaryTitle"), stats):
+        if title_type == MOVIE_TITLE_TYPE:
+            yield tconst, primary_title
+
+
+def iter_casts(actors_file: str, movie_ids: Container[str],
+               stats: Optional[Ingest_Stats] = None, grouped: bool = False) -> Iterator[Tuple[str, set]]:
+    """
+    Streams the cast of every movie of title.principals.
+    Rows are grouped while consecutive rows share a tconst (the IMDb dump is sorted by tconst),
+    so only one cast is held in memory at a time. An unsorted file yields the same movie more
+    than once, with disjoint parts of its cast, unless grouped is set.
+    :param actors_file: the title.principals TSV
+    :param movie_ids: the tconsts to keep
+    :param stats: optional Ingest_Stats updated while reading
+    :param grouped: raise a ValueError if the rows of a movie are not consecutive, for the readers that need
+                    every cast whole at once (it keeps the tconsts already yielded)
+    :return: an iterator of (tconst, set of nconst)
+    """
+    current_movie = None
+    cast = set()
+    yielded = set()
+    for tconst, nconst in iter_columns(actors_file, ("tconst", "nconst"), stats):
+        if tconst != current_movie:
+            if cast:
+                yield current_movie, cast
+                if grouped: yielded.add(current_movie)
+            if tconst in yielded:
+                raise ValueError(f"{actors_file} is not sorted by tconst, the rows of {tconst} are not consecutive")
+            current_movie = tconst
+            cast = set()
+        if tconst in movie_ids:
+            cast.add(nconst)
+    if cast:
+        yield current_movie, cast
+
+
+def iter_names(actors_name_file: str, actor_ids: Container[str],
+               stats: Optional[Ingest_Stats] = None) -> Iterator[Tuple[str, str]]:
+    """
+    Streams the names of name.basics
+    :param actors_name_file: the name.basics TSV
+    :param actor_ids: the nconsts to keep
+    :param stats: optional Ingest_Stats updated while reading
+    :return: an iterator of (nconst, primaryName)
+    """
+    for nconst, primary_name in iter_columns(actors_name_file, ("nconst", "primaryName"), stats):
+        if nconst in actor_ids:
+            yield nconst, primary_name
+
@@ -0,0 +1,311 @@
+from typing import Tuple, Sequence, Dict, Optional
+import time
+import numpy as np
+from tqdm import tqdm
+from parallel_bfs import topology_arrays
+from weight_channels import channel_weights
+ALPHA = 14  # switch to bottom-up when the frontier edges exceed the unvisited edges / ALPHA
+BETA = 24  # switch back to top-down when the frontier has fewer vertices than the graph / BETA
+BATCH_SIZE = 64  # sources advanced together by the bit-parallel BFS, one bit of a uint64 each
+
+
+class Vectorized_Graph:
+    """
+    Vectorized_Graph class (NumPy CSR copy of the topology of a Graph, CSR_Graph or Bipartite_Graph).
+    The neighbors keep the iteration order of the original graph, so a top-down BFS discovers the
+    vertices in the same order as the sequential BFS.
+    """
+    def __init__(self, graph):
+        self.graph = graph
+        self.vertices, self._index, offsets, neighbors = topology_arrays(graph)
+        self.offsets = np.frombuffer(offsets, dtype=np.int64) if len(offsets) else np.zeros(1, dtype=np.int64)
+        self.neighbors = np.frombuffer(neighbors, dtype=np.int32) if len(neighbors) else np.zeros(0, dtype=np.int32)
+        self.degrees = np.diff(self.offsets)
+        self._actors = None
+        self._shared = None
+        self._weights = {}
+        self._version = graph.version() if hasattr(graph, 'version') else None
+
+    def index_of(self, vertex: str) -> int:
+        """
+        Gets the id of a vertex
+        :param vertex: the vertex name
+        :return: the vertex id, or -1 if the vertex does not exist
+        """
+        if self._index is None:
+            return self.graph.index_of(vertex)
+        return self._index.get(vertex, -1)
+
+    def version(self) -> Optional[int]:
+        """
+        Gets the version of the graph this copy was made from (None if the graph has no versions)
+        :return: the version
+        """
+        return self._version
+
+    def actor_mask(self) -> np.ndarray:
+        """
+        Gets which vertices are actors (for a Bipartite_Graph)
+        :return: a boolean array by vertex id
+        """
+        if self._actors is None:
+            self._actors = np.fromiter((self.graph.get_vertex_data(vertex)['type'] == 'actor' for vertex in self.vertices),
+                                       dtype=bool, count=len(self.vertices))
+        return self._actors
+
+    def edge_weights(self, channel: str = 'shared') -> np.ndarray:
+        """
+        Gets the weight of every edge slot in a weight channel (see weight_channels.channel_weights), aligned with
+        neighbors. The number of shared movies of every edge (the len of its data, or 1 for edges without data, as
+        in a Bipartite_Graph) is read once, and every channel is computed from it once, the first time it is needed.
+        :param channel: the channel name (default 'shared', the number of shared movies)
+        :return: an array with one weight per edge slot, int32 for the integer channels and float64 otherwise
+        """
+        if channel not in self._weights:
+            if self._shared is None:
+                self._shared = self._shared_movies()
+            self._weights[channel] = channel_weights(channel, self._shared)
+        return self._weights[channel]
+
+    def _shared_movies(self) -> np.ndarray:
+        if self._index is None:
+            _, _, edge_ids = self.graph.get_csr_arrays()
+            shared_by_edge = np.fromiter((len(self.graph.get_edge_payload(edge_id)) for edge_id in range(self.graph.number_of_edges())),
+                                         dtype=np.int32, count=self.graph.number_of_edges())
+            return shared_by_edge[np.frombuffer(edge_ids, dtype=np.int32)] if len(edge_ids) else np.zeros(0, dtype=np.int32)
+        if hasattr(self.graph, 'neighbors_with_data'):
+            return np.fromiter((1 if data is None else len(data) for vertex in self.vertices
+                                for _, data in self.graph.neighbors_with_data(vertex)),
+                               dtype=np.int32, count=len(self.neighbors))
+        return np.ones(len(self.neighbors), dtype=np.int32)
+
+
+def _gather_slots(graph: Vectorized_Graph, vertices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Gets the edge slots of some vertices in order, and the position of their owner in vertices
+    """
+    starts = graph.offsets[vertices]
+    counts = graph.degrees[vertices]
+    total = int(counts.sum())
+    owners = np.repeat(np.arange(len(vertices)), counts)
+    slots = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(starts, counts)
+    return slots, owners
+
+
+def _gather(graph: Vectorized_Graph, vertices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Gets the neighbors of some vertices in order, and the position of their owner in vertices
+    """
+    slots, owners = _gather_slots(graph, vertices)
+    return graph.neighbors[slots], owners
+
+
+def bfs(graph: Vectorized_Graph, source: int, target: int = -1, direction_optimizing: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Level-synchronous BFS that expands whole frontiers with array operations.
+    Top-down levels gather the edges of the frontier in queue order and keep the first discovery of every
+    new vertex, so the new frontier and the parents are the ones the sequential BFS would produce.
+    Bottom-up levels (used for the large middle levels when direction_optimizing) scan the edges of the
+    unvisited vertices instead, so their parents are still on a shortest path but can differ from the
+    sequential ones. Distances are always exact.
+    :param graph: the vectorized graph
+    :param source: the source vertex id
+    :param target: optional vertex id that stops the search at the end of the level where it is reached
+    :param direction_optimizing: allow bottom-up levels
+    :return: a tuple with the format (distances, parents), -1 for vertices that were not reached
+    """
+    number_of_vertices = len(graph.degrees)
+    distances = np.full(number_of_vertices, -1, dtype=np.int32)
+    parents = np.full(number_of_vertices, -1, dtype=np.int32)
+    first_seen = np.full(number_of_vertices, len(graph.neighbors), dtype=np.int64)
+    distances[source] = 0
+    frontier = np.array([source], dtype=np.int64)
+    unvisited_edges = int(graph.degrees.sum()) - int(graph.degrees[source])
+    level = 0
+    bottom_up = False
+    while len(frontier):
+        if target >= 0 and distances[target] >= 0:
+            break
+        level += 1
+        frontier_edges = int(graph.degrees[frontier].sum())
+        if direction_optimizing:
+            if not bottom_up and frontier_edges > unvisited_edges / ALPHA: bottom_up = True
+            elif bottom_up and len(frontier) < number_of_vertices / BETA: bottom_up = False
+        if bottom_up:
+            in_frontier = np.zeros(number_of_vertices, dtype=bool)
+            in_frontier[frontier] = True
+            unvisited = np.flatnonzero(distances < 0)
+            neighbors, owners = _gather(graph, unvisited)
+            hits = np.flatnonzero(in_frontier[neighbors])
+            hit_owners = owners[hits]
+            first_hits = np.flatnonzero(np.diff(hit_owners, prepend=-1))
+            new_vertices = unvisited[hit_owners[first_hits]]
+            parents[new_vertices] = neighbors[hits[first_hits]]
+        else:
+            neighbors, owners = _gather(graph, frontier)
+            fresh = np.flatnonzero(distances[neighbors] < 0)
+            candidates = neighbors[fresh]
+            slots = np.arange(len(candidates))
+            np.minimum.at(first_seen, candidates, slots)
+            first = np.flatnonzero(first_seen[candidates] == slots)
+            first_seen[candidates] = len(graph.neighbors)
+            new_vertices = candidates[first]
+            parents[new_vertices] = frontier[owners[fresh[first]]]
+        distances[new_vertices] = level
+        unvisited_edges -= int(graph.degrees[new_vertices].sum())
+        frontier = new_vertices.astype(np.int64)
+    return distances, parents
+
+
+def bfs_stats(graph: Vectorized_Graph, source: int, direction_optimizing: bool = True) -> Tuple[int, int, int]:
+    """
+    Runs a BFS and summarizes it
+    :param graph: the vectorized graph
+    :param source: the source vertex id
+    :param direction_optimizing: allow bottom-up levels
+    :return: a tuple with the format (eccentricity, sum of distances, number of reached vertices)
+    """
+    distances, _ = bfs(graph, source, direction_optimizing=direction_optimizing)
+    reached = distances[distances >= 0]
+    return int(reached.max()), int(reached.sum(dtype=np.int64)), len(reached)
+
+
+def _bucket_of(distances: np.ndarray, width: float) -> np.ndarray:
+    if distances.dtype.kind in 'iu':
+        return distances // int(width)
+    return np.floor(np.minimum(distances / width, 2 ** 62)).astype(np.int64)
+
+
+def dial_dijkstra(graph: Vectorized_Graph, source: int, weights: Optional[np.ndarray] = None,
+                  target: int = -1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Dijkstra with a bucket queue (Dial): bucket k holds the vertices whose tentative distance fell in
+    [k * width, (k + 1) * width), where width is the smallest weight (1 for the integer channels, so a
+    bucket is a single distance). Buckets are settled in increasing order, and no vertex of the lowest
+    bucket can improve another one of it, so the whole bucket is final when it is reached and its edges
+    are relaxed at once with array operations, like a BFS level. Every vertex gets the first frontier
+    vertex (in bucket order) that gave it its final distance as parent.
+    :param graph: the vectorized graph
+    :param source: the source vertex id
+    :param weights: positive weights by edge slot (default graph.edge_weights(), the shared movies)
+    :param target: optional vertex id that stops the search when its distance is final
+    :return: a tuple with the format (distances, parents), -1 for vertices that were not reached (or not settled
+        when the search stopped at the target). The distances are int64 for integer weights, float64 otherwise.
+    """
+    if weights is None:
+        weights = graph.edge_weights()
+    integral = weights.dtype.kind in 'iu'
+    width = weights.min() if len(weights) else 1
+    if width <= 0:
+        raise ValueError("The weights must be positive")
+    number_of_vertices = len(graph.degrees)
+    unreached = np.iinfo(np.int64).max if integral else np.inf
+    tentative = np.full(number_of_vertices, unreached, dtype=np.int64 if integral else np.float64)
+    parents = np.full(number_of_vertices, -1, dtype=np.int32)
+    first_seen = np.full(number_of_vertices, len(graph.neighbors), dtype=np.int64)
+    tentative[source] = 0
+    buckets = {0: [np.array([source], dtype=np.int64)]}
+    while buckets:
+        bucket = min(buckets)
+        candidates = np.concatenate(buckets.pop(bucket))
+        frontier = candidates[_bucket_of(tentative[candidates], width) == bucket]
+        if not integral or width > 1:
+            # A vertex improved twice within a bucket was added to it twice
+            _, first = np.unique(frontier, return_index=True)
+            frontier = frontier[np.sort(first)]
+        if target >= 0 and _bucket_of(tentative[target:target + 1], width)[0] == bucket:
+            unsettled = _bucket_of(tentative, width) > bucket
+            tentative[unsettled], parents[unsettled] = unreached, -1
+            break
+        slots, owners = _gather_slots(graph, frontier)
+        neighbors = graph.neighbors[slots]
+        new_distances = tentative[frontier][owners] + weights[slots]
+        better = np.flatnonzero(new_distances < tentative[neighbors])
+        neighbors, new_distances, owners = neighbors[better], new_distances[better], owners[better]
+        np.minimum.at(tentative, neighbors, new_distances)
+        best = np.flatnonzero(new_distances == tentative[neighbors])
+        neighbors, new_distances, owners = neighbors[best], new_distances[best], owners[best]
+        order = np.arange(len(neighbors))
+        np.minimum.at(first_seen, neighbors, order)
+        first = np.flatnonzero(first_seen[neighbors] == order)
+        first_seen[neighbors] = len(graph.neighbors)
+        improved, new_buckets = neighbors[first].astype(np.int64), _bucket_of(new_distances[first], width)
+        parents[improved] = frontier[owners[first]]
+        for new_bucket in np.unique(new_buckets).tolist():
+            buckets.setdefault(new_bucket, []).append(improved[new_buckets == new_bucket])
+    distances = np.where(tentative == unreached, -1, tentative)
+    return distances, parents
+
+
+def bit_parallel_bfs_stats(graph: Vectorized_Graph, source_ids: Sequence[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Multi-source BFS (MS-BFS) that advances up to 64 sources at once. Every vertex keeps a uint64 with one
+    bit per source for the sources that reached it, so one pass over the edges of a level moves all the
+    searches that share it. Sparse levels push the bits of the frontier to its neighbors and dense levels
+    pull them from the neighbors of every vertex.
+    :param graph: the vectorized graph
+    :param source_ids: at most BATCH_SIZE source vertex ids
+    :return: a tuple with the format (eccentricities, sums of distances, numbers of reached vertices), by source
+    """
+    number_of_sources = len(source_ids)
+    if number_of_sources > BATCH_SIZE:
+        raise ValueError(f"At most {BATCH_SIZE} sources can be searched at once")
+    number_of_vertices = len(graph.degrees)
+    total_edges = len(graph.neighbors)
+    has_neighbors = np.flatnonzero(graph.degrees)
+    bits = np.left_shift(np.uint64(1), np.arange(number_of_sources, dtype=np.uint64))
+    seen = np.zeros(number_of_vertices, dtype=np.uint64)
+    np.bitwise_or.at(seen, np.asarray(source_ids, dtype=np.int64), bits)
+    visit = seen.copy()
+    frontier = np.flatnonzero(visit)
+    eccentricities = np.zeros(number_of_sources, dtype=np.int64)
+    distance_sums = np.zeros(number_of_sources, dtype=np.int64)
+    reached = np.ones(number_of_sources, dtype=np.int64)
+    level = 0
+    while len(frontier):
+        level += 1
+        next_visit = np.zeros(number_of_vertices, dtype=np.uint64)
+        if int(graph.degrees[frontier].sum()) * ALPHA < total_edges:
+            neighbors, owners = _gather(graph, frontier)
+            np.bitwise_or.at(next_visit, neighbors, visit[frontier][owners])
+        else:
+            next_visit[has_neighbors] = np.bitwise_or.reduceat(visit[graph.neighbors], graph.offsets[has_neighbors])
+        next_visit &= ~seen
+        frontier = np.flatnonzero(next_visit)
+        if not len(frontier):
+            break
+        seen[frontier] |= next_visit[frontier]
+        visit = next_visit
+        frontier_bits = np.unpackbits(visit[frontier].view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+        new_by_source = frontier_bits.sum(axis=0, dtype=np.int64)[:number_of_sources]
+        eccentricities[new_by_source > 0] = level
+        distance_sums += level * new_by_source
+        reached += new_by_source
+    return eccentricities, distance_sums, reached
+
+
+def bit_parallel_bfs(graph, sources: Sequence[str], execution_time: Optional[float] = None,
+                     progress: bool = True) -> Dict[str, Tuple[int, int]]:
+    """
+    Runs an unweighted BFS from many sources, BATCH_SIZE of them at a time with bit_parallel_bfs_stats
+    :param graph: a Graph, CSR_Graph or Vectorized_Graph
+    :param sources: the source vertices
+    :param execution_time: optional time budget in seconds, the batches not started by then are skipped
+    :param progress: show a progress bar
+    :return: a dictionary with the format {source: (eccentricity, sum of distances)}, as parallel_bfs.multi_source_bfs
+    """
+    if not isinstance(graph, Vectorized_Graph):
+        graph = Vectorized_Graph(graph)
+    source_ids = [idx for idx in (graph.index_of(source) for source in sources) if idx >= 0]
+    results = {}
+    start_time = time.time()
+    with tqdm(total=len(source_ids), disable=not progress, desc="BFS sources") as progress_bar:
+        for start in range(0, len(source_ids), BATCH_SIZE):
+            if execution_time is not None and time.time() - start_time >= execution_time:
+                break
+            batch = source_ids[start:start + BATCH_SIZE]
+            eccentricities, distance_sums, _ = bit_parallel_bfs_stats(graph, batch)
+            for source, eccentricity, distance_sum in zip(batch, eccentricities.tolist(), distance_sums.tolist()):
+                results[graph.vertices[source]] = (eccentricity, distance_sum)
+            progress_bar.update(len(batch))
+    return results
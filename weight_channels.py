@@ -0,0 +1,55 @@
+import numpy as np
+WEIGHT_CHANNELS = ('shared', 'hops', 'inverse', 'log')
+INTEGER_CHANNELS = ('shared', 'hops')
+
+
+def channel_weights(channel: str, shared: np.ndarray) -> np.ndarray:
+    """
+    Converts numbers of shared movies into the weights of a channel:
+    'shared' the number of shared movies (the default, as len of the edge data), 'hops' 1 for every edge,
+    'inverse' 1 / shared movies and 'log' 1 / log2(1 + shared movies). With the last two, the shortest
+    paths are the strongest connections (many shared movies make an edge short).
+    :param channel: the channel name
+    :param shared: the numbers of shared movies (at least 1)
+    :return: int32 weights for the integer channels, float64 weights otherwise
+    """
+    if channel == 'shared':
+        return np.asarray(shared, dtype=np.int32)
+    if channel == 'hops':
+        return np.ones(len(shared), dtype=np.int32)
+    if channel == 'inverse':
+        return 1 / np.asarray(shared, dtype=np.float64)
+    if channel == 'log':
+        return 1 / np.log2(1 + np.asarray(shared, dtype=np.float64))
+    raise ValueError(f"Unknown weight channel {channel}, expected one of {', '.join(WEIGHT_CHANNELS)}")
+
+
+class Weight_Table(dict):
+    """
+    Weight_Table class (the weight of a channel by number of shared movies, for the dictionary graphs).
+    The hot loops read table[len(edge data)], and every number of shared movies is converted only once.
+    """
+    def __init__(self, channel: str):
+        super().__init__()
+        channel_weights(channel, np.ones(1))
+        self.channel = channel
+        self.integral = channel in INTEGER_CHANNELS
+
+    def __missing__(self, shared: int):
+        weight = channel_weights(self.channel, np.array([shared])).item()
+        self[shared] = weight
+        return weight
+
+
+_tables = {}
+
+
+def weight_table(channel: str) -> Weight_Table:
+    """
+    Gets the weight table of a channel, shared by every query
+    :param channel: the channel name
+    :return: the Weight_Table
+    """
+    if channel not in _tables:
+        _tables[channel] = Weight_Table(channel)
+    return _tables[channel]